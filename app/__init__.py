@@ -93,4 +93,8 @@ def create_app():
     app.register_blueprint(lands_bp, url_prefix='/api/lands')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
     return app
\ No newline at end of file
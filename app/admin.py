@@ -1,8 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import User, Land, LandTransfer, UserRole
-from app.blockchain import blockchain_service
+from app.blockchain import blockchain_service, startup_stats
+from app.chain_settlement import (
+    APPROVAL_WRITE_MODES, apply_land_registration, blockchain_write_mode,
+    land_registration_callback, registration_in_flight
+)
+from app.anchoring import queue_land_anchor
+from app.chain_outbox import enqueue_land_registration
+from app.tx_simulation import TransactionRevertedError, simulation_enabled
+from app.loading import loaded, LAND, TRANSFER
+from app.pagination import paginate_request, PaginationError
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -36,14 +45,13 @@ def get_dashboard():
         total_transfers = LandTransfer.query.count()
         
         # Get recent activities
-        recent_lands = Land.query.order_by(Land.created_at.desc()).limit(5).all()
-        recent_transfers = LandTransfer.query.order_by(LandTransfer.initiated_at.desc()).limit(5).all()
+        recent_lands = Land.query.options(*LAND).order_by(Land.created_at.desc()).limit(5).all()
+        recent_transfers = LandTransfer.query.options(*TRANSFER).order_by(LandTransfer.initiated_at.desc()).limit(5).all()
         
-        # Get blockchain statistics
-        blockchain_connected = blockchain_service.is_connected()
-        blockchain_total_supply = 0
-        if blockchain_connected:
-            blockchain_total_supply = blockchain_service.get_total_supply()
+        # Get blockchain statistics from the background sampler
+        chain_status = blockchain_service.status_sampler.snapshot()
+        blockchain_connected = chain_status['connected']
+        blockchain_total_supply = chain_status['total_supply'] if blockchain_connected else 0
         
         return jsonify({
             'statistics': {
@@ -55,7 +63,9 @@ def get_dashboard():
                 'blockchain_lands': blockchain_lands,
                 'total_transfers': total_transfers,
                 'blockchain_connected': blockchain_connected,
-                'blockchain_total_supply': blockchain_total_supply
+                'blockchain_total_supply': blockchain_total_supply,
+                'blockchain_status_age_seconds': chain_status['age_seconds'],
+                'blockchain_circuit': blockchain_service.circuit_breaker.state
             },
             'recent_lands': [land.to_dict() for land in recent_lands],
             'recent_transfers': [transfer.to_dict() for transfer in recent_transfers]
@@ -70,8 +80,6 @@ def get_dashboard():
 def get_users():
     """Get all users with pagination"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         search = request.args.get('search', '')
         
         query = User.query
@@ -84,20 +92,15 @@ def get_users():
                 (User.last_name.contains(search))
             )
         
-        users = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        users = paginate_request(query, [User.id])
         
         return jsonify({
             'users': [user.to_dict() for user in users.items],
-            'total': users.total,
-            'pages': users.pages,
-            'current_page': page,
-            'per_page': per_page
+            **users.meta
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -112,10 +115,10 @@ def get_user(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         # Get user's lands
-        lands = Land.query.filter_by(owner_id=user_id).all()
+        lands = Land.query.options(*LAND).filter_by(owner_id=user_id).all()
         
         # Get user's transfers
-        transfers = LandTransfer.query.filter(
+        transfers = LandTransfer.query.options(*TRANSFER).filter(
             (LandTransfer.from_user_id == user_id) | (LandTransfer.to_user_id == user_id)
         ).all()
         
@@ -156,23 +159,15 @@ def toggle_user_status(user_id):
 def get_pending_lands():
     """Get all pending lands for review"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        
-        lands = Land.query.filter_by(status='pending').paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        lands = paginate_request(Land.query.options(*LAND).filter_by(status='pending'), [Land.id])
         
         return jsonify({
             'lands': [land.to_dict() for land in lands.items],
-            'total': lands.total,
-            'pages': lands.pages,
-            'current_page': page,
-            'per_page': per_page
+            **lands.meta
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -194,6 +189,11 @@ def review_land(land_id):
         if action not in ['approve', 'reject']:
             return jsonify({'error': 'Invalid action. Use "approve" or "reject"'}), 400
         
+        try:
+            blockchain_mode = blockchain_write_mode(data, APPROVAL_WRITE_MODES)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         blockchain_result = None
         
         if action == 'approve':
@@ -201,7 +201,7 @@ def review_land(land_id):
             land.is_verified = True
             
             # Automatically register on blockchain if conditions are met
-            if auto_register_blockchain and not land.is_registered_on_blockchain:
+            if auto_register_blockchain and not land.is_registered_on_blockchain and not registration_in_flight(land):
                 # Get owner for wallet address
                 owner = User.query.get(land.owner_id)
                 if owner and owner.wallet_address:
@@ -219,15 +219,31 @@ def review_land(land_id):
                         }
                         
                         # Register on blockchain
-                        blockchain_result = blockchain_service.register_land_on_blockchain(land_data)
-                        
-                        if blockchain_result:
-                            # Update land with blockchain information
-                            land.token_id = blockchain_result.get('token_id')
-                            land.blockchain_tx_hash = blockchain_result.get('tx_hash')
-                            land.is_registered_on_blockchain = True
-                            land.blockchain_block_number = blockchain_result.get('block_number')
+                        if blockchain_mode == 'anchor':
+                            # Committed with the next Merkle root by `flask anchor-lands`
+                            blockchain_result = queue_land_anchor(land)
+                        elif blockchain_mode == 'outbox':
+                            entry = enqueue_land_registration(land, land_data)
+                            blockchain_result = {'status': 'pending', 'outbox_id': entry.id}
+                        elif blockchain_mode == 'async':
+                            blockchain_result = blockchain_service.register_land_on_blockchain(
+                                land_data,
+                                wait=False,
+                                on_settled=land_registration_callback(current_app._get_current_object(), land.id),
+                                job_context={'land_id': land.id}
+                            )
+                            if blockchain_result:
+                                land.blockchain_tx_hash = blockchain_result['tx_hash']
+                        else:
+                            blockchain_result = blockchain_service.register_land_on_blockchain(land_data)
+                            
+                            if blockchain_result:
+                                # Update land with blockchain information
+                                apply_land_registration(land, blockchain_result)
                             
+                    except TransactionRevertedError as e:
+                        print(f"Blockchain registration rejected by simulation: {str(e)}")
+                        blockchain_result = {'error': str(e), 'revert': e.to_dict()}
                     except Exception as e:
                         print(f"Blockchain registration failed: {str(e)}")
                         # Continue with approval even if blockchain registration fails
@@ -242,13 +258,17 @@ def review_land(land_id):
         
         response_data = {
             'message': f'Land {action}d successfully',
-            'land': land.to_dict()
+            'land': loaded(land).to_dict()
         }
         
         # Include blockchain registration result if attempted
         if blockchain_result:
             if 'error' in blockchain_result:
                 response_data['blockchain_warning'] = f"Land approved but blockchain registration failed: {blockchain_result['error']}"
+                if 'revert' in blockchain_result:
+                    response_data['blockchain_revert'] = blockchain_result['revert']
+            elif blockchain_result.get('status') == 'pending':
+                response_data['blockchain_pending'] = blockchain_result
             else:
                 response_data['blockchain_success'] = f"Land approved and registered on blockchain with token ID: {blockchain_result.get('token_id')}"
                 response_data['blockchain_data'] = blockchain_result
@@ -265,29 +285,22 @@ def review_land(land_id):
 def get_transfers():
     """Get all land transfers"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
         
-        query = LandTransfer.query
+        query = LandTransfer.query.options(*TRANSFER)
         
         if status:
             query = query.filter_by(status=status)
         
-        transfers = query.order_by(LandTransfer.initiated_at.desc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        transfers = paginate_request(query, [LandTransfer.initiated_at, LandTransfer.id], descending=True)
         
         return jsonify({
             'transfers': [transfer.to_dict() for transfer in transfers.items],
-            'total': transfers.total,
-            'pages': transfers.pages,
-            'current_page': page,
-            'per_page': per_page
+            **transfers.meta
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -297,42 +310,37 @@ def get_transfers():
 def get_blockchain_status():
     """Get blockchain connection status and statistics"""
     try:
-        # Test blockchain connection
-        connected = blockchain_service.is_connected()
+        # Served from the background sampler snapshot, no RPC calls inline
+        chain_status = blockchain_service.status_sampler.snapshot()
         
         status_data = {
-            'connected': connected,
+            'connected': chain_status['connected'],
             'network': 'Polygon Amoy Testnet',
             'chain_id': blockchain_service.chain_id,
             'rpc_url': blockchain_service.rpc_url,
             'contract_address': blockchain_service.contract_address,
-            'balance': '0',
-            'account_address': None,
-            'total_supply': 0,
-            'error': None
+            'balance': chain_status['balance'],
+            'account_address': chain_status['account_address'],
+            'total_supply': chain_status['total_supply'],
+            'latest_block': chain_status['latest_block'],
+            'rpc_latency_ms': chain_status['rpc_latency_ms'],
+            'sampled_at': chain_status['sampled_at'],
+            'age_seconds': chain_status['age_seconds'],
+            'read_cache': blockchain_service.read_cache.stats(),
+            'rpc_endpoints': blockchain_service.rpc_endpoint_stats(),
+            'rpc_pools': blockchain_service.rpc_pool_stats(),
+            'gas_strategy': blockchain_service.gas_strategy.stats(),
+            'local_chain': blockchain_service.local_chain.stats() if blockchain_service.local_chain else None,
+            'rpc_recording': blockchain_service.rpc_recording_stats(),
+            'circuit_breaker': blockchain_service.circuit_breaker.stats(),
+            'tx_accelerator': blockchain_service.tx_accelerator.stats(),
+            'tx_simulation': {
+                'enabled': simulation_enabled(),
+                'rejected': blockchain_service.simulation_rejects
+            },
+            'error': chain_status['error']
         }
         
-        if connected:
-            try:
-                # Get account address
-                account_address = blockchain_service.get_account_from_private_key()
-                if account_address:
-                    status_data['account_address'] = account_address
-                    
-                    # Get balance
-                    balance_wei = blockchain_service.w3.eth.get_balance(account_address)
-                    balance_matic = blockchain_service.w3.from_wei(balance_wei, 'ether')
-                    status_data['balance'] = f"{balance_matic:.4f}"
-                
-                # Get total supply from contract
-                total_supply = blockchain_service.get_total_supply()
-                status_data['total_supply'] = total_supply
-                
-            except Exception as e:
-                status_data['error'] = f"Connected but contract interaction failed: {str(e)}"
-        else:
-            status_data['error'] = "Not connected to blockchain network"
-        
         return jsonify(status_data), 200
         
     except Exception as e:
@@ -341,6 +349,20 @@ def get_blockchain_status():
             'error': str(e)
         }), 500
 
+@admin_bp.route('/blockchain/nonce', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_nonce_state():
+    """Get the backend account's nonce allocator state for debugging"""
+    try:
+        if request.args.get('resync', 'false').lower() == 'true':
+            blockchain_service.nonce_manager.resync(reason='manual resync from admin')
+        
+        return jsonify({'nonce_manager': blockchain_service.nonce_manager.state()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/reports/land-distribution', methods=['GET'])
 @jwt_required()
 @admin_required
@@ -395,14 +417,18 @@ def get_system_info():
         import os
         from datetime import datetime
         
+        chain_status = blockchain_service.status_sampler.snapshot()
+        
         return jsonify({
             'system': {
                 'environment': os.getenv('FLASK_ENV', 'development'),
                 'database_connected': True,  # If we reach here, DB is connected
-                'blockchain_connected': blockchain_service.is_connected(),
+                'blockchain_connected': chain_status['connected'],
+                'blockchain_status_age_seconds': chain_status['age_seconds'],
                 'current_time': datetime.utcnow().isoformat(),
                 'contract_address': blockchain_service.contract_address,
-                'chain_id': blockchain_service.chain_id
+                'chain_id': blockchain_service.chain_id,
+                'blockchain_startup': startup_stats()
             }
         }), 200
         
@@ -447,10 +473,7 @@ def register_land_on_blockchain(land_id):
         
         if result:
             # Update land record with blockchain information
-            land.blockchain_token_id = result['token_id']
-            land.blockchain_tx_hash = result['tx_hash']
-            land.is_registered_on_blockchain = True
-            land.blockchain_block_number = result['block_number']
+            apply_land_registration(land, result)
             
             db.session.commit()
             
@@ -461,5 +484,7 @@ def register_land_on_blockchain(land_id):
         else:
             return jsonify({'error': 'Failed to register land on blockchain'}), 500
         
+    except TransactionRevertedError as e:
+        return jsonify({'error': str(e), 'revert': e.to_dict()}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Merkle-batched anchoring of approved lands (blockchain_mode='anchor').
+
+Instead of one registerLand transaction per land, approved lands are queued
+(anchor_state='queued') and `flask anchor-lands` periodically builds a Merkle
+tree over their canonical records and commits the root in a single
+transaction. Each Land keeps its record and inclusion proof, so
+GET /api/lands/<id>/anchor-proof can verify it against the anchored root.
+
+Anchoring does not mint an NFT; a land that needs on-chain transfers can
+still be registered with the normal modes later.
+
+Tree layout: leaf = keccak(0x00 || record), node = keccak(0x01 || left || right);
+an odd node at the end of a level is promoted unchanged.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from app import db
+from app.models import Land, LandAnchor, User
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def canonical_land_record(land: Land) -> str:
+    """Deterministic JSON of the land fields committed by an anchor"""
+    owner_wallet = land.wallet_address
+    if not owner_wallet:
+        owner = User.query.get(land.owner_id)
+        owner_wallet = owner.wallet_address if owner else None
+    record = {
+        'land_id': land.id,
+        'property_id': land.property_id,
+        'owner_wallet': owner_wallet.lower() if owner_wallet else None,
+        'location': land.location,
+        'area': land.area,
+        'property_type': land.property_type,
+        'latitude': land.latitude,
+        'longitude': land.longitude,
+        'ipfs_hash': land.ipfs_hash or ''
+    }
+    return json.dumps(record, sort_keys=True, separators=(',', ':'))
+
+
+def leaf_hash(record: str) -> bytes:
+    return Web3.keccak(LEAF_PREFIX + record.encode('utf-8'))
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return Web3.keccak(NODE_PREFIX + left + right)
+
+
+def build_merkle_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    """All levels of the tree, leaves first and the root level last"""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[Dict[str, str]]:
+    """Sibling hashes from leaf index up to the root"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                'position': 'left' if sibling < index else 'right',
+                'hash': Web3.to_hex(level[sibling])
+            })
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: bytes, proof: List[Dict[str, str]], root: bytes) -> bool:
+    node = leaf
+    for step in proof:
+        sibling = bytes(Web3.to_bytes(hexstr=step['hash']))
+        node = _node_hash(sibling, node) if step['position'] == 'left' else _node_hash(node, sibling)
+    return node == root
+
+
+def queue_land_anchor(land: Land) -> Dict[str, Any]:
+    """Queue a land for the next anchor batch (caller commits)"""
+    if land.anchor_state not in ('queued', 'anchoring', 'anchored'):
+        land.anchor_state = 'queued'
+    return {'status': 'pending', 'anchor_state': land.anchor_state}
+
+
+def _requeue(anchor: LandAnchor, error: str):
+    anchor.state = 'failed'
+    anchor.error = error
+    for land in Land.query.filter_by(anchor_id=anchor.id).all():
+        land.anchor_state = 'queued'
+        land.anchor_id = None
+        land.anchor_record = None
+        land.anchor_proof = None
+
+
+def _confirm(anchor: LandAnchor, block_number: int):
+    anchor.state = 'confirmed'
+    anchor.block_number = block_number
+    anchor.anchored_at = datetime.utcnow()
+    Land.query.filter_by(anchor_id=anchor.id).update({'anchor_state': 'anchored'}, synchronize_session=False)
+
+
+def resume_anchors(service):
+    """Settle anchors left unfinished by a killed run (commits).
+
+    Re-anchoring a batch is harmless, so an anchor whose transaction is not
+    mined is marked failed and its lands are queued again.
+    """
+    for anchor in LandAnchor.query.filter(LandAnchor.state.in_(('pending', 'submitted'))).all():
+        receipt = None
+        if anchor.tx_hash:
+            try:
+                receipt = service.get_transaction_receipt(anchor.tx_hash)
+            except TransactionNotFound:
+                receipt = None
+        if receipt and receipt.status == 1:
+            _confirm(anchor, receipt.blockNumber)
+            print(f"⚓ Anchor {anchor.id} found mined in block {receipt.blockNumber}")
+        else:
+            _requeue(anchor, 'Anchor run interrupted before the transaction was mined')
+            print(f"🔁 Anchor {anchor.id} interrupted, lands queued again")
+    db.session.commit()
+
+
+def anchor_queued_lands(service, max_batch: int = None) -> Optional[LandAnchor]:
+    """Commit one Merkle root over up to max_batch queued lands (commits); None if nothing is queued"""
+    max_batch = max_batch or int(os.getenv('ANCHOR_MAX_BATCH', 512))
+    lands = Land.query.filter_by(anchor_state='queued').order_by(Land.id).limit(max_batch).all()
+    if not lands:
+        return None
+
+    records = [canonical_land_record(land) for land in lands]
+    levels = build_merkle_tree([leaf_hash(record) for record in records])
+    root = levels[-1][0]
+
+    # Persist the batch and every proof before anything leaves the process
+    anchor = LandAnchor(merkle_root=Web3.to_hex(root), leaf_count=len(lands), state='pending')
+    db.session.add(anchor)
+    db.session.flush()
+    for index, (land, record) in enumerate(zip(lands, records)):
+        land.anchor_state = 'anchoring'
+        land.anchor_id = anchor.id
+        land.anchor_record = record
+        land.anchor_proof = json.dumps(merkle_proof(levels, index))
+    db.session.commit()
+
+    def on_signed(tx_hash):
+        anchor.tx_hash = tx_hash
+        anchor.state = 'submitted'
+        db.session.commit()
+
+    result = service.anchor_merkle_root(root, on_signed=on_signed)
+    if result:
+        _confirm(anchor, result['block_number'])
+        print(f"✅ Anchored {len(lands)} lands under root {anchor.merkle_root}")
+    else:
+        _requeue(anchor, 'Anchor transaction failed')
+    db.session.commit()
+    return anchor
+
+
+def run_anchoring(service, interval: float = None, follow: bool = False, max_batch: int = None):
+    """Anchor queued lands every ANCHOR_WINDOW seconds (or once)"""
+    interval = interval or float(os.getenv('ANCHOR_WINDOW', 300))
+    max_batch = max_batch or int(os.getenv('ANCHOR_MAX_BATCH', 512))
+    resume_anchors(service)
+    while True:
+        try:
+            anchor = anchor_queued_lands(service, max_batch)
+            if not anchor:
+                print("ℹ️ No lands queued for anchoring")
+            # Full batches mean more lands are waiting
+            while anchor and anchor.state == 'confirmed' and anchor.leaf_count == max_batch:
+                anchor = anchor_queued_lands(service, max_batch)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Anchoring error: {e}")
+            if not follow:
+                raise
+        if not follow:
+            return
+        time.sleep(interval)
+
+
+def verify_land_anchor(service, land: Land) -> Dict[str, Any]:
+    """Check a land's stored proof against its anchor root and the root committed on chain"""
+    anchor = LandAnchor.query.get(land.anchor_id) if land.anchor_id else None
+    if not anchor or not land.anchor_record:
+        return {'land_id': land.id, 'anchor_state': land.anchor_state, 'verified': False,
+                'error': 'Land has not been anchored'}
+
+    proof = json.loads(land.anchor_proof or '[]')
+    leaf = leaf_hash(land.anchor_record)
+    proof_valid = verify_merkle_proof(leaf, proof, bytes(Web3.to_bytes(hexstr=anchor.merkle_root)))
+
+    on_chain = service.get_anchored_root(anchor.tx_hash) if anchor.tx_hash else None
+    root_on_chain = bool(on_chain) and on_chain['merkle_root'].lower() == anchor.merkle_root.lower()
+
+    return {
+        'land_id': land.id,
+        'anchor_state': land.anchor_state,
+        'anchor': anchor.to_dict(),
+        'record': json.loads(land.anchor_record),
+        'leaf_hash': Web3.to_hex(leaf),
+        'proof': proof,
+        'proof_valid': proof_valid,
+        'root_on_chain': root_on_chain,
+        # False once the land changed after anchoring (e.g. new owner)
+        'record_matches_land': canonical_land_record(land) == land.anchor_record,
+        'verified': proof_valid and root_on_chain
+    }
@@ -0,0 +1,177 @@
+"""
+Block-driven background workers for the blockchain service.
+
+A single BlockWatcher thread polls the chain head and notifies its listeners
+once per new block. The ReceiptResolver is one such listener: it settles all
+outstanding transactions submitted with wait=False in one pass per block, so
+request handlers never block on wait_for_transaction_receipt.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, List
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+
+class BlockWatcher:
+    def __init__(self, service, poll_interval: float = None):
+        self.service = service
+        self.poll_interval = poll_interval or float(os.getenv('BLOCK_POLL_INTERVAL', 2))
+        self.latest_block = None
+        self._listeners: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """Register a callable invoked with each new block number"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+        self.ensure_started()
+
+    def ensure_started(self):
+        """Start the polling thread on first use (never at import time)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='block-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.service.w3:
+                    block_number = self.service.w3.eth.block_number
+                    if self.latest_block is None or block_number > self.latest_block:
+                        self.latest_block = block_number
+                        self._notify(block_number)
+            except Exception as e:
+                print(f"Block watcher error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _notify(self, block_number: int):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(block_number)
+            except Exception as e:
+                print(f"Block listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+
+class ReceiptResolver:
+    """Tracks submitted transactions and settles them as blocks arrive"""
+
+    def __init__(self, service, timeout: float = None):
+        self.service = service
+        self.timeout = timeout or float(os.getenv('RECEIPT_TIMEOUT', 600))
+        self.max_jobs = int(os.getenv('RECEIPT_JOB_HISTORY', 1000))
+        self.watcher = service.block_watcher
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._callbacks: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, tx_hash, kind: str, parse_receipt: Callable,
+               on_settled: Optional[Callable] = None, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Track a broadcast transaction and return its pending handle
+
+        context (e.g. land_id / transfer_id) is stored on the job for status lookups.
+        """
+        tx_hash_hex = Web3.to_hex(tx_hash) if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'tx_hash': tx_hash_hex,
+            'kind': kind,
+            'status': 'pending',
+            'submitted_at': datetime.utcnow().isoformat(),
+            'settled_at': None,
+            'block_number': None,
+            'result': None,
+            'error': None,
+            **(context or {})
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._pending[job_id] = job
+            self._callbacks[job_id] = (parse_receipt, on_settled, time.monotonic())
+        self.watcher.add_listener(self.on_new_block)
+        print(f"⏳ Tracking {kind} transaction {tx_hash_hex} as job {job_id}")
+        return {'job_id': job_id, 'tx_hash': tx_hash_hex, 'status': 'pending'}
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def is_pending(self, tx_hash: str) -> bool:
+        with self._lock:
+            return any(job['tx_hash'] == tx_hash for job in self._pending.values())
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def on_new_block(self, block_number: int):
+        """Settle every outstanding transaction in one pass"""
+        with self._lock:
+            pending = list(self._pending.values())
+        for job in pending:
+            parse_receipt, on_settled, submitted = self._callbacks[job['job_id']]
+            try:
+                # Follows fee-bumped replacements of the transaction
+                receipt = self.service.get_transaction_receipt(job['tx_hash'])
+            except TransactionNotFound:
+                if time.monotonic() - submitted > self.timeout:
+                    self._settle(job, 'timeout', None, on_settled,
+                                 error=f"No receipt after {int(self.timeout)}s")
+                continue
+            except Exception as e:
+                print(f"Error fetching receipt for {job['tx_hash']}: {e}")
+                continue
+
+            try:
+                result = parse_receipt(receipt)
+            except Exception as e:
+                result = None
+                print(f"Error parsing receipt for {job['tx_hash']}: {e}")
+            job['block_number'] = receipt.blockNumber
+            job['tx_hash'] = Web3.to_hex(receipt.transactionHash)
+            if receipt.status == 1 and result is not None:
+                self._settle(job, 'confirmed', result, on_settled)
+            else:
+                self._settle(job, 'failed', result, on_settled,
+                             error=f"Transaction failed with status: {receipt.status}")
+
+    def _settle(self, job: Dict[str, Any], status: str, result, on_settled: Optional[Callable],
+                error: str = None):
+        with self._lock:
+            job['status'] = status
+            job['result'] = result
+            job['error'] = error
+            job['settled_at'] = datetime.utcnow().isoformat()
+            self._pending.pop(job['job_id'], None)
+            self._callbacks.pop(job['job_id'], None)
+            # Keep a bounded history of settled jobs for status lookups
+            while len(self._jobs) > self.max_jobs:
+                oldest = next((job_id for job_id in self._jobs if job_id not in self._pending), None)
+                if oldest is None:
+                    break
+                self._jobs.pop(oldest)
+        print(f"{'✅' if status == 'confirmed' else '❌'} Job {job['job_id']} {status} ({job['tx_hash']})")
+        if on_settled:
+            try:
+                on_settled(dict(job))
+            except Exception as e:
+                print(f"Settlement callback for job {job['job_id']} failed: {e}")
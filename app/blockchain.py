@@ -1,15 +1,364 @@
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
+from web3.exceptions import ContractLogicError, TransactionNotFound, TimeExhausted
+from web3.logs import DISCARD
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import make_post_request
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict, NamedElementOnion
+from eth_abi import decode
+from flask import current_app, has_app_context
+from hexbytes import HexBytes
+from app.rpc_provider import MultiEndpointProvider, PooledHTTPProvider
+from app.local_chain import blockchain_backend, attach_local_chain
+from app.rpc_recording import RpcRecorder, ReplayProvider
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError, DeadlineExceeded, clamp_timeout
+from app.tx_simulation import TransactionRevertedError, decode_revert, simulation_enabled
+import contextvars
 import json
 import os
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows development machines
+    fcntl = None
+    resource = None
+
+NONCE_ERRORS = ('nonce too low', 'nonce too high', 'invalid transaction nonce',
+                'replacement transaction underpriced')
+
+
+def is_nonce_error(error) -> bool:
+    """True if the node rejected a transaction because of its nonce"""
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERRORS)
+
+
+# geth / erigon, openethereum / nethermind, besu
+ALREADY_KNOWN_ERRORS = ('already known', 'known transaction', 'already imported')
+
+
+def is_already_known(error) -> bool:
+    """True if the node rejected a rebroadcast because it already has the transaction"""
+    message = str(error).lower()
+    return any(marker in message for marker in ALREADY_KNOWN_ERRORS)
+
+
+class NonceManager:
+    """Hands out consecutive nonces for the backend signing account.
+
+    The next nonce lives in a small JSON state file guarded by an exclusive
+    flock, so threads and gunicorn workers on the same host never receive the
+    same nonce. The counter is resynced from the chain's 'pending' transaction
+    count on first use in each process and after a broadcast the node rejects
+    for its nonce. A nonce whose transaction never left the process is
+    released: handed back if nothing was allocated after it, otherwise kept
+    as a gap that the next allocation fills first.
+    """
+
+    def __init__(self, w3: Web3, address: str, state_path: str = None):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self.state_path = state_path or os.getenv('NONCE_STATE_FILE') or os.path.join(
+            tempfile.gettempdir(), f"landregistry-nonce-{self.address.lower()}.json"
+        )
+        self._thread_lock = threading.Lock()
+        self._synced = False
+        self.allocations = 0
+        self.resyncs = 0
+        self.last_error = None
+
+    @contextmanager
+    def _locked_state(self):
+        """Yield the shared state dict while holding the thread and file locks"""
+        with self._thread_lock:
+            with open(self.state_path, 'a+') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    try:
+                        state = json.loads(raw) if raw else {}
+                    except ValueError:
+                        state = {}
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _chain_pending_count(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, 'pending')
+
+    def allocate(self) -> int:
+        """Reserve the next nonce (the lowest released gap first)"""
+        with self._locked_state() as state:
+            next_nonce = state.get('next_nonce')
+            gaps = state.get('gaps', [])
+            if next_nonce is None or not self._synced:
+                # After a restart never go below what the chain already knows about
+                chain_nonce = self._chain_pending_count()
+                next_nonce = chain_nonce if next_nonce is None else max(next_nonce, chain_nonce)
+                gaps = [gap for gap in gaps if gap >= chain_nonce]
+                state['synced_at'] = time.time()
+                self._synced = True
+            if gaps:
+                nonce = min(gaps)
+                gaps.remove(nonce)
+            else:
+                nonce = next_nonce
+                next_nonce += 1
+            state['next_nonce'] = next_nonce
+            state['gaps'] = gaps
+            state['last_allocated'] = nonce
+            state['last_allocated_pid'] = os.getpid()
+            self.allocations += 1
+            return nonce
+
+    def release(self, nonce: int, reason: str = None):
+        """Give back a nonce whose transaction never reached the node"""
+        with self._locked_state() as state:
+            if state.get('next_nonce') == nonce + 1:
+                state['next_nonce'] = nonce
+            elif nonce < state.get('next_nonce', 0) and nonce not in state.get('gaps', []):
+                # Later nonces are already out: the next allocation fills the gap
+                state['gaps'] = sorted(state.get('gaps', []) + [nonce])
+            print(f"↩️ Released nonce {nonce} for {self.address}" + (f" ({reason})" if reason else ""))
+            self.last_error = reason
+
+    def resync(self, reason: str = None) -> int:
+        """Reset the counter to the chain's pending transaction count"""
+        with self._locked_state() as state:
+            chain_nonce = self._chain_pending_count()
+            print(f"🔄 Resyncing nonce for {self.address}: {state.get('next_nonce')} -> {chain_nonce}"
+                  + (f" ({reason})" if reason else ""))
+            state['next_nonce'] = chain_nonce
+            state['gaps'] = []
+            state['synced_at'] = time.time()
+            self._synced = True
+            self.resyncs += 1
+            self.last_error = reason
+            return chain_nonce
+
+    def state(self) -> Dict[str, Any]:
+        """Snapshot of the allocator for debugging"""
+        with self._locked_state() as state:
+            snapshot = dict(state)
+        snapshot.update({
+            'address': self.address,
+            'state_path': self.state_path,
+            'file_locking': fcntl is not None,
+            'process_synced': self._synced,
+            'process_allocations': self.allocations,
+            'process_resyncs': self.resyncs,
+            'last_error': self.last_error
+        })
+        return snapshot
+
+# Fallback minimal ABI with essential ERC721 and custom functions
+FALLBACK_CONTRACT_ABI = [
+    # Events
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
+            {"indexed": False, "internalType": "string", "name": "propertyId", "type": "string"},
+            {"indexed": True, "internalType": "address", "name": "owner", "type": "address"},
+            {"indexed": False, "internalType": "string", "name": "location", "type": "string"},
+            {"indexed": False, "internalType": "uint256", "name": "area", "type": "uint256"}
+        ],
+        "name": "LandRegistered",
+        "type": "event"
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
+            {"indexed": True, "internalType": "address", "name": "from", "type": "address"},
+            {"indexed": True, "internalType": "address", "name": "to", "type": "address"},
+            {"indexed": False, "internalType": "uint256", "name": "price", "type": "uint256"},
+            {"indexed": False, "internalType": "uint256", "name": "transferDate", "type": "uint256"}
+        ],
+        "name": "LandTransferred",
+        "type": "event"
+    },
+    # ERC721 Standard Functions
+    {
+        "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
+        "name": "ownerOf",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
+        "name": "getApproved",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"internalType": "address", "name": "owner", "type": "address"},
+            {"internalType": "address", "name": "operator", "type": "address"}
+        ],
+        "name": "isApprovedForAll",
+        "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"internalType": "address", "name": "from", "type": "address"},
+            {"internalType": "address", "name": "to", "type": "address"},
+            {"internalType": "uint256", "name": "tokenId", "type": "uint256"}
+        ],
+        "name": "transferFrom",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    # Custom Land Registry Functions
+    {
+        "inputs": [
+            {"internalType": "string", "name": "_propertyId", "type": "string"},
+            {"internalType": "address", "name": "_owner", "type": "address"},
+            {"internalType": "string", "name": "_location", "type": "string"},
+            {"internalType": "uint256", "name": "_area", "type": "uint256"},
+            {"internalType": "string", "name": "_propertyType", "type": "string"},
+            {"internalType": "string", "name": "_ipfsHash", "type": "string"},
+            {"internalType": "uint256", "name": "_latitude", "type": "uint256"},
+            {"internalType": "uint256", "name": "_longitude", "type": "uint256"}
+        ],
+        "name": "registerLand",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"internalType": "uint256", "name": "_tokenId", "type": "uint256"},
+            {"internalType": "address", "name": "_to", "type": "address"},
+            {"internalType": "uint256", "name": "_price", "type": "uint256"}
+        ],
+        "name": "transferLand",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "uint256", "name": "_tokenId", "type": "uint256"}],
+        "name": "getLandDetails",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "uint256", "name": "id", "type": "uint256"},
+                    {"internalType": "string", "name": "propertyId", "type": "string"},
+                    {"internalType": "address", "name": "owner", "type": "address"},
+                    {"internalType": "string", "name": "location", "type": "string"},
+                    {"internalType": "uint256", "name": "area", "type": "uint256"},
+                    {"internalType": "string", "name": "propertyType", "type": "string"},
+                    {"internalType": "uint256", "name": "registrationDate", "type": "uint256"},
+                    {"internalType": "bool", "name": "isVerified", "type": "bool"},
+                    {"internalType": "string", "name": "ipfsHash", "type": "string"},
+                    {"internalType": "uint256", "name": "latitude", "type": "uint256"},
+                    {"internalType": "uint256", "name": "longitude", "type": "uint256"}
+                ],
+                "internalType": "struct LandRegistry.Land",
+                "name": "",
+                "type": "tuple"
+            }
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "totalSupply",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+CONTRACT_ARTIFACT_PATH = os.getenv('CONTRACT_ARTIFACT_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'contracts',
+    'artifacts',
+    'contracts',
+    'LandRegistry.sol',
+    'LandRegistry.json'
+)
+
+# Calldata marker of Merkle anchor transactions (see app.anchoring)
+ANCHOR_PREFIX = b'LANDROOT'
+
+_abi_lock = threading.Lock()
+_contract_abi = None
+_abi_stats: Dict[str, Any] = {}
+
+def load_contract_abi() -> List[Dict[str, Any]]:
+    """Load the contract ABI from the compiled artifact once, falling back to the minimal ABI"""
+    global _contract_abi
+    with _abi_lock:
+        if _contract_abi is not None:
+            return _contract_abi
+
+        started = time.perf_counter()
+        try:
+            if os.path.exists(CONTRACT_ARTIFACT_PATH):
+                with open(CONTRACT_ARTIFACT_PATH, 'r') as f:
+                    artifact = json.load(f)
+                    _contract_abi = artifact['abi']
+                    _abi_stats['source'] = 'artifact'
+                    print(f"✅ Loaded contract ABI from artifact ({len(_contract_abi)} functions)")
+            else:
+                print(f"⚠️ Contract artifact not found at {CONTRACT_ARTIFACT_PATH}, using fallback ABI")
+                raise FileNotFoundError("Artifact not found")
+
+        except Exception as e:
+            print(f"⚠️ Failed to load contract artifact: {e}")
+            print("Using fallback minimal ABI...")
+            _contract_abi = FALLBACK_CONTRACT_ABI
+            _abi_stats['source'] = 'fallback'
+
+        _abi_stats['load_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return _contract_abi
 
 class BlockchainService:
     def __init__(self):
         self.rpc_url = os.getenv('POLYGON_RPC_URL')
+        # Optional comma-separated list of RPC endpoints for latency-aware routing
+        self.rpc_urls = [url.strip() for url in os.getenv('POLYGON_RPC_URLS', '').split(',') if url.strip()]
+        if self.rpc_urls and not self.rpc_url:
+            self.rpc_url = self.rpc_urls[0]
         self.chain_id = int(os.getenv('CHAIN_ID', 80002))
         self.private_key = os.getenv('PRIVATE_KEY')
         self.contract_address = os.getenv('CONTRACT_ADDRESS')
+        self._receipt_resolver = None
+        self._nonce_manager = None
+        self._block_watcher = None
+        self._read_cache = None
+        self._status_sampler = None
+        self._gas_strategy = None
+        self._tx_accelerator = None
+        self.backend = blockchain_backend()
+        self.local_chain = None
+        self.rpc_recorder = None
+        self.circuit_breaker = CircuitBreaker()
+        self.simulation_rejects = 0
         
         print(f"Initializing blockchain service with RPC: {self.rpc_url}")
         print(f"Contract address: {self.contract_address}")
@@ -17,164 +366,37 @@ class BlockchainService:
         
         # Initialize Web3
         try:
-            self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            if self.backend == 'eth_tester':
+                # In-process EVM with a freshly deployed LandRegistry (tests and benchmarks)
+                attach_local_chain(self, CONTRACT_ARTIFACT_PATH)
+            elif os.getenv('RPC_REPLAY_FILE'):
+                # Serve a previous recording instead of the network (reproducible benchmarks)
+                self.w3 = Web3(ReplayProvider(os.getenv('RPC_REPLAY_FILE')))
+            elif len(self.rpc_urls) > 1:
+                self.w3 = Web3(MultiEndpointProvider(self.rpc_urls))
+                print(f"Using {len(self.rpc_urls)} RPC endpoints with latency-aware routing")
+            else:
+                self.w3 = Web3(PooledHTTPProvider(self.rpc_url))
             
-            # Add POA middleware for Polygon Amoy (POA chain)
-            self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+            if not self.local_chain:
+                # Add POA middleware for Polygon Amoy (POA chain)
+                self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                print(f"Web3 provider initialized successfully with POA middleware")
             
-            print(f"Web3 provider initialized successfully with POA middleware")
+            # Fail fast while the node is down instead of waiting for HTTP timeouts
+            self.w3.middleware_onion.inject(self.circuit_breaker.middleware, name='circuit_breaker', layer=0)
+            
+            if os.getenv('RPC_RECORD_FILE'):
+                # Innermost layer, so the raw node responses are recorded
+                self.rpc_recorder = RpcRecorder(os.getenv('RPC_RECORD_FILE'))
+                self.w3.middleware_onion.inject(self.rpc_recorder.middleware, name='rpc_recorder', layer=0)
+                print(f"📼 Recording RPC traffic to {self.rpc_recorder.path}")
         except Exception as e:
             print(f"Failed to initialize Web3: {e}")
             self.w3 = None
         
-        # Load contract ABI from compiled artifact
-        try:
-            contract_artifact_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), 
-                'contracts', 
-                'artifacts', 
-                'contracts', 
-                'LandRegistry.sol', 
-                'LandRegistry.json'
-            )
-            
-            if os.path.exists(contract_artifact_path):
-                with open(contract_artifact_path, 'r') as f:
-                    artifact = json.load(f)
-                    self.contract_abi = artifact['abi']
-                    print(f"✅ Loaded contract ABI from artifact ({len(self.contract_abi)} functions)")
-            else:
-                print(f"⚠️ Contract artifact not found at {contract_artifact_path}, using fallback ABI")
-                raise FileNotFoundError("Artifact not found")
-                
-        except Exception as e:
-            print(f"⚠️ Failed to load contract artifact: {e}")
-            print("Using fallback minimal ABI...")
-            # Fallback minimal ABI with essential ERC721 and custom functions
-            self.contract_abi = [
-                # Events
-                {
-                    "anonymous": False,
-                    "inputs": [
-                        {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
-                        {"indexed": False, "internalType": "string", "name": "propertyId", "type": "string"},
-                        {"indexed": True, "internalType": "address", "name": "owner", "type": "address"},
-                        {"indexed": False, "internalType": "string", "name": "location", "type": "string"},
-                        {"indexed": False, "internalType": "uint256", "name": "area", "type": "uint256"}
-                    ],
-                    "name": "LandRegistered",
-                    "type": "event"
-                },
-                {
-                    "anonymous": False,
-                    "inputs": [
-                        {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
-                        {"indexed": True, "internalType": "address", "name": "from", "type": "address"},
-                        {"indexed": True, "internalType": "address", "name": "to", "type": "address"},
-                        {"indexed": False, "internalType": "uint256", "name": "price", "type": "uint256"},
-                        {"indexed": False, "internalType": "uint256", "name": "transferDate", "type": "uint256"}
-                    ],
-                    "name": "LandTransferred",
-                    "type": "event"
-                },
-                # ERC721 Standard Functions
-                {
-                    "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
-                    "name": "ownerOf",
-                    "outputs": [{"internalType": "address", "name": "", "type": "address"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
-                    "name": "getApproved",
-                    "outputs": [{"internalType": "address", "name": "", "type": "address"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [
-                        {"internalType": "address", "name": "owner", "type": "address"},
-                        {"internalType": "address", "name": "operator", "type": "address"}
-                    ],
-                    "name": "isApprovedForAll",
-                    "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [
-                        {"internalType": "address", "name": "from", "type": "address"},
-                        {"internalType": "address", "name": "to", "type": "address"},
-                        {"internalType": "uint256", "name": "tokenId", "type": "uint256"}
-                    ],
-                    "name": "transferFrom",
-                    "outputs": [],
-                    "stateMutability": "nonpayable",
-                    "type": "function"
-                },
-                # Custom Land Registry Functions
-                {
-                    "inputs": [
-                        {"internalType": "string", "name": "_propertyId", "type": "string"},
-                        {"internalType": "address", "name": "_owner", "type": "address"},
-                        {"internalType": "string", "name": "_location", "type": "string"},
-                        {"internalType": "uint256", "name": "_area", "type": "uint256"},
-                        {"internalType": "string", "name": "_propertyType", "type": "string"},
-                        {"internalType": "string", "name": "_ipfsHash", "type": "string"},
-                        {"internalType": "uint256", "name": "_latitude", "type": "uint256"},
-                        {"internalType": "uint256", "name": "_longitude", "type": "uint256"}
-                    ],
-                    "name": "registerLand",
-                    "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
-                    "stateMutability": "nonpayable",
-                    "type": "function"
-                },
-                {
-                    "inputs": [
-                        {"internalType": "uint256", "name": "_tokenId", "type": "uint256"},
-                        {"internalType": "address", "name": "_to", "type": "address"},
-                        {"internalType": "uint256", "name": "_price", "type": "uint256"}
-                    ],
-                    "name": "transferLand",
-                    "outputs": [],
-                    "stateMutability": "nonpayable",
-                    "type": "function"
-                },
-                {
-                    "inputs": [{"internalType": "uint256", "name": "_tokenId", "type": "uint256"}],
-                    "name": "getLandDetails",
-                    "outputs": [
-                        {
-                            "components": [
-                                {"internalType": "uint256", "name": "id", "type": "uint256"},
-                                {"internalType": "string", "name": "propertyId", "type": "string"},
-                                {"internalType": "address", "name": "owner", "type": "address"},
-                                {"internalType": "string", "name": "location", "type": "string"},
-                                {"internalType": "uint256", "name": "area", "type": "uint256"},
-                                {"internalType": "string", "name": "propertyType", "type": "string"},
-                                {"internalType": "uint256", "name": "registrationDate", "type": "uint256"},
-                                {"internalType": "bool", "name": "isVerified", "type": "bool"},
-                                {"internalType": "string", "name": "ipfsHash", "type": "string"},
-                                {"internalType": "uint256", "name": "latitude", "type": "uint256"},
-                                {"internalType": "uint256", "name": "longitude", "type": "uint256"}
-                            ],
-                            "internalType": "struct LandRegistry.Land",
-                            "name": "",
-                            "type": "tuple"
-                        }
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [],
-                    "name": "totalSupply",
-                    "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-            ]
+        # Contract ABI is parsed once per process and shared by every instance
+        self.contract_abi = load_contract_abi()
         
         # Initialize contract
         if self.contract_address and self.w3:
@@ -191,6 +413,26 @@ class BlockchainService:
             self.contract = None
             print("Contract not initialized - missing address or Web3 instance")
     
+    def rpc_pool_stats(self) -> List[Dict[str, Any]]:
+        """Connection pool counters (new vs. reused connections) of the RPC session"""
+        if self.w3 and hasattr(self.w3.provider, 'pool_stats'):
+            return self.w3.provider.pool_stats()
+        return []
+
+    def rpc_endpoint_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """Per-endpoint routing statistics when several RPC URLs are configured"""
+        if self.w3 and isinstance(self.w3.provider, MultiEndpointProvider):
+            return self.w3.provider.stats()
+        return None
+
+    def rpc_recording_stats(self) -> Optional[Dict[str, Any]]:
+        """Counters of the RPC recorder or replay provider, when one is active"""
+        if self.rpc_recorder:
+            return self.rpc_recorder.stats()
+        if self.w3 and isinstance(self.w3.provider, ReplayProvider):
+            return self.w3.provider.stats()
+        return None
+
     def is_connected(self) -> bool:
         """Check if connected to blockchain"""
         try:
@@ -198,10 +440,8 @@ class BlockchainService:
                 print("Web3 instance not initialized")
                 return False
             
-            # Use a more reliable connection test
-            latest_block = self.w3.eth.get_block('latest')
-            print(f"Successfully retrieved latest block: {latest_block.number}")
-            return latest_block is not None
+            # eth_blockNumber is the cheapest call that proves the node answers
+            return self.w3.eth.block_number is not None
         except Exception as e:
             print(f"Blockchain connection error: {e}")
             return False
@@ -243,250 +483,451 @@ class BlockchainService:
         except:
             return None
     
-    def register_land_on_blockchain(self, land_data: Dict[str, Any]) -> Optional[str]:
-        """Register land on blockchain"""
+    def build_registration_transaction(self, land_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build (but do not sign) the registerLand transaction for land_data"""
+        if not self.contract:
+            raise Exception("Contract not initialized")
+        
+        print(f"Registering land on blockchain: {land_data}")
+        
+        account = self.w3.eth.account.from_key(self.private_key)
+        
+        # Ensure all required fields are present and valid
+        property_id = str(land_data['property_id'])
+        # Use backend account as blockchain owner for easier transfers
+        backend_account = self.w3.eth.account.from_key(self.private_key)
+        owner_wallet = backend_account.address  # Backend owns on blockchain
+        user_wallet = str(land_data['owner_wallet'])  # Original user wallet for reference
+        
+        print(f"🔄 Registering with backend ownership model:")
+        print(f"   Blockchain owner: {owner_wallet} (backend)")
+        print(f"   Logical owner: {user_wallet} (user - tracked in database)")
+        
+        location = str(land_data['location'])
+        area = int(float(land_data['area']))
+        property_type = str(land_data['property_type'])
+        ipfs_hash = str(land_data.get('ipfs_hash', ''))
+        
+        # Handle coordinates - use default values if None or invalid
         try:
-            if not self.contract:
-                raise Exception("Contract not initialized")
+            latitude = int(float(land_data.get('latitude', 40.7128)) * 1000000)
+        except (ValueError, TypeError):
+            latitude = int(40.7128 * 1000000)  # Default to NYC coordinates
             
-            print(f"Registering land on blockchain: {land_data}")
-            
-            account = self.w3.eth.account.from_key(self.private_key)
-            
-            # Ensure all required fields are present and valid
-            property_id = str(land_data['property_id'])
-            # Use backend account as blockchain owner for easier transfers
-            backend_account = self.w3.eth.account.from_key(self.private_key)
-            owner_wallet = backend_account.address  # Backend owns on blockchain
-            user_wallet = str(land_data['owner_wallet'])  # Original user wallet for reference
-            
-            print(f"🔄 Registering with backend ownership model:")
-            print(f"   Blockchain owner: {owner_wallet} (backend)")
-            print(f"   Logical owner: {user_wallet} (user - tracked in database)")
-            
-            location = str(land_data['location'])
-            area = int(float(land_data['area']))
-            property_type = str(land_data['property_type'])
-            ipfs_hash = str(land_data.get('ipfs_hash', ''))
-            
-            # Handle coordinates - use default values if None or invalid
-            try:
-                latitude = int(float(land_data.get('latitude', 40.7128)) * 1000000)
-            except (ValueError, TypeError):
-                latitude = int(40.7128 * 1000000)  # Default to NYC coordinates
-                
-            try:
-                longitude = int(float(land_data.get('longitude', -74.0060)) * 1000000)
-            except (ValueError, TypeError):
-                longitude = int(-74.0060 * 1000000)  # Default to NYC coordinates
-            
-            print(f"Prepared data - Property ID: {property_id}, Backend Owner: {owner_wallet}, Area: {area}")
-            print(f"   User wallet for reference: {user_wallet}")
-            print(f"Coordinates: lat={latitude}, lng={longitude}")
-            
-            # Validate user wallet address format (for reference)
-            if not user_wallet.startswith('0x') or len(user_wallet) != 42:
-                print(f"⚠️ Warning: Invalid user wallet format: {user_wallet}")
-            
-            # Backend wallet is always valid since we generated it
-            print(f"✅ Using backend wallet as blockchain owner: {owner_wallet}")
-            
-            # Convert integers to proper uint256 format by ensuring they're positive
-            area_uint = max(0, area)
-            latitude_uint = max(0, latitude + 180000000)  # Shift to make positive
-            longitude_uint = max(0, longitude + 180000000)  # Shift to make positive
-            
-            print(f"Converted to uint256 - Area: {area_uint}, Lat: {latitude_uint}, Lng: {longitude_uint}")
-            
-            # Build transaction
-            transaction = self.contract.functions.registerLand(
-                property_id,
-                Web3.to_checksum_address(owner_wallet),
-                location,
-                area_uint,  # Converted to uint256
-                property_type,
-                ipfs_hash,
-                latitude_uint,  # Converted to uint256
-                longitude_uint  # Converted to uint256
-            ).build_transaction({
-                'chainId': self.chain_id,
-                'gas': 2000000,
-                'gasPrice': self.w3.to_wei('30', 'gwei'),
-                'nonce': self.w3.eth.get_transaction_count(account.address),
-            })
+        try:
+            longitude = int(float(land_data.get('longitude', -74.0060)) * 1000000)
+        except (ValueError, TypeError):
+            longitude = int(-74.0060 * 1000000)  # Default to NYC coordinates
+        
+        print(f"Prepared data - Property ID: {property_id}, Backend Owner: {owner_wallet}, Area: {area}")
+        print(f"   User wallet for reference: {user_wallet}")
+        print(f"Coordinates: lat={latitude}, lng={longitude}")
+        
+        # Validate user wallet address format (for reference)
+        if not user_wallet.startswith('0x') or len(user_wallet) != 42:
+            print(f"⚠️ Warning: Invalid user wallet format: {user_wallet}")
+        
+        # Backend wallet is always valid since we generated it
+        print(f"✅ Using backend wallet as blockchain owner: {owner_wallet}")
+        
+        # Convert integers to proper uint256 format by ensuring they're positive
+        area_uint = max(0, area)
+        latitude_uint = max(0, latitude + 180000000)  # Shift to make positive
+        longitude_uint = max(0, longitude + 180000000)  # Shift to make positive
+        
+        print(f"Converted to uint256 - Area: {area_uint}, Lat: {latitude_uint}, Lng: {longitude_uint}")
+        
+        # Build transaction
+        register_call = self.contract.functions.registerLand(
+            property_id,
+            Web3.to_checksum_address(owner_wallet),
+            location,
+            area_uint,  # Converted to uint256
+            property_type,
+            ipfs_hash,
+            latitude_uint,  # Converted to uint256
+            longitude_uint  # Converted to uint256
+        )
+        return register_call.build_transaction(self.gas_strategy.transaction_params(register_call))
+    
+    def register_land_on_blockchain(self, land_data: Dict[str, Any], wait: bool = True,
+                                    on_settled: Optional[Callable] = None,
+                                    job_context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Register land on blockchain.
+
+        With wait=False the transaction is only broadcast and a pending handle
+        (tx_hash + job_id) is returned; the receipt resolver calls on_settled
+        once the transaction is mined. job_context is stored on the job.
+        """
+        try:
+            transaction = self.build_registration_transaction(land_data)
             
             print(f"Transaction prepared, signing...")
-            
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            print(f"Transaction signed, sending...")
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            print(f"Transaction sent: {tx_hash.hex()}")
-            
+
+            tx_hash = self._sign_and_send(transaction)
+
+            if not wait:
+                # Hand the receipt over to the block-driven resolver
+                return self.receipt_resolver.submit(
+                    tx_hash,
+                    kind='register_land',
+                    parse_receipt=self._parse_registration_receipt,
+                    on_settled=on_settled,
+                    context=job_context
+                )
+
             # Wait for transaction receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-            
+            receipt = self.wait_for_receipt(tx_hash)
+
             print(f"Transaction mined in block: {receipt.blockNumber}")
-            
-            if receipt.status == 1:
-                # Parse events to get token ID
-                try:
-                    logs = self.contract.events.LandRegistered().process_receipt(receipt)
-                    if logs:
-                        token_id = logs[0]['args']['tokenId']
-                        print(f"Land registered with token ID: {token_id}")
-                        return {
-                            'tx_hash': receipt.transactionHash.hex(),
-                            'token_id': token_id,
-                            'block_number': receipt.blockNumber
-                        }
-                except Exception as e:
-                    print(f"Could not parse event logs: {e}")
-                    # Return basic success info even if event parsing fails
-                    return {
-                        'tx_hash': receipt.transactionHash.hex(),
-                        'token_id': None,
-                        'block_number': receipt.blockNumber
-                    }
-            else:
-                print(f"Transaction failed with status: {receipt.status}")
-                return None
-            
-            return None
-            
+
+            return self._parse_registration_receipt(receipt)
+
+        except TransactionRevertedError:
+            raise
         except Exception as e:
             print(f"Error registering land on blockchain: {str(e)}")
             return None
-    
-    def transfer_land_on_blockchain(self, token_id: int, to_address: str, price: float, from_address: str = None) -> Optional[str]:
-        """Transfer land on blockchain with proper ownership verification"""
+
+    def _function_name(self, transaction: Dict[str, Any]) -> Optional[str]:
+        """Contract function a built transaction calls, None for plain transfers"""
         try:
-            if not self.contract:
-                raise Exception("Contract not initialized")
-            
-            print(f"Initiating blockchain transfer for token {token_id} to {to_address}")
-            
+            function, _ = self.contract.decode_function_input(transaction.get('data'))
+            return function.fn_name
+        except Exception:
+            return None
+
+    def simulate_transaction(self, transaction: Dict[str, Any]):
+        """Dry-run a built transaction with eth_call against 'pending'.
+
+        Raises TransactionRevertedError with the decoded reason if it would
+        revert; other errors (node down, deadline) propagate unchanged.
+        """
+        if not simulation_enabled():
+            return
+        call = {key: transaction[key] for key in ('from', 'to', 'data', 'value', 'gas') if key in transaction}
+        call.setdefault('from', self.get_backend_address())
+        try:
+            self.w3.eth.call(call, 'pending')
+        except ContractLogicError as e:
+            self.simulation_rejects += 1
+            reverted = decode_revert(e, self.contract.abi if self.contract else None, self._function_name(transaction))
+            print(f"🧪 Simulation rejected transaction: {reverted}")
+            raise reverted
+
+    def sign_transaction(self, transaction: Dict[str, Any], nonce: Optional[int] = None) -> Dict[str, Any]:
+        """Simulate, assign a nonce (unless given) and sign a built transaction with the backend key (no broadcast)"""
+        # A doomed transaction is rejected before it takes a nonce
+        self.simulate_transaction(transaction)
+
+        transaction = dict(transaction)
+        transaction['nonce'] = nonce if nonce is not None else self.nonce_manager.allocate()
+
+        signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
+
+        print(f"Transaction signed with nonce {transaction['nonce']}")
+        return {
+            'raw_tx': Web3.to_hex(signed_txn.rawTransaction),
+            'tx_hash': Web3.to_hex(signed_txn.hash),
+            'nonce': transaction['nonce']
+        }
+
+    def broadcast_raw_transaction(self, raw_tx, release_nonce: Optional[int] = None):
+        """Broadcast a signed transaction.
+
+        A nonce error realigns the nonce counter with the chain. Any other
+        failure (timeout, node down) leaves the counter alone; pass the nonce
+        of a freshly signed transaction as release_nonce to give it back then.
+        """
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+        except Exception as e:
+            if is_nonce_error(e):
+                self.nonce_manager.resync(reason=str(e))
+            elif release_nonce is not None:
+                self.nonce_manager.release(release_nonce, reason=str(e))
+            raise
+
+        print(f"Transaction sent: {Web3.to_hex(tx_hash)}")
+        # Watched so it can be fee-bumped if it gets stuck in the mempool
+        self.tx_accelerator.track(tx_hash, raw_tx, current_app._get_current_object() if has_app_context() else None)
+        return tx_hash
+
+    def get_transaction_receipt(self, tx_hash):
+        """Receipt of tx_hash or of whichever fee-bumped replacement of it was mined"""
+        tx_hash = Web3.to_hex(tx_hash) if isinstance(tx_hash, (bytes, bytearray)) else tx_hash
+        for candidate in reversed(self.tx_accelerator.chain_of(tx_hash)):
+            try:
+                return self.w3.eth.get_transaction_receipt(candidate)
+            except TransactionNotFound:
+                continue
+        raise TransactionNotFound(f"Transaction with hash {tx_hash} not found")
+
+    def wait_for_receipt(self, tx_hash, timeout: float = 120, poll_latency: float = 0.1):
+        """wait_for_transaction_receipt that follows replacements and the request deadline"""
+        tx_hash = Web3.to_hex(tx_hash) if isinstance(tx_hash, (bytes, bytearray)) else tx_hash
+        deadline = time.monotonic() + clamp_timeout(timeout)
+        while True:
+            try:
+                return self.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+            time.sleep(poll_latency)
+
+    def build_anchor_transaction(self, merkle_root: bytes) -> Dict[str, Any]:
+        """Zero-value transaction to the backend account carrying ANCHOR_PREFIX + Merkle root as calldata"""
+        backend_address = self.get_backend_address()
+        transaction = {
+            'from': backend_address,
+            'to': backend_address,
+            'value': 0,
+            'data': Web3.to_hex(ANCHOR_PREFIX + merkle_root),
+            'chainId': self.chain_id,
+        }
+        transaction['gas'] = self.w3.eth.estimate_gas(transaction)
+        transaction.update(self.gas_strategy.fee_params())
+        return transaction
+
+    def anchor_merkle_root(self, merkle_root: bytes, on_signed: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
+        """Commit a Merkle root on chain and wait for it to be mined.
+
+        on_signed(tx_hash) runs before broadcast so the caller can persist the
+        hash. Returns {'tx_hash', 'block_number'} or None on failure.
+        """
+        try:
+            signed = self.sign_transaction(self.build_anchor_transaction(merkle_root))
+            if on_signed:
+                on_signed(signed['tx_hash'])
+            tx_hash = self.broadcast_raw_transaction(signed['raw_tx'], release_nonce=signed['nonce'])
+            receipt = self.wait_for_receipt(tx_hash)
+            if receipt.status != 1:
+                print(f"❌ Anchor transaction {signed['tx_hash']} reverted")
+                return None
+            print(f"⚓ Merkle root {Web3.to_hex(merkle_root)} anchored in block {receipt.blockNumber}")
+            return {'tx_hash': signed['tx_hash'], 'block_number': receipt.blockNumber}
+        except Exception as e:
+            print(f"Error anchoring Merkle root: {str(e)}")
+            return None
+
+    def get_anchored_root(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Read back the root committed by an anchor transaction (None if not a mined anchor)"""
+        try:
+            transaction = self.w3.eth.get_transaction(tx_hash)
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except Exception as e:
+            print(f"Error reading anchor transaction {tx_hash}: {str(e)}")
+            return None
+
+        # eth-tester reports calldata as 'data', nodes as 'input'
+        data = bytes(HexBytes(transaction.get('input', transaction.get('data', b''))))
+        if receipt.status != 1 or not data.startswith(ANCHOR_PREFIX):
+            return None
+        return {
+            'merkle_root': Web3.to_hex(data[len(ANCHOR_PREFIX):]),
+            'from': transaction['from'],
+            'block_number': receipt.blockNumber
+        }
+
+    def register_lands_pipelined(self, items: List[Tuple[Any, Dict[str, Any]]],
+                                 on_result: Optional[Callable] = None,
+                                 window: int = None) -> List[Dict[str, Any]]:
+        """Register many lands keeping a window of transactions in flight (see app.chain_pipeline)"""
+        from app.chain_pipeline import RegistrationPipeline
+        return RegistrationPipeline(self, window=window).run(items, on_result=on_result)
+
+    def _sign_and_send(self, transaction: Dict[str, Any]):
+        """Assign a nonce, sign a built transaction with the backend key and broadcast it"""
+        signed = self.sign_transaction(transaction)
+        return self.broadcast_raw_transaction(signed['raw_tx'], release_nonce=signed['nonce'])
+
+    @property
+    def nonce_manager(self) -> NonceManager:
+        """Process-wide nonce allocator for the backend signing account"""
+        if self._nonce_manager is None:
             account = self.w3.eth.account.from_key(self.private_key)
-            backend_address = account.address
-            
-            # Get current owner of the token
+            state_path = self.local_chain.nonce_state_path if self.local_chain else None
+            self._nonce_manager = NonceManager(self.w3, account.address, state_path)
+        return self._nonce_manager
+
+    def _parse_registration_receipt(self, receipt) -> Optional[Dict[str, Any]]:
+        """Turn a registerLand receipt into the registration result dict"""
+        if receipt.status == 1:
+            self._invalidate_reads_for_receipt(receipt)
+
+            # Parse events to get token ID
             try:
-                current_owner = self.contract.functions.ownerOf(token_id).call()
-                print(f"Current token owner: {current_owner}")
-                print(f"Backend account: {backend_address}")
+                logs = self.contract.events.LandRegistered().process_receipt(receipt)
+                if logs:
+                    token_id = logs[0]['args']['tokenId']
+                    print(f"Land registered with token ID: {token_id}")
+                    return {
+                        'tx_hash': receipt.transactionHash.hex(),
+                        'token_id': token_id,
+                        'block_number': receipt.blockNumber
+                    }
             except Exception as e:
-                print(f"Error getting token owner: {e}")
-                return None
-            
-            # Validate addresses
-            to_address_checksum = Web3.to_checksum_address(to_address)
-            current_owner_checksum = Web3.to_checksum_address(current_owner)
-            
-            # Convert price to wei (assuming price is in MATIC)
-            price_wei = self.w3.to_wei(price, 'ether')
-            
-            print(f"Transfer details: Token {token_id}, From: {current_owner_checksum}, To: {to_address_checksum}, Price: {price} MATIC ({price_wei} wei)")
-            
-            # Check if backend account is the owner or has approval
+                print(f"Could not parse event logs: {e}")
+                # Return basic success info even if event parsing fails
+                return {
+                    'tx_hash': receipt.transactionHash.hex(),
+                    'token_id': None,
+                    'block_number': receipt.blockNumber
+                }
+        else:
+            print(f"Transaction failed with status: {receipt.status}")
+            return None
+
+        return None
+    
+    def build_transfer_transaction(self, token_id: int, to_address: str, price: float,
+                                   from_address: str = None,
+                                   approval: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Build (but do not sign) the transfer transaction, or None if the backend may not transfer"""
+        if not self.contract:
+            raise Exception("Contract not initialized")
+        
+        print(f"Initiating blockchain transfer for token {token_id} to {to_address}")
+        
+        account = self.w3.eth.account.from_key(self.private_key)
+        backend_address = account.address
+        
+        # Reuse the caller's approval check when it covers this token,
+        # otherwise fetch owner and approvals in one batched round trip
+        if not approval or approval.get('token_id') != token_id or 'error' in approval:
+            approval = self.check_transfer_approval(token_id, from_address)
+        
+        if 'error' in approval:
+            print(f"Error checking ownership/approvals: {approval['error']}")
+            return None
+        
+        current_owner = approval['current_owner']
+        print(f"Current token owner: {current_owner}")
+        print(f"Backend account: {backend_address}")
+        
+        # Validate addresses
+        to_address_checksum = Web3.to_checksum_address(to_address)
+        current_owner_checksum = Web3.to_checksum_address(current_owner)
+        
+        # Convert price to wei (assuming price is in MATIC)
+        price_wei = self.w3.to_wei(price, 'ether')
+        
+        print(f"Transfer details: Token {token_id}, From: {current_owner_checksum}, To: {to_address_checksum}, Price: {price} MATIC ({price_wei} wei)")
+        
+        # Check if backend account is the owner or has approval
+        if approval['reason'] == 'backend_owns_token':
+            print("✅ Backend account owns the token, proceeding with direct transfer")
+        elif approval['can_transfer']:
+            print(f"Approved address for token: {approval.get('approved_address')}")
+            print(f"Is approved for all: {approval.get('is_approved_for_all')}")
+            print("✅ Backend account is approved to transfer this token")
+        else:
+            print("❌ Backend account is not authorized to transfer this token")
+            print("💡 The land owner needs to approve the backend account first")
+            return None
+        
+        # Build transaction - use transferFrom since we might not be the owner
+        try:
             if current_owner_checksum.lower() == backend_address.lower():
-                print("✅ Backend account owns the token, proceeding with direct transfer")
-                calling_account = backend_address
+                # We own the token, use transferLand
+                transfer_call = self.contract.functions.transferLand(
+                    token_id,
+                    to_address_checksum,
+                    price_wei
+                )
             else:
-                # Check if backend account is approved to transfer this token
-                try:
-                    approved_address = self.contract.functions.getApproved(token_id).call()
-                    is_approved_for_all = self.contract.functions.isApprovedForAll(current_owner, backend_address).call()
-                    
-                    print(f"Approved address for token: {approved_address}")
-                    print(f"Is approved for all: {is_approved_for_all}")
-                    
-                    if (approved_address and approved_address.lower() == backend_address.lower()) or is_approved_for_all:
-                        print("✅ Backend account is approved to transfer this token")
-                        calling_account = backend_address
-                    else:
-                        print("❌ Backend account is not authorized to transfer this token")
-                        print("💡 The land owner needs to approve the backend account first")
-                        return None
-                        
-                except Exception as e:
-                    print(f"Error checking approvals: {e}")
-                    return None
-            
-            # Build transaction - use transferFrom since we might not be the owner
-            try:
-                if current_owner_checksum.lower() == backend_address.lower():
-                    # We own the token, use transferLand
-                    transaction = self.contract.functions.transferLand(
-                        token_id,
-                        to_address_checksum,
-                        price_wei
-                    ).build_transaction({
-                        'chainId': self.chain_id,
-                        'gas': 2000000,
-                        'gasPrice': self.w3.to_wei('30', 'gwei'),
-                        'nonce': self.w3.eth.get_transaction_count(backend_address),
-                    })
-                else:
-                    # We're approved, use transferFrom (standard ERC721)
-                    transaction = self.contract.functions.transferFrom(
-                        current_owner_checksum,
-                        to_address_checksum,
-                        token_id
-                    ).build_transaction({
-                        'chainId': self.chain_id,
-                        'gas': 2000000,
-                        'gasPrice': self.w3.to_wei('30', 'gwei'),
-                        'nonce': self.w3.eth.get_transaction_count(backend_address),
-                    })
-                    
-                    print("⚠️ Using transferFrom instead of transferLand (no price/history recording)")
-                    
-            except Exception as e:
-                print(f"Error building transaction: {e}")
+                # We're approved, use transferFrom (standard ERC721)
+                transfer_call = self.contract.functions.transferFrom(
+                    current_owner_checksum,
+                    to_address_checksum,
+                    token_id
+                )
+                
+                print("⚠️ Using transferFrom instead of transferLand (no price/history recording)")
+
+            transaction = transfer_call.build_transaction(self.gas_strategy.transaction_params(transfer_call))
+                
+        except Exception as e:
+            print(f"Error building transaction: {e}")
+            return None
+        
+        return transaction
+    
+    def transfer_land_on_blockchain(self, token_id: int, to_address: str, price: float, from_address: str = None,
+                                    wait: bool = True, on_settled: Optional[Callable] = None,
+                                    approval: Optional[Dict[str, Any]] = None,
+                                    job_context: Optional[Dict[str, Any]] = None):
+        """Transfer land on blockchain with proper ownership verification.
+
+        Pass the result of check_transfer_approval as approval to skip reading
+        owner and approvals again. Returns the tx hash once mined, or a pending
+        resolver handle when wait=False (see register_land_on_blockchain).
+        """
+        try:
+            transaction = self.build_transfer_transaction(token_id, to_address, price, from_address, approval)
+            if not transaction:
                 return None
             
             print(f"Transaction built, signing...")
-            
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            print(f"Transaction signed, sending...")
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            print(f"Transaction sent: {tx_hash.hex()}")
-            
+
+            tx_hash = self._sign_and_send(transaction)
+
+            if not wait:
+                # Hand the receipt over to the block-driven resolver
+                return self.receipt_resolver.submit(
+                    tx_hash,
+                    kind='transfer_land',
+                    parse_receipt=self._parse_transfer_receipt,
+                    on_settled=on_settled,
+                    context=job_context
+                )
+
             # Wait for transaction receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-            
+            receipt = self.wait_for_receipt(tx_hash)
+
             print(f"Transaction mined in block: {receipt.blockNumber}")
-            
-            if receipt.status == 1:
-                print(f"✅ Land transfer successful! TX: {receipt.transactionHash.hex()}")
-                return receipt.transactionHash.hex()
-            else:
-                print(f"❌ Transaction failed with status: {receipt.status}")
-                # Try to get the revert reason
-                try:
-                    self.w3.eth.call({
-                        'to': receipt.to,
-                        'data': receipt.input
-                    }, receipt.blockNumber)
-                except Exception as revert_error:
-                    print(f"Revert reason: {revert_error}")
-                return None
-            
+
+            return self._parse_transfer_receipt(receipt)
+
+        except TransactionRevertedError:
+            raise
         except Exception as e:
             print(f"Error transferring land on blockchain: {str(e)}")
             import traceback
             traceback.print_exc()
             return None
-    
+
+    def _parse_transfer_receipt(self, receipt) -> Optional[str]:
+        """Turn a transfer receipt into the tx hash, or None if it reverted"""
+        if receipt.status == 1:
+            self._invalidate_reads_for_receipt(receipt)
+            print(f"✅ Land transfer successful! TX: {receipt.transactionHash.hex()}")
+            return receipt.transactionHash.hex()
+        else:
+            print(f"❌ Transaction failed with status: {receipt.status}")
+            # Replay it at its block for the revert reason (state may have changed since simulation)
+            try:
+                transaction = self.w3.eth.get_transaction(receipt.transactionHash)
+                self.w3.eth.call({
+                    'from': transaction['from'],
+                    'to': transaction['to'],
+                    'data': transaction.get('input', transaction.get('data'))
+                }, receipt.blockNumber)
+            except ContractLogicError as revert_error:
+                print(f"Revert reason: {decode_revert(revert_error, self.contract.abi)}")
+            except Exception as lookup_error:
+                print(f"Could not read revert reason: {lookup_error}")
+            return None
+
+    @property
+    def receipt_resolver(self):
+        """Shared block-driven resolver for transactions submitted with wait=False"""
+        if self._receipt_resolver is None:
+            from app.block_watcher import ReceiptResolver
+            self._receipt_resolver = ReceiptResolver(self)
+        return self._receipt_resolver
+
     def get_backend_address(self) -> str:
         """Get the backend account address"""
         try:
@@ -496,8 +937,14 @@ class BlockchainService:
             print(f"Error getting backend address: {e}")
             return None
     
-    def check_transfer_approval(self, token_id: int, owner_address: str) -> Dict[str, Any]:
-        """Check if backend account can transfer the token"""
+    def check_transfer_approval(self, token_id: int, owner_address: str = None) -> Dict[str, Any]:
+        """Check if backend account can transfer the token.
+
+        ownerOf, getApproved and isApprovedForAll are fetched in a single
+        batched round trip. owner_address (the owner we expect from the
+        database) is used for the isApprovedForAll lookup; only if the chain
+        disagrees is a second call made for the actual owner.
+        """
         try:
             if not self.contract:
                 return {"error": "Contract not initialized"}
@@ -506,86 +953,343 @@ class BlockchainService:
             if not backend_address:
                 return {"error": "Backend account not available"}
             
-            # Get current owner
-            current_owner = self.contract.functions.ownerOf(token_id).call()
+            calls = [('ownerOf', (token_id,)), ('getApproved', (token_id,))]
+            expected_owner = None
+            if owner_address and Web3.is_address(owner_address):
+                expected_owner = Web3.to_checksum_address(owner_address)
+                calls.append(('isApprovedForAll', (expected_owner, backend_address)))
+            
+            results = self.batch_call(calls)
+            for result in results[:2]:
+                if isinstance(result, Exception):
+                    raise result
+            
+            current_owner, approved_address = results[0], results[1]
+            status = {
+                "token_id": token_id,
+                "backend_address": backend_address,
+                "current_owner": current_owner,
+                "approved_address": approved_address
+            }
             
             # Check if backend is the owner
             if current_owner.lower() == backend_address.lower():
-                return {
-                    "can_transfer": True,
-                    "reason": "backend_owns_token",
-                    "backend_address": backend_address,
-                    "current_owner": current_owner
-                }
+                return {**status, "can_transfer": True, "reason": "backend_owns_token"}
             
             # Check specific approval for this token
-            approved_address = self.contract.functions.getApproved(token_id).call()
             if approved_address and approved_address.lower() == backend_address.lower():
-                return {
-                    "can_transfer": True,
-                    "reason": "token_approved",
-                    "backend_address": backend_address,
-                    "current_owner": current_owner,
-                    "approved_address": approved_address
-                }
+                return {**status, "can_transfer": True, "reason": "token_approved"}
             
             # Check approval for all tokens
-            is_approved_for_all = self.contract.functions.isApprovedForAll(current_owner, backend_address).call()
+            if expected_owner and expected_owner.lower() == current_owner.lower() \
+                    and not isinstance(results[2], Exception):
+                is_approved_for_all = results[2]
+            else:
+                is_approved_for_all = self.contract.functions.isApprovedForAll(current_owner, backend_address).call()
+            status["is_approved_for_all"] = is_approved_for_all
+            
             if is_approved_for_all:
-                return {
-                    "can_transfer": True,
-                    "reason": "approved_for_all",
-                    "backend_address": backend_address,
-                    "current_owner": current_owner
-                }
+                return {**status, "can_transfer": True, "reason": "approved_for_all"}
             
             # No approval found
-            return {
-                "can_transfer": False,
-                "reason": "not_approved",
-                "backend_address": backend_address,
-                "current_owner": current_owner,
-                "needs_approval": True
-            }
+            return {**status, "can_transfer": False, "reason": "not_approved", "needs_approval": True}
             
         except Exception as e:
             return {"error": f"Error checking approval: {str(e)}"}
 
+    def batch_request(self, requests_: List[Tuple[str, list]]) -> List[Dict[str, Any]]:
+        """Send several JSON-RPC requests in one HTTP round trip.
+
+        Returns the raw responses (each with 'result' or 'error') in request
+        order. Falls back to one request at a time when the provider is not
+        HTTP or the node rejects batches.
+        """
+        if not requests_:
+            return []
+        
+        provider = self.w3.provider
+        if isinstance(provider, (MultiEndpointProvider, Web3.HTTPProvider)):
+            payload = [
+                {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                for i, (method, params) in enumerate(requests_)
+            ]
+            try:
+                started = time.perf_counter()
+                with self.circuit_breaker.guard():
+                    if hasattr(provider, 'make_batch_request'):
+                        responses = provider.make_batch_request(payload)
+                    else:
+                        responses = json.loads(make_post_request(
+                            provider.endpoint_uri,
+                            json.dumps(payload).encode(),
+                            **provider.get_request_kwargs()
+                        ))
+                if isinstance(responses, list) and len(responses) == len(payload):
+                    responses = sorted(responses, key=lambda response: response.get('id', 0))
+                    if self.rpc_recorder:
+                        # Batches bypass the middleware; replay serves them one call at a time
+                        share_ms = (time.perf_counter() - started) * 1000 / len(responses)
+                        for (method, params), response in zip(requests_, responses):
+                            self.rpc_recorder.record(method, params, response, share_ms, batch=True)
+                    return responses
+                print(f"⚠️ RPC node rejected batch request, falling back to sequential calls")
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                print(f"⚠️ Batch request failed ({e}), falling back to sequential calls")
+        
+        # Provider-level middlewares only (retries; eth-tester's node-shaped responses)
+        make_request = provider.request_func(self.w3, NamedElementOnion([]))
+        responses = []
+        for method, params in requests_:
+            try:
+                started = time.perf_counter()
+                with self.circuit_breaker.guard():
+                    response = make_request(method, params)
+                if self.rpc_recorder:
+                    self.rpc_recorder.record(method, params, response, (time.perf_counter() - started) * 1000)
+                responses.append(response)
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                responses.append({'error': {'message': str(e)}})
+        return responses
+
+    def batch_call(self, calls: List[Tuple[str, tuple]], block_identifier='latest') -> List[Any]:
+        """Run several contract view functions in a single round trip.
+
+        calls is a list of (function_name, args). Each result is the decoded
+        return value (as .call() would return it) or the Exception raised for
+        that call, including calls that cannot be encoded (e.g. a function
+        missing from the loaded ABI); those are never sent.
+        """
+        if not self.contract:
+            raise Exception("Contract not initialized")
+        
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        
+        results: List[Any] = [None] * len(calls)
+        requests_ = []
+        sent = []  # (index, fn_name, output types) of each request
+        for index, (fn_name, args) in enumerate(calls):
+            try:
+                data = self.contract.encodeABI(fn_name=fn_name, args=list(args))
+                fn_abi = self.contract.get_function_by_name(fn_name).abi
+            except Exception as e:
+                results[index] = e
+                continue
+            requests_.append(('eth_call', [{'to': self.contract.address, 'data': data}, block_identifier]))
+            sent.append((index, fn_name, get_abi_output_types(fn_abi)))
+        
+        responses = self.batch_request(requests_) if requests_ else []
+        for (index, fn_name, types), response in zip(sent, responses):
+            if response.get('error'):
+                error = response['error']
+                message = error.get('message') if isinstance(error, dict) else str(error)
+                results[index] = ContractLogicError(f"{fn_name}: {message}")
+                continue
+            try:
+                decoded = decode(types, HexBytes(response['result']))
+                decoded = map_abi_data(BASE_RETURN_NORMALIZERS, types, decoded)
+                results[index] = decoded[0] if len(decoded) == 1 else tuple(decoded)
+            except Exception as e:
+                results[index] = ContractLogicError(f"{fn_name}: could not decode result ({e})")
+        return results
+
+    @property
+    def block_watcher(self):
+        """Shared chain-head poller that drives the resolver and the read cache"""
+        if self._block_watcher is None:
+            from app.block_watcher import BlockWatcher
+            self._block_watcher = BlockWatcher(self)
+        return self._block_watcher
+
+    @property
+    def tx_accelerator(self):
+        """Fee-bumps transactions stuck in the mempool (see app.tx_accelerator)"""
+        if self._tx_accelerator is None:
+            from app.tx_accelerator import TxAccelerator
+            self._tx_accelerator = TxAccelerator(self)
+        return self._tx_accelerator
+
+    @property
+    def read_cache(self):
+        """Block-scoped cache for contract view calls"""
+        if self._read_cache is None:
+            from app.chain_cache import BlockScopedCache
+            self._read_cache = BlockScopedCache()
+            self.block_watcher.add_listener(self._read_cache.on_new_block)
+        return self._read_cache
+
+    @property
+    def gas_strategy(self):
+        """Fee and gas limit policy for contract writes (GAS_STRATEGY)"""
+        if self._gas_strategy is None:
+            from app.gas_strategy import make_gas_strategy
+            self._gas_strategy = make_gas_strategy(self)
+        return self._gas_strategy
+
+    @property
+    def status_sampler(self):
+        """Background sampler serving connectivity, balance and supply snapshots"""
+        if self._status_sampler is None:
+            from app.chain_status import ChainStatusSampler
+            self._status_sampler = ChainStatusSampler(self)
+        return self._status_sampler
+
+    def _cached_call(self, fn_name: str, *args):
+        """Call a contract view function through the block-scoped cache"""
+        return self.read_cache.get_or_load(
+            fn_name, args, lambda: getattr(self.contract.functions, fn_name)(*args).call()
+        )
+
+    def _invalidate_reads_for_receipt(self, receipt):
+        """Drop cached reads touched by one of our confirmed writes"""
+        token_ids = set()
+        for event in (self.contract.events.LandRegistered(), self.contract.events.LandTransferred()):
+            try:
+                token_ids.update(log['args']['tokenId'] for log in event.process_receipt(receipt, errors=DISCARD))
+            except Exception:
+                pass
+        if token_ids:
+            for token_id in token_ids:
+                self.read_cache.invalidate_token(token_id)
+        else:
+            self.read_cache.invalidate()
+
     def get_land_details_from_blockchain(self, token_id: int) -> Optional[Dict[str, Any]]:
         """Get land details from blockchain"""
         try:
             if not self.contract:
                 return None
             
-            land_data = self.contract.functions.getLandDetails(token_id).call()
+            land_data = self._cached_call('getLandDetails', token_id)
             
-            return {
-                'id': land_data[0],
-                'property_id': land_data[1],
-                'owner': land_data[2],
-                'location': land_data[3],
-                'area': land_data[4],
-                'property_type': land_data[5],
-                'registration_date': land_data[6],
-                'is_verified': land_data[7],
-                'ipfs_hash': land_data[8],
-                'latitude': land_data[9] / 1000000,  # Convert back to decimal
-                'longitude': land_data[10] / 1000000  # Convert back to decimal
-            }
+            return self._land_details_to_dict(land_data)
             
         except Exception as e:
             print(f"Error getting land details from blockchain: {str(e)}")
             return None
     
+    @staticmethod
+    def _land_details_to_dict(land_data) -> Dict[str, Any]:
+        """Decode a LandRegistry.Land tuple"""
+        return {
+            'id': land_data[0],
+            'property_id': land_data[1],
+            'owner': land_data[2],
+            'location': land_data[3],
+            'area': land_data[4],
+            'property_type': land_data[5],
+            'registration_date': land_data[6],
+            'is_verified': land_data[7],
+            'ipfs_hash': land_data[8],
+            'latitude': land_data[9] / 1000000,  # Convert back to decimal
+            'longitude': land_data[10] / 1000000  # Convert back to decimal
+        }
+    
+    def get_land_details_many(self, token_ids: List[int], chunk_size: int = None,
+                              max_workers: int = None) -> List[Dict[str, Any]]:
+        """Get land details for many tokens with batched eth_calls.
+
+        Ids are split into chunks of LAND_DETAILS_BATCH_SIZE, each chunk is one
+        JSON-RPC batch, and up to LAND_DETAILS_CONCURRENCY chunks run at once.
+        All chunks read the same block. Returns one entry per id, in order:
+        {'token_id', 'land' (dict or None), 'error' (str or None)}.
+        """
+        token_ids = list(token_ids)
+        if not token_ids:
+            return []
+        if not self.contract:
+            return [{'token_id': token_id, 'land': None, 'error': 'Contract not initialized'} for token_id in token_ids]
+        
+        chunk_size = chunk_size or int(os.getenv('LAND_DETAILS_BATCH_SIZE', 100))
+        max_workers = max_workers or int(os.getenv('LAND_DETAILS_CONCURRENCY', 4))
+        chunks = [token_ids[i:i + chunk_size] for i in range(0, len(token_ids), chunk_size)]
+        
+        try:
+            block_number = self.w3.eth.block_number
+        except Exception as e:
+            return [{'token_id': token_id, 'land': None, 'error': str(e)} for token_id in token_ids]
+        
+        def read_chunk(chunk):
+            try:
+                return self.batch_call([('getLandDetails', (token_id,)) for token_id in chunk], block_number)
+            except Exception as e:
+                return [e] * len(chunk)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            # Each worker runs in a copy of the caller's context so its rpc_deadline applies
+            futures = [executor.submit(contextvars.copy_context().run, read_chunk, chunk) for chunk in chunks]
+            chunk_results = [future.result() for future in futures]
+        
+        results = []
+        for chunk, raw_results in zip(chunks, chunk_results):
+            for token_id, raw in zip(chunk, raw_results):
+                if isinstance(raw, Exception):
+                    results.append({'token_id': token_id, 'land': None, 'error': str(raw)})
+                else:
+                    results.append({'token_id': token_id, 'land': self._land_details_to_dict(raw), 'error': None})
+        return results
+    
+    def get_receipts_many(self, tx_hashes: List[str], chunk_size: int = None,
+                          max_workers: int = None) -> List[Dict[str, Any]]:
+        """Fetch many transaction receipts with batched requests.
+
+        Hashes are split into chunks of RECEIPT_BATCH_SIZE, each chunk is one
+        JSON-RPC batch and up to RECEIPT_CONCURRENCY chunks run at once.
+        Returns one entry per hash, in order: {'tx_hash', 'receipt'
+        (AttributeDict, None if not mined), 'error' (str or None)}.
+        """
+        tx_hashes = list(tx_hashes)
+        if not tx_hashes:
+            return []
+        chunk_size = chunk_size or int(os.getenv('RECEIPT_BATCH_SIZE', 100))
+        max_workers = max_workers or int(os.getenv('RECEIPT_CONCURRENCY', 4))
+        chunks = [tx_hashes[i:i + chunk_size] for i in range(0, len(tx_hashes), chunk_size)]
+
+        def read_chunk(chunk):
+            try:
+                return self.batch_request([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in chunk])
+            except Exception as e:
+                return [{'error': {'message': str(e)}}] * len(chunk)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, read_chunk, chunk) for chunk in chunks]
+            chunk_responses = [future.result() for future in futures]
+
+        results = []
+        for chunk, responses in zip(chunks, chunk_responses):
+            for tx_hash, response in zip(chunk, responses):
+                if response.get('error'):
+                    results.append({'tx_hash': tx_hash, 'receipt': None, 'error': response['error'].get('message')})
+                elif response.get('result'):
+                    receipt = AttributeDict.recursive(receipt_formatter(response['result']))
+                    results.append({'tx_hash': tx_hash, 'receipt': receipt, 'error': None})
+                else:
+                    results.append({'tx_hash': tx_hash, 'receipt': None, 'error': None})
+        return results
+
+    def get_owner_of(self, token_id: int) -> Optional[str]:
+        """Get the current on-chain owner of a land token"""
+        try:
+            if not self.contract:
+                return None
+            
+            return self._cached_call('ownerOf', token_id)
+            
+        except Exception as e:
+            print(f"Error getting token owner: {str(e)}")
+            return None
+    
     def get_lands_by_owner(self, owner_address: str) -> list:
         """Get all lands owned by an address"""
         try:
             if not self.contract:
                 return []
             
-            token_ids = self.contract.functions.getLandsByOwner(
-                Web3.to_checksum_address(owner_address)
-            ).call()
+            token_ids = self._cached_call('getLandsByOwner', Web3.to_checksum_address(owner_address))
             
             return token_ids
             
@@ -600,37 +1304,93 @@ class BlockchainService:
                 return []
             
             # Get transfer history from blockchain events
-            transfer_history = self.contract.functions.getLandTransferHistory(token_id).call()
-            
-            # Format the transfer history
-            formatted_history = []
-            for transfer in transfer_history:
-                formatted_history.append({
-                    'land_id': transfer[0],
-                    'from': transfer[1],
-                    'to': transfer[2],
-                    'transfer_date': transfer[3],
-                    'price': transfer[4],
-                    'is_completed': transfer[5]
-                })
+            transfer_history = self._cached_call('getLandTransferHistory', token_id)
             
-            return formatted_history
+            return self._transfer_history_to_list(transfer_history)
             
         except Exception as e:
             print(f"Error getting land transfer history: {str(e)}")
             return []
     
+    @staticmethod
+    def _transfer_history_to_list(transfer_history) -> list:
+        """Decode LandRegistry.Transfer tuples"""
+        formatted_history = []
+        for transfer in transfer_history:
+            formatted_history.append({
+                'land_id': transfer[0],
+                'from': transfer[1],
+                'to': transfer[2],
+                'transfer_date': transfer[3],
+                'price': transfer[4],
+                'is_completed': transfer[5]
+            })
+        
+        return formatted_history
+    
     def get_total_supply(self) -> int:
         """Get total number of registered lands"""
         try:
             if not self.contract:
                 return 0
             
-            return self.contract.functions.totalSupply().call()
+            return self._cached_call('totalSupply')
             
         except Exception as e:
             print(f"Error getting total supply: {str(e)}")
             return 0
 
-# Global instance
-blockchain_service = BlockchainService()
\ No newline at end of file
+_service_lock = threading.Lock()
+_service_instance = None
+_startup_stats: Dict[str, Any] = {'pid': os.getpid(), 'forks': 0}
+
+def get_blockchain_service() -> BlockchainService:
+    """Build the shared BlockchainService on first use in this process"""
+    global _service_instance
+    if _service_instance is None:
+        with _service_lock:
+            if _service_instance is None:
+                started = time.perf_counter()
+                _service_instance = BlockchainService()
+                _startup_stats['init_ms'] = round((time.perf_counter() - started) * 1000, 2)
+                _startup_stats['initialized_at'] = time.time()
+    return _service_instance
+
+def _reset_after_fork():
+    """Drop per-process connection state in a forked worker; it is rebuilt lazily"""
+    global _service_instance, _service_lock
+    _service_lock = threading.Lock()
+    _service_instance = None
+    _startup_stats.update({'pid': os.getpid(), 'forks': _startup_stats['forks'] + 1})
+    _startup_stats.pop('init_ms', None)
+    _startup_stats.pop('initialized_at', None)
+    # web3 keeps pooled HTTP sessions in a module-level cache keyed by thread id
+    from web3._utils import request as web3_request
+    web3_request._session_cache_lock = threading.Lock()
+    web3_request._session_cache.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def startup_stats() -> Dict[str, Any]:
+    """Cold-start timings and memory footprint of this worker"""
+    stats = dict(_startup_stats)
+    stats['initialized'] = _service_instance is not None
+    stats['abi_source'] = _abi_stats.get('source')
+    stats['abi_load_ms'] = _abi_stats.get('load_ms')
+    if resource is not None:
+        # ru_maxrss is kilobytes on Linux
+        stats['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return stats
+
+class _LazyBlockchainService:
+    """Module-level handle that defers BlockchainService creation to first use"""
+
+    def __getattr__(self, name):
+        return getattr(get_blockchain_service(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_blockchain_service(), name, value)
+
+# Global instance (created lazily, so gunicorn --preload never forks live connections)
+blockchain_service = _LazyBlockchainService()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Block-scoped LRU cache for contract view calls.
+
+Entries are keyed by (function name, args) and are only valid for the block
+they were read at: the cache listens to the BlockWatcher and drops everything
+when a new block arrives. Confirmed writes and indexed events invalidate the
+affected token early.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# Functions whose result depends on more than a single token id
+_TOKEN_AGNOSTIC_FUNCTIONS = ('totalSupply', 'getLandsByOwner')
+
+
+class BlockScopedCache:
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.getenv('CHAIN_READ_CACHE_SIZE', 1024))
+        self.enabled = os.getenv('CHAIN_READ_CACHE', 'true').lower() == 'true'
+        self.block_number = None
+        self._entries: "OrderedDict[Tuple[str, tuple], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def on_new_block(self, block_number: int):
+        """BlockWatcher listener: entries never outlive their block"""
+        with self._lock:
+            if block_number != self.block_number:
+                self.block_number = block_number
+                self._entries.clear()
+
+    def get_or_load(self, fn_name: str, args: tuple, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for (fn_name, args) or load and store it"""
+        key = (fn_name, tuple(args))
+        with self._lock:
+            if self.enabled and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            block_at_load = self.block_number
+
+        value = loader()
+
+        with self._lock:
+            # Skip storing if we do not know the head yet or a block arrived meanwhile
+            if self.enabled and block_at_load is not None and block_at_load == self.block_number:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, fn_name: Optional[str] = None, token_id: Optional[int] = None):
+        """Drop entries for a function and/or token; no arguments clears everything"""
+        with self._lock:
+            if fn_name is None and token_id is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                name, args = key
+                if fn_name is not None and name != fn_name:
+                    continue
+                if token_id is not None and name not in _TOKEN_AGNOSTIC_FUNCTIONS \
+                        and (not args or args[0] != token_id):
+                    continue
+                del self._entries[key]
+                self.invalidations += 1
+
+    def invalidate_token(self, token_id: int):
+        """Drop everything a write to token_id can change"""
+        self.invalidate(token_id=token_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'block_number': self.block_number,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
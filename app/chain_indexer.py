@@ -0,0 +1,237 @@
+"""
+Contract event indexer for LandRegistered / LandTransferred.
+
+Scans eth_getLogs in fixed block ranges up to (head - confirmations), stores
+decoded events in chain_land_events and records progress in
+chain_indexer_checkpoints. Tokens seen in new events get their
+chain_land_mirror rows refreshed. If the hash of the checkpoint block no longer
+matches the canonical chain, the indexer rewinds and rescans.
+
+Land reads answer ownership and transfer history from the index once it
+holds every write this backend has seen mined for the land's token
+(index_synced_at); until then they fall back to the mirror / RPC.
+
+Note: transfers executed through plain ERC721 transferFrom emit no
+LandTransferred event, so indexed ownership only reflects transferLand calls.
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+
+from app import db
+from app.models import ChainLandEvent, ChainIndexerCheckpoint, Land, LandTransfer
+from app.chain_mirror import refresh_mirror
+
+INDEXED_EVENTS = ('LandRegistered', 'LandTransferred')
+DEFAULT_INDEXER = 'land_events'
+
+
+class ChainEventIndexer:
+    def __init__(self, service, name: str = DEFAULT_INDEXER, confirmations: int = None,
+                 block_range: int = None, start_block: int = None, reorg_rewind: int = None):
+        self.service = service
+        self.name = name
+        self.confirmations = confirmations if confirmations is not None else int(os.getenv('INDEXER_CONFIRMATIONS', 12))
+        self.block_range = block_range or int(os.getenv('INDEXER_BLOCK_RANGE', 2000))
+        self.start_block = start_block if start_block is not None else int(os.getenv('INDEXER_START_BLOCK', 0))
+        self.reorg_rewind = reorg_rewind or int(os.getenv('INDEXER_REORG_REWIND', 64))
+
+    @property
+    def w3(self):
+        return self.service.w3
+
+    def _events_by_topic(self) -> Dict[bytes, Any]:
+        contract = self.service.contract
+        topics = {}
+        for event_abi in contract.abi:
+            if event_abi.get('type') == 'event' and event_abi['name'] in INDEXED_EVENTS:
+                topics[event_abi_to_log_topic(event_abi)] = getattr(contract.events, event_abi['name'])()
+        return topics
+
+    def _checkpoint(self) -> ChainIndexerCheckpoint:
+        checkpoint = ChainIndexerCheckpoint.query.get(self.name)
+        if not checkpoint:
+            checkpoint = ChainIndexerCheckpoint(name=self.name, last_block=self.start_block - 1)
+            db.session.add(checkpoint)
+            db.session.commit()
+        return checkpoint
+
+    def _detect_reorg(self, checkpoint: ChainIndexerCheckpoint) -> bool:
+        if not checkpoint.last_block_hash or checkpoint.last_block < 0:
+            return False
+        canonical = Web3.to_hex(self.w3.eth.get_block(checkpoint.last_block)['hash'])
+        return canonical != checkpoint.last_block_hash
+
+    def _rewind(self, checkpoint: ChainIndexerCheckpoint):
+        rewind_to = max(self.start_block - 1, checkpoint.last_block - self.reorg_rewind)
+        print(f"⚠️ Reorg detected at block {checkpoint.last_block}, rewinding {self.name} to {rewind_to}")
+        ChainLandEvent.query.filter(ChainLandEvent.block_number > rewind_to).delete(synchronize_session=False)
+        checkpoint.last_block = rewind_to
+        checkpoint.last_block_hash = (
+            Web3.to_hex(self.w3.eth.get_block(rewind_to)['hash']) if rewind_to >= 0 else None
+        )
+        db.session.commit()
+
+    def _decode(self, log, events_by_topic) -> Optional[ChainLandEvent]:
+        event = events_by_topic.get(bytes(log['topics'][0]))
+        if event is None:
+            return None
+        decoded = event.process_log(log)
+        args = decoded['args']
+        row = ChainLandEvent(
+            event_name=decoded['event'],
+            token_id=args['tokenId'],
+            block_number=log['blockNumber'],
+            block_hash=Web3.to_hex(log['blockHash']),
+            tx_hash=Web3.to_hex(log['transactionHash']),
+            log_index=log['logIndex']
+        )
+        if decoded['event'] == 'LandRegistered':
+            row.property_id = args['propertyId']
+            row.owner = args['owner']
+            row.location = args['location'][:255]
+            row.area = args['area']
+        else:
+            row.from_address = args['from']
+            row.to_address = args['to']
+            row.price = args['price']
+            row.transfer_date = args['transferDate']
+        return row
+
+    def _store(self, rows: List[ChainLandEvent]) -> int:
+        if not rows:
+            return 0
+        existing = {
+            (tx_hash, log_index) for tx_hash, log_index in db.session.query(
+                ChainLandEvent.tx_hash, ChainLandEvent.log_index
+            ).filter(ChainLandEvent.tx_hash.in_(list({row.tx_hash for row in rows}))).all()
+        }
+        new_rows = [row for row in rows if (row.tx_hash, row.log_index) not in existing]
+        db.session.add_all(new_rows)
+        return len(new_rows)
+
+    def run_once(self) -> Dict[str, Any]:
+        """Index everything between the checkpoint and the confirmed head"""
+        if not self.service.contract:
+            raise Exception("Contract not initialized")
+
+        checkpoint = self._checkpoint()
+        if self._detect_reorg(checkpoint):
+            self._rewind(checkpoint)
+
+        safe_head = self.w3.eth.block_number - self.confirmations
+        events_by_topic = self._events_by_topic()
+        topic_filter = [Web3.to_hex(topic) for topic in events_by_topic]
+        stored = 0
+        touched_tokens = set()
+        from_block = checkpoint.last_block + 1
+
+        while from_block <= safe_head:
+            to_block = min(from_block + self.block_range - 1, safe_head)
+            logs = self.w3.eth.get_logs({
+                'address': self.service.contract.address,
+                'fromBlock': from_block,
+                'toBlock': to_block,
+                'topics': [topic_filter]
+            })
+            rows = [row for row in (self._decode(log, events_by_topic) for log in logs) if row is not None]
+            stored += self._store(rows)
+            touched_tokens.update(row.token_id for row in rows)
+
+            checkpoint.last_block = to_block
+            checkpoint.last_block_hash = Web3.to_hex(self.w3.eth.get_block(to_block)['hash'])
+            db.session.commit()
+            print(f"📥 Indexed blocks {from_block}-{to_block}: {len(rows)} events")
+            from_block = to_block + 1
+
+        for token_id in touched_tokens:
+            self.service.read_cache.invalidate_token(token_id)
+        if touched_tokens:
+            refresh_mirror(self.service, touched_tokens)
+
+        return {
+            'indexer': self.name,
+            'last_block': checkpoint.last_block,
+            'safe_head': safe_head,
+            'events_stored': stored,
+            'tokens_touched': len(touched_tokens)
+        }
+
+    def follow(self, interval: float = None):
+        """Keep indexing new blocks until interrupted"""
+        interval = interval or float(os.getenv('INDEXER_POLL_INTERVAL', 15))
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Indexer error: {e}")
+            time.sleep(interval)
+
+
+def indexed_token_id_for_property(property_id: str) -> Optional[int]:
+    """Token id minted for a property, from the LandRegistered index"""
+    event = ChainLandEvent.query.filter_by(
+        event_name='LandRegistered', property_id=property_id
+    ).order_by(ChainLandEvent.block_number, ChainLandEvent.log_index).first()
+    return event.token_id if event else None
+
+
+def indexed_owner_of(token_id: int) -> Optional[str]:
+    """Current owner of a token according to the newest indexed event"""
+    event = ChainLandEvent.query.filter_by(token_id=token_id).order_by(
+        ChainLandEvent.block_number.desc(), ChainLandEvent.log_index.desc()
+    ).first()
+    if not event:
+        return None
+    return event.to_address if event.event_name == 'LandTransferred' else event.owner
+
+
+def indexed_transfer_history(token_id: int) -> List[Dict[str, Any]]:
+    """LandTransferred events for a token, oldest first, shaped like getLandTransferHistory entries"""
+    events = ChainLandEvent.query.filter_by(token_id=token_id, event_name='LandTransferred').order_by(
+        ChainLandEvent.block_number, ChainLandEvent.log_index
+    ).all()
+    return [{
+        'land_id': event.token_id,
+        'from': event.from_address,
+        'to': event.to_address,
+        'transfer_date': event.transfer_date,
+        'price': int(event.price) if event.price is not None else None,
+        'is_completed': True
+    } for event in events]
+
+
+def index_synced_at(land: Land, max_staleness: Optional[float] = None) -> Optional[datetime]:
+    """When the index last advanced, provided it holds the land's registration and every
+    transfer this backend saw mined for it (and advanced within max_staleness seconds);
+    None while it lags behind them"""
+    if not land.token_id or not land.is_registered_on_blockchain:
+        return None
+
+    indexed = db.session.query(ChainLandEvent.event_name, ChainLandEvent.tx_hash).filter(
+        ChainLandEvent.token_id == land.token_id
+    ).all()
+    if not any(event_name == 'LandRegistered' for event_name, _ in indexed):
+        return None
+
+    written = {land.blockchain_tx_hash}
+    written.update(tx_hash for (tx_hash,) in db.session.query(LandTransfer.blockchain_tx_hash).filter(
+        LandTransfer.land_id == land.id, LandTransfer.status == 'completed'
+    ))
+    written.discard(None)
+    if not {tx_hash.lower() for tx_hash in written} <= {tx_hash.lower() for _, tx_hash in indexed}:
+        return None
+
+    checkpoint = ChainIndexerCheckpoint.query.get(DEFAULT_INDEXER)
+    if not checkpoint or (
+        max_staleness is not None
+        and (datetime.utcnow() - checkpoint.updated_at).total_seconds() > max_staleness
+    ):
+        return None
+    return checkpoint.updated_at
@@ -0,0 +1,130 @@
+"""
+Local mirror of on-chain land state (chain_land_mirror).
+
+Read endpoints serve land details and transfer history from the mirror
+together with its chain_synced_at timestamp. A live read happens only when
+the token has no mirror row yet or the caller passes max_staleness (seconds)
+and the row is older than that. Rows are refreshed by the event indexer for
+tokens it sees, by `flask refresh-chain-mirror`, and dropped when this
+backend settles a write for the token.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable
+
+from app import db
+from app.models import ChainLandMirror
+
+
+def refresh_mirror(service, token_ids: Iterable[int], chunk_size: int = None) -> Dict[int, ChainLandMirror]:
+    """Read details and history for token_ids in batched calls and upsert the mirror (commits)"""
+    token_ids = list(dict.fromkeys(token_ids))
+    chunk_size = chunk_size or int(os.getenv('LAND_DETAILS_BATCH_SIZE', 100))
+    refreshed = {}
+
+    for start in range(0, len(token_ids), chunk_size):
+        chunk = token_ids[start:start + chunk_size]
+        calls = []
+        for token_id in chunk:
+            calls.append(('getLandDetails', (token_id,)))
+            calls.append(('getLandTransferHistory', (token_id,)))
+        results = service.batch_call(calls)
+        synced_at = datetime.utcnow()
+
+        for index, token_id in enumerate(chunk):
+            details, history = results[index * 2], results[index * 2 + 1]
+            if isinstance(details, Exception):
+                print(f"⚠️ Could not refresh mirror for token {token_id}: {details}")
+                continue
+
+            land = service._land_details_to_dict(details)
+            row = ChainLandMirror.query.get(token_id) or ChainLandMirror(token_id=token_id)
+            row.property_id = land['property_id']
+            row.owner = land['owner']
+            row.location = land['location'][:255]
+            row.area = land['area']
+            row.property_type = land['property_type']
+            row.registration_date = land['registration_date']
+            row.is_verified = land['is_verified']
+            row.ipfs_hash = land['ipfs_hash']
+            row.latitude = land['latitude']
+            row.longitude = land['longitude']
+            if isinstance(history, Exception):
+                # Details are still good; keep the last known history (unknown for a new row)
+                print(f"⚠️ Could not read transfer history for token {token_id}: {history}")
+            else:
+                row.transfer_history = json.dumps(service._transfer_history_to_list(history))
+            row.chain_synced_at = synced_at
+            db.session.add(row)
+            refreshed[token_id] = row
+
+        db.session.commit()
+
+    return refreshed
+
+
+def invalidate_mirror(token_id: Optional[int]):
+    """Drop a token's mirror row after this backend changed it on chain (caller commits)"""
+    if token_id is not None:
+        ChainLandMirror.query.filter_by(token_id=token_id).delete(synchronize_session=False)
+
+
+def mirrored_chain_state(service, token_id: int, max_staleness: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Land details and history for a token from the mirror, refreshed live only when needed.
+
+    Returns {'land', 'transfer_history', 'chain_synced_at', 'source', 'degraded'}
+    or None when the token can be read neither from the mirror nor from the
+    chain. degraded is True when a live read was due but the chain was
+    unavailable (circuit breaker open or deadline spent).
+    """
+    row = ChainLandMirror.query.get(token_id)
+    stale = row is None or (
+        max_staleness is not None
+        and (datetime.utcnow() - row.chain_synced_at).total_seconds() > max_staleness
+    )
+    source = 'mirror'
+    degraded = False
+
+    if stale:
+        try:
+            refreshed = refresh_mirror(service, [token_id])
+            if token_id in refreshed:
+                row, source = refreshed[token_id], 'live'
+            else:
+                degraded = True
+        except Exception as e:
+            db.session.rollback()
+            degraded = True
+            print(f"⚠️ Live chain read for token {token_id} failed, serving mirror: {e}")
+
+    if row is None:
+        return None
+
+    return {
+        'land': row.land_details(),
+        'transfer_history': json.loads(row.transfer_history or '[]'),
+        'chain_synced_at': row.chain_synced_at.isoformat(),
+        'source': source,
+        'degraded': degraded
+    }
+
+
+def refresh_all(service, interval: Optional[float] = None, follow: bool = False):
+    """Refresh the mirror for every minted token, optionally forever"""
+    interval = interval or float(os.getenv('CHAIN_MIRROR_REFRESH_INTERVAL', 300))
+    while True:
+        try:
+            total_supply = service.get_total_supply()
+            refreshed = refresh_mirror(service, range(1, total_supply + 1))
+            print(f"🪞 Mirror refreshed for {len(refreshed)}/{total_supply} tokens")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Mirror refresh error: {e}")
+            if not follow:
+                raise
+        if not follow:
+            return
+        time.sleep(interval)
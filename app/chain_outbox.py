@@ -0,0 +1,436 @@
+"""
+Durable outbox for blockchain writes (blockchain_mode='outbox').
+
+Request handlers only insert a chain_outbox row in the same DB transaction as
+the Land / LandTransfer change. `flask chain-worker` drains the table:
+
+1. Claim one row at a time with SELECT ... FOR UPDATE SKIP LOCKED, so any
+   number of workers can run next to the web tier.
+2. Build and sign the transaction, then persist raw_tx, tx_hash and nonce
+   before broadcasting. A worker killed after that point rebroadcasts the
+   same signed transaction instead of registering the land a second time.
+3. Settle signed/submitted rows from their receipts and apply the result to
+   the Land / LandTransfer rows through the chain_settlement callbacks.
+
+Only one write per land is in flight at a time: the worker locks the Land row
+before checking for an earlier in-flight write, and later rows for the same
+land wait until that one settles. A partial unique index keeps a land to one
+open row per operation, so concurrent requests cannot queue the same write
+twice.
+
+Async writes (blockchain_mode='async') whose receipt does not arrive within
+RECEIPT_TIMEOUT are adopted as 'submitted' rows, so the worker settles them
+instead of the land or transfer being left without a result.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy.exc import IntegrityError
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from app import db
+from app.blockchain import is_already_known
+from app.models import ChainOutbox, Land, LandTransfer, User
+from app.chain_indexer import indexed_token_id_for_property
+from app.chain_settlement import land_registration_callback, land_transfer_callback
+from app.tx_simulation import TransactionRevertedError
+
+OUTBOX_OPEN_STATES = ('pending', 'signed', 'submitted')
+OUTBOX_IN_FLIGHT_STATES = ('signed', 'submitted')
+
+
+class OutboxConflict(Exception):
+    """The land already has an open outbox row for another write of the same kind"""
+
+
+def open_outbox_entry(land_id: int, operation: Optional[str] = None) -> Optional[ChainOutbox]:
+    """The unsettled outbox row for a land (optionally for one operation)"""
+    query = ChainOutbox.query.filter(
+        ChainOutbox.land_id == land_id,
+        ChainOutbox.state.in_(OUTBOX_OPEN_STATES)
+    )
+    if operation:
+        query = query.filter(ChainOutbox.operation == operation)
+    return query.order_by(ChainOutbox.id).first()
+
+
+def _insert_open(entry: ChainOutbox) -> ChainOutbox:
+    """Insert entry, or return the open row a concurrent request inserted for the same land and operation"""
+    try:
+        with db.session.begin_nested():
+            db.session.add(entry)
+    except IntegrityError:
+        # ix_chain_outbox_open_land_operation: the other request committed first
+        existing = open_outbox_entry(entry.land_id, entry.operation)
+        if existing is None:
+            raise
+        return existing
+    return entry
+
+
+def enqueue_land_registration(land: Land, land_data: Dict[str, Any]) -> ChainOutbox:
+    """Queue registerLand for a land (caller commits together with the land change)"""
+    existing = open_outbox_entry(land.id, 'register_land')
+    if existing:
+        return existing
+
+    return _insert_open(ChainOutbox(operation='register_land', land_id=land.id, payload=json.dumps(land_data)))
+
+
+def _transfer_payload(transfer: LandTransfer, land: Land) -> str:
+    return json.dumps({
+        'token_id': land.token_id,
+        'to_address': transfer.to_wallet,
+        'price': transfer.price,
+        'from_address': land.wallet_address
+    })
+
+
+def _registration_payload(land: Land) -> str:
+    """registerLand arguments for a land, as the endpoints build them"""
+    owner = User.query.get(land.owner_id)
+    return json.dumps({
+        'owner_wallet': land.wallet_address or (owner.wallet_address if owner else None),
+        'property_id': land.property_id,
+        'location': land.location,
+        'area': land.area,
+        'property_type': land.property_type,
+        'latitude': land.latitude or 0.0,
+        'longitude': land.longitude or 0.0,
+        'ipfs_hash': land.ipfs_hash or ''
+    })
+
+
+def enqueue_land_transfer(transfer: LandTransfer, land: Land) -> ChainOutbox:
+    """Queue the on-chain transfer for a LandTransfer (caller commits)
+
+    Raises OutboxConflict while another transfer of the land is queued.
+    """
+    existing = open_outbox_entry(land.id, 'transfer_land') or _insert_open(ChainOutbox(
+        operation='transfer_land',
+        land_id=land.id,
+        transfer_id=transfer.id,
+        payload=_transfer_payload(transfer, land)
+    ))
+    if existing.transfer_id != transfer.id:
+        raise OutboxConflict(f"Transfer {existing.transfer_id} of this land is still being executed")
+    return existing
+
+
+def adopt_submitted_transaction(land: Land, tx_hash: str, raw_tx: Optional[str] = None,
+                                transfer: Optional[LandTransfer] = None) -> ChainOutbox:
+    """Hand a broadcast transaction whose receipt never came to the outbox (caller commits)
+
+    The row starts out 'submitted', so the worker settles it from its receipt
+    once mined, rebroadcasts raw_tx if the node dropped it and signs it again
+    when raw_tx is not known.
+    """
+    if transfer:
+        entry = ChainOutbox(operation='transfer_land', land_id=land.id, transfer_id=transfer.id,
+                            payload=_transfer_payload(transfer, land))
+    else:
+        entry = ChainOutbox(operation='register_land', land_id=land.id, payload=_registration_payload(land))
+    entry.state = 'submitted'
+    entry.tx_hash = tx_hash
+    entry.raw_tx = raw_tx
+    adopted = _insert_open(entry)
+    if adopted is not entry:
+        print(f"⚠️ Outbox {adopted.id} already holds this {adopted.operation}, not adopting {tx_hash}")
+    return adopted
+
+
+class ChainOutboxWorker:
+    def __init__(self, service, app, batch_size: int = None, poll_interval: float = None,
+                 max_attempts: int = None, retry_delay: float = None):
+        self.service = service
+        self.app = app
+        self.batch_size = batch_size or int(os.getenv('OUTBOX_BATCH_SIZE', 10))
+        self.poll_interval = poll_interval or float(os.getenv('OUTBOX_POLL_INTERVAL', 5))
+        self.max_attempts = max_attempts or int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+        self.retry_delay = retry_delay or float(os.getenv('OUTBOX_RETRY_DELAY', 30))
+
+    # -- claiming --------------------------------------------------------
+
+    def _claim(self, states) -> Optional[ChainOutbox]:
+        """Lock the oldest due row in one of states; other workers skip it"""
+        return ChainOutbox.query.filter(
+            ChainOutbox.state.in_(states),
+            ChainOutbox.available_at <= datetime.utcnow()
+        ).order_by(ChainOutbox.id).with_for_update(skip_locked=True).first()
+
+    def _defer(self, entry: ChainOutbox, seconds: float):
+        entry.available_at = datetime.utcnow() + timedelta(seconds=seconds)
+
+    def _record_error(self, entry: ChainOutbox, error: str) -> bool:
+        """Count a failed attempt; returns True once the row has given up"""
+        entry.attempts += 1
+        entry.last_error = error
+        if entry.attempts >= self.max_attempts:
+            self._give_up(entry, error)
+            return True
+        self._defer(entry, self.retry_delay * entry.attempts)
+        return False
+
+    def _give_up(self, entry: ChainOutbox, error: str):
+        """Fail a row; a signed one first spends its nonce so later backend transactions can be mined"""
+        if entry.nonce is not None:
+            try:
+                filler = self.service.tx_accelerator.fill_nonce(entry.nonce, entry.tx_hash, entry.raw_tx)
+            except Exception as e:
+                print(f"⚠️ Outbox {entry.id}: could not fill nonce {entry.nonce}: {e}")
+                self.service.nonce_manager.release(entry.nonce, reason=str(e))
+            else:
+                if filler:
+                    print(f"🕳️ Outbox {entry.id}: filled nonce {entry.nonce} with {filler}")
+                else:
+                    # The nonce was mined meanwhile, possibly by this very transaction
+                    try:
+                        receipt = self.service.get_transaction_receipt(entry.tx_hash)
+                    except Exception:
+                        receipt = None
+                    if receipt:
+                        self._settle_from_receipt(entry, receipt)
+                        return
+        self._settle(entry, 'failed', None, error)
+
+    # -- settling --------------------------------------------------------
+
+    def _settle(self, entry: ChainOutbox, status: str, result: Any, error: Optional[str]):
+        """Apply the outcome to Land / LandTransfer via the shared settlement callbacks"""
+        entry.state = 'confirmed' if status == 'confirmed' else 'failed'
+        entry.last_error = error
+        db.session.commit()
+
+        job = {
+            'job_id': f"outbox-{entry.id}",
+            'tx_hash': entry.tx_hash,
+            'status': status,
+            'result': result,
+            'error': error
+        }
+        if entry.operation == 'register_land':
+            land_registration_callback(self.app, entry.land_id)(job)
+        else:
+            land_transfer_callback(self.app, entry.transfer_id)(job)
+
+    def _settle_from_receipt(self, entry: ChainOutbox, receipt):
+        # The mined transaction may be a fee-bumped replacement of the one we signed
+        entry.tx_hash = Web3.to_hex(receipt.transactionHash)
+        if entry.operation == 'register_land':
+            result = self.service._parse_registration_receipt(receipt)
+        else:
+            result = self.service._parse_transfer_receipt(receipt)
+
+        if result:
+            self._settle(entry, 'confirmed', result, None)
+        else:
+            self._settle(entry, 'failed', None, f"Transaction reverted (status {receipt.status})")
+
+    # -- sending ---------------------------------------------------------
+
+    def _already_registered(self, entry: ChainOutbox, land: Land) -> bool:
+        """Dedupe registerLand against the DB and the event index before signing"""
+        if land.is_registered_on_blockchain:
+            entry.state = 'confirmed'
+            entry.last_error = 'Land already registered on blockchain'
+            return True
+
+        token_id = indexed_token_id_for_property(land.property_id)
+        if token_id is not None:
+            entry.state = 'confirmed'
+            entry.last_error = f"Property already minted as token {token_id}"
+            land.token_id = token_id
+            land.blockchain_token_id = token_id
+            land.is_registered_on_blockchain = True
+            return True
+        return False
+
+    def _build(self, entry: ChainOutbox) -> Optional[Dict[str, Any]]:
+        payload = json.loads(entry.payload)
+        if entry.operation == 'register_land':
+            return self.service.build_registration_transaction(payload)
+        return self.service.build_transfer_transaction(
+            payload['token_id'], payload['to_address'], payload['price'], payload.get('from_address')
+        )
+
+    def send_next(self) -> bool:
+        """Sign and broadcast the oldest pending row; returns False when none is due"""
+        entry = self._claim(['pending'])
+        if not entry:
+            db.session.rollback()
+            return False
+
+        # Serializes workers holding different rows of this land until one commits its state
+        land = Land.query.filter_by(id=entry.land_id).with_for_update().first()
+
+        # Dedupe per land: wait for the earlier write on this land to settle
+        in_flight = ChainOutbox.query.filter(
+            ChainOutbox.land_id == entry.land_id,
+            ChainOutbox.id != entry.id,
+            ChainOutbox.state.in_(OUTBOX_IN_FLIGHT_STATES)
+        ).first()
+        if in_flight:
+            self._defer(entry, self.poll_interval)
+            db.session.commit()
+            return True
+
+        if entry.operation == 'register_land' and self._already_registered(entry, land):
+            print(f"ℹ️ Outbox {entry.id}: {entry.last_error}, skipping")
+            db.session.commit()
+            return True
+
+        try:
+            transaction = self._build(entry)
+            if not transaction:
+                raise Exception("Backend account cannot perform this transaction")
+            signed = self.service.sign_transaction(transaction)
+        except TransactionRevertedError as e:
+            # Simulation says it would revert: retrying cannot help
+            print(f"❌ Outbox {entry.id} rejected by simulation: {e}")
+            entry.attempts += 1
+            self._settle(entry, 'failed', None, str(e))
+            return True
+        except Exception as e:
+            print(f"❌ Outbox {entry.id} could not be prepared: {e}")
+            self._record_error(entry, str(e))
+            db.session.commit()
+            return True
+
+        # Persist the signed transaction before it leaves the process
+        entry.raw_tx = signed['raw_tx']
+        entry.tx_hash = signed['tx_hash']
+        entry.nonce = signed['nonce']
+        entry.state = 'signed'
+        # Committing releases the row lock: keep settle_next off it while this worker broadcasts
+        self._defer(entry, self.poll_interval)
+        if entry.operation == 'register_land':
+            land.blockchain_tx_hash = entry.tx_hash
+        else:
+            LandTransfer.query.get(entry.transfer_id).blockchain_tx_hash = entry.tx_hash
+        db.session.commit()
+
+        self._broadcast(entry)
+        return True
+
+    def _submitted(self, entry: ChainOutbox):
+        entry.state = 'submitted'
+        self._defer(entry, self.poll_interval)
+
+    def _broadcast(self, entry: ChainOutbox):
+        try:
+            self.service.broadcast_raw_transaction(entry.raw_tx)
+            self._submitted(entry)
+            print(f"📤 Outbox {entry.id} ({entry.operation}) submitted: {entry.tx_hash}")
+        except Exception as e:
+            message = str(e)
+            if is_already_known(e):
+                # A rebroadcast of a transaction the node already holds
+                self._submitted(entry)
+                print(f"ℹ️ Outbox {entry.id} already known to the node: {entry.tx_hash}")
+            elif 'nonce too low' in message.lower():
+                # The nonce is used: most likely by this very transaction (or a fee-bumped copy)
+                try:
+                    receipt = self._receipt(entry)
+                    known = receipt is None and self._known_to_node(entry)
+                except Exception as lookup_error:
+                    print(f"⚠️ Outbox {entry.id} receipt lookup failed, will retry: {lookup_error}")
+                    if not self._record_error(entry, message):
+                        entry.state = 'signed'
+                    db.session.commit()
+                    return
+                if receipt:
+                    self._settle_from_receipt(entry, receipt)
+                    return
+                if known:
+                    # Our transaction holds the nonce; its receipt is not served yet
+                    self._submitted(entry)
+                else:
+                    # Consumed by another transaction: sign again with a fresh nonce
+                    entry.state = 'pending'
+                    entry.raw_tx = entry.tx_hash = entry.nonce = None
+                    entry.attempts += 1
+                    entry.last_error = message
+            else:
+                print(f"⚠️ Outbox {entry.id} broadcast failed, will retry: {message}")
+                # Stays 'signed': the same raw transaction is rebroadcast later
+                if not self._record_error(entry, message):
+                    entry.state = 'signed'
+        db.session.commit()
+
+    def _receipt(self, entry: ChainOutbox):
+        """Receipt of the row's transaction (or a replacement of it), None while unmined"""
+        try:
+            return self.service.get_transaction_receipt(entry.tx_hash)
+        except TransactionNotFound:
+            return None
+
+    def _known_to_node(self, entry: ChainOutbox) -> bool:
+        try:
+            self.service.w3.eth.get_transaction(entry.tx_hash)
+            return True
+        except TransactionNotFound:
+            return False
+
+    def settle_next(self) -> bool:
+        """Check the receipt of the oldest due in-flight row; returns False when none is due"""
+        entry = self._claim(list(OUTBOX_IN_FLIGHT_STATES))
+        if not entry:
+            db.session.rollback()
+            return False
+
+        try:
+            receipt = self._receipt(entry)
+        except Exception as e:
+            print(f"⚠️ Outbox {entry.id} receipt lookup failed: {e}")
+            self._defer(entry, self.poll_interval)
+            db.session.commit()
+            return True
+
+        if receipt:
+            self._settle_from_receipt(entry, receipt)
+            return True
+
+        if entry.state == 'signed':
+            self._broadcast(entry)
+            return True
+
+        if self._known_to_node(entry):
+            self._defer(entry, self.poll_interval)
+            db.session.commit()
+        elif entry.raw_tx:
+            # Submitted but unknown to the node (dropped from the mempool): rebroadcast
+            self._broadcast(entry)
+        else:
+            # Adopted from the receipt resolver without its signed bytes: sign it again
+            print(f"🔁 Outbox {entry.id}: {entry.tx_hash} was dropped, signing it again")
+            entry.state = 'pending'
+            entry.tx_hash = entry.nonce = None
+            db.session.commit()
+        return True
+
+    def run_once(self) -> Dict[str, int]:
+        """Settle in-flight rows, then send pending ones (up to batch_size each)"""
+        settled = sent = 0
+        while settled < self.batch_size and self.settle_next():
+            settled += 1
+        while sent < self.batch_size and self.send_next():
+            sent += 1
+        return {'settled': settled, 'sent': sent}
+
+    def run_forever(self):
+        """Drain the outbox until interrupted"""
+        print(f"🚚 Chain outbox worker started (batch {self.batch_size}, poll {self.poll_interval}s)")
+        while True:
+            try:
+                summary = self.run_once()
+                if summary['settled'] or summary['sent']:
+                    continue
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Outbox worker error: {e}")
+            time.sleep(self.poll_interval)
@@ -0,0 +1,185 @@
+"""
+Pipelined bulk registration.
+
+Instead of waiting for each registerLand receipt before sending the next
+transaction, RegistrationPipeline keeps up to PIPELINE_WINDOW transactions
+in flight with consecutive nonces and checks the receipts of the whole
+window in one batched JSON-RPC call per poll. Each receipt is mapped back to
+its land through the transaction hash, and the token id is read from the
+LandRegistered event in that receipt.
+
+Gaps are repaired: a transaction the node no longer knows about is
+rebroadcast, re-signed with the same nonce if the node rejects the old
+copy, or requeued with a fresh nonce if that nonce was consumed elsewhere.
+A slot that fails or times out while holding a nonce does not leave a hole
+in front of later nonces: the nonce is filled with a zero-value transfer to
+the backend account (replacing a still-pending transaction), or released so
+the next allocation takes it if even that cannot be sent.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from web3.datastructures import AttributeDict
+from web3._utils.method_formatters import receipt_formatter
+
+from app.tx_simulation import TransactionRevertedError
+
+
+class RegistrationPipeline:
+    def __init__(self, service, window: int = None, poll_interval: float = None,
+                 timeout: float = None, max_resubmits: int = None):
+        self.service = service
+        self.window = window or int(os.getenv('PIPELINE_WINDOW', 8))
+        self.poll_interval = poll_interval or float(os.getenv('PIPELINE_POLL_INTERVAL', 2))
+        self.timeout = timeout or float(os.getenv('PIPELINE_TIMEOUT', 300))
+        self.max_resubmits = max_resubmits or int(os.getenv('PIPELINE_MAX_RESUBMITS', 3))
+
+    def _submit(self, slot: Dict[str, Any], nonce: Optional[int] = None):
+        """Build, sign and broadcast a slot's transaction (optionally reusing a nonce)"""
+        transaction = self.service.build_registration_transaction(slot['land_data'])
+        signed = self.service.sign_transaction(transaction, nonce=nonce)
+        slot.update(signed)
+        slot['sent_at'] = time.monotonic()
+        # A fresh nonce goes back to the allocator if the broadcast fails; a reused one stays with the slot
+        release = signed['nonce'] if nonce is None else None
+        self.service.broadcast_raw_transaction(signed['raw_tx'], release_nonce=release)
+        print(f"📤 {slot['key']}: nonce {signed['nonce']} -> {signed['tx_hash']}")
+
+    def _finish(self, slot: Dict[str, Any], status: str, result: Any = None, error: str = None):
+        outcome = {
+            'key': slot['key'],
+            'status': status,
+            'tx_hash': slot.get('tx_hash'),
+            'nonce': slot.get('nonce'),
+            'result': result,
+            'error': error
+        }
+        slot['outcome'] = outcome
+        if self._on_result:
+            self._on_result(outcome)
+        return outcome
+
+    def _retry_or_fail(self, slot: Dict[str, Any], error: str, queue: deque):
+        slot['resubmits'] += 1
+        if slot['resubmits'] > self.max_resubmits:
+            self._finish(slot, 'failed', error=error)
+        else:
+            print(f"🔁 {slot['key']}: {error}, requeued")
+            queue.appendleft(slot)
+
+    def _fill_nonce(self, slot: Dict[str, Any], replace: bool = False):
+        """Spend the nonce of a slot that gave up, so the transactions behind it can be mined"""
+        try:
+            filler = self.service.tx_accelerator.fill_nonce(slot['nonce'], slot['tx_hash'] if replace else None)
+            if filler:
+                print(f"🕳️ {slot['key']}: filled nonce {slot['nonce']} with {filler}")
+        except Exception as e:
+            print(f"⚠️ {slot['key']}: could not fill nonce {slot['nonce']}: {e}")
+            self.service.nonce_manager.release(slot['nonce'], reason=str(e))
+
+    def _repair_gap(self, slot: Dict[str, Any], in_flight: Dict[str, Dict[str, Any]], queue: deque):
+        """The node does not know the transaction: rebroadcast it or re-sign at the same nonce"""
+        try:
+            self.service.broadcast_raw_transaction(slot['raw_tx'])
+            print(f"🔁 {slot['key']}: rebroadcast nonce {slot['nonce']}")
+            return
+        except Exception as e:
+            message = str(e)
+
+        del in_flight[slot['tx_hash']]
+        if 'nonce too low' in message.lower():
+            # Nonce consumed by another transaction; this land needs a new one
+            self._retry_or_fail(slot, message, queue)
+            return
+
+        slot['resubmits'] += 1
+        if slot['resubmits'] > self.max_resubmits:
+            self._finish(slot, 'failed', error=message)
+            self._fill_nonce(slot)
+            return
+        try:
+            self._submit(slot, nonce=slot['nonce'])
+            in_flight[slot['tx_hash']] = slot
+        except Exception as e:
+            self._finish(slot, 'failed', error=str(e))
+            self._fill_nonce(slot)
+
+    def _collect(self, in_flight: Dict[str, Dict[str, Any]], queue: deque):
+        """Check every in-flight receipt in one batch and settle the mined ones"""
+        accelerator = self.service.tx_accelerator
+        # Follow fee-bumped replacements of stuck transactions (see app.tx_accelerator)
+        for tx_hash in list(in_flight):
+            current = accelerator.current_hash(tx_hash)
+            if current != tx_hash:
+                slot = in_flight.pop(tx_hash)
+                slot['tx_hash'] = current
+                slot['raw_tx'] = accelerator.raw_tx(current) or slot['raw_tx']
+                in_flight[current] = slot
+
+        hashes = list(in_flight)
+        lookups = [(tx_hash, candidate) for tx_hash in hashes for candidate in accelerator.chain_of(tx_hash)]
+        responses = self.service.batch_request([('eth_getTransactionReceipt', [c]) for _, c in lookups])
+        mined = {}
+        for (tx_hash, _), response in zip(lookups, responses):
+            if response.get('result'):
+                mined[tx_hash] = response['result']
+        missing = [tx_hash for tx_hash in hashes if tx_hash not in mined]
+        for tx_hash, raw_receipt in mined.items():
+            slot = in_flight.pop(tx_hash)
+            receipt = AttributeDict.recursive(receipt_formatter(raw_receipt))
+            slot['tx_hash'] = receipt.transactionHash.hex()
+            result = self.service._parse_registration_receipt(receipt)
+            if result:
+                self._finish(slot, 'confirmed', result=result)
+            else:
+                self._finish(slot, 'failed', error=f"Transaction reverted (status {receipt.status})")
+
+        if not missing:
+            return
+
+        # One more batch to tell pending transactions from dropped ones
+        known = self.service.batch_request([('eth_getTransactionByHash', [h]) for h in missing])
+        now = time.monotonic()
+        for tx_hash, response in zip(missing, known):
+            slot = in_flight[tx_hash]
+            if now - slot['sent_at'] > self.timeout:
+                del in_flight[tx_hash]
+                self._finish(slot, 'timeout', error=f"No receipt after {self.timeout:.0f}s")
+                # Still pending: replace it, so it cannot be mined after being reported as timed out
+                self._fill_nonce(slot, replace=bool(response.get('result')))
+            elif not response.get('result'):
+                self._repair_gap(slot, in_flight, queue)
+
+    def run(self, items: List[Tuple[Any, Dict[str, Any]]],
+            on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Register (key, land_data) items; returns one outcome per item in input order.
+
+        on_result is called with each outcome as soon as it settles, so the
+        caller can persist results while the rest of the window is mined.
+        """
+        self._on_result = on_result
+        slots = [{'key': key, 'land_data': land_data, 'resubmits': 0} for key, land_data in items]
+        queue = deque(slots)
+        in_flight: Dict[str, Dict[str, Any]] = {}
+
+        while queue or in_flight:
+            while queue and len(in_flight) < self.window:
+                slot = queue.popleft()
+                try:
+                    self._submit(slot)
+                    in_flight[slot['tx_hash']] = slot
+                except TransactionRevertedError as e:
+                    # Rejected by simulation before taking a nonce; resubmitting cannot help
+                    self._finish(slot, 'failed', error=str(e))
+                except Exception as e:
+                    # broadcast_raw_transaction resynced or released the nonce
+                    self._retry_or_fail(slot, str(e), queue)
+
+            if in_flight:
+                time.sleep(self.poll_interval)
+                self._collect(in_flight, queue)
+
+        return [slot['outcome'] for slot in slots]
@@ -0,0 +1,130 @@
+"""
+Shared helpers for applying blockchain results to Land / LandTransfer rows.
+
+Used inline (blockchain_mode='sync'), from the receipt resolver thread when a
+write was submitted with blockchain_mode='async', and by the outbox worker for
+blockchain_mode='outbox' (see app.chain_outbox). Approvals with
+blockchain_mode='anchor' are batched by app.anchoring instead.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from app import db
+from app.models import Land, LandTransfer, User
+from app.blockchain import blockchain_service
+from app.chain_mirror import invalidate_mirror
+
+BLOCKCHAIN_WRITE_MODES = ('sync', 'async', 'outbox')
+# Approval workflows may also defer lands to a Merkle anchor batch (see app.anchoring)
+APPROVAL_WRITE_MODES = BLOCKCHAIN_WRITE_MODES + ('anchor',)
+
+
+def blockchain_write_mode(data: Optional[Dict[str, Any]], modes=BLOCKCHAIN_WRITE_MODES) -> str:
+    """Resolve the write mode from the request body, falling back to BLOCKCHAIN_WRITE_MODE"""
+    mode = (data or {}).get('blockchain_mode')
+    if not mode:
+        mode = os.getenv('BLOCKCHAIN_WRITE_MODE', 'sync')
+        if mode not in modes and mode in APPROVAL_WRITE_MODES:
+            # BLOCKCHAIN_WRITE_MODE=anchor only applies to approvals
+            mode = 'sync'
+    if mode not in modes:
+        raise ValueError(f"Invalid blockchain_mode '{mode}'. Use one of: {', '.join(modes)}")
+    return mode
+
+
+def registration_in_flight(land: Land) -> bool:
+    """True while an async or queued registerLand for this land has not settled"""
+    from app.chain_outbox import open_outbox_entry
+
+    if land.is_registered_on_blockchain:
+        return False
+    if land.blockchain_tx_hash and blockchain_service.receipt_resolver.is_pending(land.blockchain_tx_hash):
+        return True
+    return open_outbox_entry(land.id, 'register_land') is not None
+
+
+def apply_land_registration(land: Land, result: Dict[str, Any]):
+    """Copy a registerLand result onto the land row (caller commits)"""
+    invalidate_mirror(result.get('token_id'))
+    land.token_id = result.get('token_id')
+    land.blockchain_token_id = result.get('token_id')
+    land.blockchain_tx_hash = result.get('tx_hash')
+    land.is_registered_on_blockchain = True
+    land.blockchain_block_number = result.get('block_number')
+
+
+def apply_transfer_completion(transfer: LandTransfer, land: Land, tx_hash: str):
+    """Mark a transfer completed and move land ownership (caller commits)"""
+    invalidate_mirror(land.token_id)
+    transfer.status = 'completed'
+    transfer.blockchain_tx_hash = tx_hash
+    transfer.completed_at = datetime.utcnow()
+
+    land.owner_id = transfer.to_user_id
+    land.wallet_address = transfer.to_wallet
+
+
+def _adopt_timed_out_job(job: Dict[str, Any], land: Land, transfer: Optional[LandTransfer] = None):
+    """Move a timed-out resolver job to the outbox under its latest (fee-bumped) hash"""
+    from app.chain_outbox import adopt_submitted_transaction
+
+    tx_hash = blockchain_service.tx_accelerator.current_hash(job['tx_hash'])
+    raw_tx = blockchain_service.tx_accelerator.raw_tx(tx_hash)
+    return adopt_submitted_transaction(land, tx_hash, raw_tx, transfer)
+
+
+def land_registration_callback(app, land_id: int):
+    """Build an on_settled callback that records a mined registration"""
+    def on_settled(job: Dict[str, Any]):
+        with app.app_context():
+            land = Land.query.get(land_id)
+            if not land:
+                print(f"Land {land_id} disappeared before job {job['job_id']} settled")
+                return
+            if job['status'] == 'confirmed':
+                apply_land_registration(land, job['result'])
+                print(f"✅ Land {land_id} registered on blockchain with token ID: {land.token_id}")
+            elif job['status'] == 'timeout':
+                # Possibly still mined later: keep the hash and let the outbox worker settle it
+                entry = _adopt_timed_out_job(job, land)
+                print(f"⏳ Blockchain registration for land {land_id} unconfirmed, handed to outbox {entry.id}")
+            else:
+                # Clear the pending hash so the registration can be retried
+                if land.blockchain_tx_hash == job['tx_hash']:
+                    land.blockchain_tx_hash = None
+                print(f"❌ Blockchain registration for land {land_id} {job['status']}: {job['error']}")
+            db.session.commit()
+    return on_settled
+
+
+def land_transfer_callback(app, transfer_id: int):
+    """Build an on_settled callback that completes or fails a processing transfer"""
+    def on_settled(job: Dict[str, Any]):
+        from app.email_service import email_service
+
+        with app.app_context():
+            transfer = LandTransfer.query.get(transfer_id)
+            if not transfer:
+                print(f"Transfer {transfer_id} disappeared before job {job['job_id']} settled")
+                return
+            land = Land.query.get(transfer.land_id)
+            if job['status'] == 'confirmed':
+                apply_transfer_completion(transfer, land, job['result'])
+            elif job['status'] == 'timeout':
+                # Stays 'processing' until the outbox worker sees the receipt
+                entry = _adopt_timed_out_job(job, land, transfer)
+                print(f"⏳ Transfer {transfer_id} unconfirmed, handed to outbox {entry.id}")
+            else:
+                transfer.status = 'failed'
+            db.session.commit()
+
+            if transfer.status == 'completed':
+                try:
+                    from_user = User.query.get(transfer.from_user_id)
+                    to_user = User.query.get(transfer.to_user_id)
+                    email_service.send_transfer_completed_email(transfer, land, from_user, to_user)
+                except Exception as email_error:
+                    print(f"Email notification failed: {email_error}")
+    return on_settled
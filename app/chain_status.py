@@ -0,0 +1,99 @@
+"""
+Background sampler for blockchain health shown on the admin endpoints.
+
+A daemon thread refreshes a snapshot (connectivity via eth_blockNumber,
+latest block, backend balance, total supply and RPC latency) every
+CHAIN_STATUS_INTERVAL seconds, so request handlers read it in O(1) instead
+of making RPC calls inline.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from app.circuit_breaker import read_deadline
+
+
+class ChainStatusSampler:
+    def __init__(self, service, interval: float = None):
+        self.service = service
+        self.interval = interval or float(os.getenv('CHAIN_STATUS_INTERVAL', 15))
+        self._snapshot: Dict[str, Any] = {}
+        self._sampled_monotonic = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        """Start the sampling thread on first use"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='chain-status-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample_now()
+            self._stop.wait(self.interval)
+
+    def sample_now(self) -> Dict[str, Any]:
+        """Take a fresh sample and publish it as the current snapshot"""
+        snapshot = {
+            'connected': False,
+            'latest_block': None,
+            'rpc_latency_ms': None,
+            'account_address': None,
+            'balance': '0',
+            'total_supply': 0,
+            'error': None
+        }
+        try:
+            if not self.service.w3:
+                raise Exception("Web3 instance not initialized")
+
+            started = time.perf_counter()
+            snapshot['latest_block'] = self.service.w3.eth.block_number
+            snapshot['rpc_latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            snapshot['connected'] = True
+
+            account_address = self.service.get_account_from_private_key()
+            if account_address:
+                snapshot['account_address'] = account_address
+                balance_wei = self.service.w3.eth.get_balance(account_address)
+                snapshot['balance'] = f"{self.service.w3.from_wei(balance_wei, 'ether'):.4f}"
+
+            snapshot['total_supply'] = self.service.get_total_supply()
+        except Exception as e:
+            if snapshot['connected']:
+                snapshot['error'] = f"Connected but contract interaction failed: {str(e)}"
+            else:
+                snapshot['error'] = f"Not connected to blockchain network: {str(e)}"
+
+        snapshot['sampled_at'] = datetime.utcnow().isoformat()
+        with self._lock:
+            self._snapshot = snapshot
+            self._sampled_monotonic = time.monotonic()
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest sample plus its age; samples synchronously only before the first one exists"""
+        self.ensure_started()
+        with self._lock:
+            has_sample = self._sampled_monotonic is not None
+        if not has_sample:
+            # Inside a request: a hung node must not stall the dashboard
+            with read_deadline():
+                self.sample_now()
+
+        with self._lock:
+            snapshot = dict(self._snapshot)
+            snapshot['age_seconds'] = round(time.monotonic() - self._sampled_monotonic, 1)
+            snapshot['interval_seconds'] = self.interval
+        return snapshot
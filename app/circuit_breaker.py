@@ -0,0 +1,194 @@
+"""
+Circuit breaker and deadline budgets for RPC calls.
+
+CircuitBreaker wraps every JSON-RPC request (web3 middleware plus the
+batched requests that bypass it). Calls that raise or take longer than
+RPC_BREAKER_SLOW_MS count as failures; once at least RPC_BREAKER_MIN_CALLS
+calls in the last RPC_BREAKER_WINDOW seconds failed at a rate of
+RPC_BREAKER_FAILURE_RATE, the breaker opens and calls fail immediately with
+CircuitOpenError. After RPC_BREAKER_OPEN_SECONDS it lets
+RPC_BREAKER_HALF_OPEN_CALLS trial calls through (half-open): all succeed and
+it closes, any failure opens it again.
+
+rpc_deadline(seconds) bounds the total time of all RPC calls made inside
+the block in the current thread / context: HTTP timeouts and receipt waits
+are clamped to the time left, and DeadlineExceeded is raised once it is
+spent.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+
+class CircuitOpenError(Exception):
+    """The RPC node is considered down; the call was not attempted"""
+
+
+class DeadlineExceeded(Exception):
+    """The request's RPC time budget is spent"""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar('rpc_deadline', default=None)
+
+
+@contextmanager
+def rpc_deadline(seconds: float):
+    """Bound all RPC calls in the block to seconds in total (nested deadlines only shrink)"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(min(deadline, current) if current is not None else deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def read_deadline():
+    """rpc_deadline for read endpoints that can fall back to DB data (RPC_READ_DEADLINE seconds)"""
+    return rpc_deadline(float(os.getenv('RPC_READ_DEADLINE', 3)))
+
+
+def deadline_remaining() -> Optional[float]:
+    """Seconds left in the current deadline, None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def clamp_timeout(timeout):
+    """Shrink a requests timeout (float or (connect, read)) to the time left in the deadline"""
+    remaining = deadline_remaining()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("RPC deadline exceeded")
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) for part in timeout)
+    return min(timeout, remaining) if timeout else remaining
+
+
+class CircuitBreaker:
+    def __init__(self, failure_rate: float = None, min_calls: int = None, window: float = None,
+                 slow_call_ms: float = None, open_seconds: float = None, half_open_calls: int = None):
+        self.failure_rate = failure_rate or float(os.getenv('RPC_BREAKER_FAILURE_RATE', 0.5))
+        self.min_calls = min_calls or int(os.getenv('RPC_BREAKER_MIN_CALLS', 10))
+        self.window = window or float(os.getenv('RPC_BREAKER_WINDOW', 30))
+        self.slow_call_ms = slow_call_ms or float(os.getenv('RPC_BREAKER_SLOW_MS', 5000))
+        self.open_seconds = open_seconds or float(os.getenv('RPC_BREAKER_OPEN_SECONDS', 30))
+        self.half_open_calls = half_open_calls or int(os.getenv('RPC_BREAKER_HALF_OPEN_CALLS', 3))
+        self.state = 'closed'
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes = deque()  # (monotonic time, failed)
+        self._trial_in_flight = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def _open(self, now: float, reason: str):
+        self.state = 'open'
+        self.opened_at = now
+        self.times_opened += 1
+        self._trial_in_flight = 0
+        self._trial_successes = 0
+        print(f"🔌 RPC circuit breaker opened: {reason}")
+
+    def before_call(self):
+        """Raise CircuitOpenError / DeadlineExceeded instead of attempting a call"""
+        remaining = deadline_remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("RPC deadline exceeded")
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError("RPC circuit breaker is open")
+                self.state = 'half_open'
+                print("🔌 RPC circuit breaker half-open, sending trial calls")
+            if self.state == 'half_open':
+                if self._trial_in_flight + self._trial_successes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError("RPC circuit breaker is half-open, trial calls in flight")
+                self._trial_in_flight += 1
+
+    def record(self, ok: bool, latency_ms: float):
+        failed = not ok or latency_ms > self.slow_call_ms
+        now = time.monotonic()
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_in_flight = max(0, self._trial_in_flight - 1)
+                if failed:
+                    self._open(now, f"trial call failed ({latency_ms:.0f}ms)")
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                    print("🔌 RPC circuit breaker closed")
+                return
+            if self.state == 'open':
+                return
+
+            self._outcomes.append((now, failed))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            calls = len(self._outcomes)
+            failures = sum(1 for _, outcome in self._outcomes if outcome)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open(now, f"{failures}/{calls} calls failed or slow in {self.window:.0f}s")
+
+    def release(self):
+        """A call ended without saying anything about the node (e.g. our own deadline)"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_in_flight = max(0, self._trial_in_flight - 1)
+
+    @contextmanager
+    def guard(self):
+        """Run one RPC call under the breaker"""
+        self.before_call()
+        budget = deadline_remaining()
+        started = time.perf_counter()
+        try:
+            yield
+        except DeadlineExceeded:
+            elapsed = time.perf_counter() - started
+            if elapsed >= budget / 2:
+                # The node used up most of the budget (e.g. timed out and was retried)
+                self.record(False, elapsed * 1000)
+            else:
+                self.release()
+            raise
+        except Exception:
+            self.record(False, (time.perf_counter() - started) * 1000)
+            raise
+        self.record(True, (time.perf_counter() - started) * 1000)
+
+    def middleware(self, make_request, w3):
+        def inner(method, params):
+            with self.guard():
+                return make_request(method, params)
+        return inner
+
+    @property
+    def available(self) -> bool:
+        """False while calls are being rejected"""
+        with self._lock:
+            return self.state != 'open' or time.monotonic() - self.opened_at >= self.open_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for _, outcome in self._outcomes if outcome)
+            return {
+                'state': self.state,
+                'window_calls': calls,
+                'window_failures': failures,
+                'times_opened': self.times_opened,
+                'rejected_calls': self.rejected,
+                'open_for_seconds': round(time.monotonic() - self.opened_at, 1) if self.state == 'open' else None
+            }
@@ -0,0 +1,86 @@
+"""
+Flask CLI commands for blockchain maintenance.
+
+Registered on the app in create_app, so they work with both
+`FLASK_APP=wsgi.py` and `FLASK_APP=app.py`.
+"""
+
+import click
+
+
+def register_commands(app):
+    @app.cli.command('index-chain')
+    @click.option('--follow', is_flag=True, help='Keep indexing new blocks until interrupted')
+    @click.option('--interval', type=float, default=None, help='Seconds between polls with --follow')
+    def index_chain(follow, interval):
+        """Index LandRegistered / LandTransferred events into chain_land_events"""
+        from app.blockchain import blockchain_service
+        from app.chain_indexer import ChainEventIndexer
+
+        indexer = ChainEventIndexer(blockchain_service)
+        if follow:
+            indexer.follow(interval)
+        else:
+            summary = indexer.run_once()
+            print(f"✅ Indexed up to block {summary['last_block']} "
+                  f"({summary['events_stored']} new events, {summary['tokens_touched']} tokens)")
+
+    @app.cli.command('chain-worker')
+    @click.option('--once', is_flag=True, help='Process one batch and exit')
+    @click.option('--batch-size', type=int, default=None, help='Rows to settle and send per pass')
+    @click.option('--interval', type=float, default=None, help='Seconds to sleep when the outbox is empty')
+    def chain_worker(once, batch_size, interval):
+        """Drain the chain_outbox table (run as a separate process, scale as needed)"""
+        from flask import current_app
+        from app.blockchain import blockchain_service
+        from app.chain_outbox import ChainOutboxWorker
+
+        worker = ChainOutboxWorker(
+            blockchain_service, current_app._get_current_object(),
+            batch_size=batch_size, poll_interval=interval
+        )
+        if once:
+            summary = worker.run_once()
+            print(f"✅ Outbox pass done ({summary['settled']} settled, {summary['sent']} sent)")
+        else:
+            worker.run_forever()
+
+    @app.cli.command('refresh-chain-mirror')
+    @click.option('--follow', is_flag=True, help='Keep refreshing every CHAIN_MIRROR_REFRESH_INTERVAL seconds')
+    @click.option('--interval', type=float, default=None, help='Seconds between refreshes with --follow')
+    def refresh_chain_mirror(follow, interval):
+        """Refresh chain_land_mirror for every minted token"""
+        from app.blockchain import blockchain_service
+        from app.chain_mirror import refresh_all
+
+        refresh_all(blockchain_service, interval=interval, follow=follow)
+
+    @app.cli.command('anchor-lands')
+    @click.option('--follow', is_flag=True, help='Keep anchoring every ANCHOR_WINDOW seconds')
+    @click.option('--interval', type=float, default=None, help='Seconds between batches with --follow')
+    @click.option('--max-batch', type=int, default=None, help='Lands per Merkle root (ANCHOR_MAX_BATCH)')
+    def anchor_lands(follow, interval, max_batch):
+        """Commit queued lands (blockchain_mode=anchor) under one Merkle root per batch"""
+        from app.blockchain import blockchain_service
+        from app.anchoring import run_anchoring
+
+        run_anchoring(blockchain_service, interval=interval, follow=follow, max_batch=max_batch)
+
+    @app.cli.command('backfill-token-ids')
+    @click.option('--dry-run', is_flag=True, help='Report the differences without updating lands')
+    @click.option('--report', type=click.Path(dir_okay=False, writable=True), default=None,
+                  help='Also write the diff report as JSON to this file')
+    def backfill_token_ids_command(dry_run, report):
+        """Set token_id / blockchain_token_id from the LandRegistered event of each registration receipt"""
+        import json
+        from app.blockchain import blockchain_service
+        from app.token_backfill import backfill_token_ids, format_diff
+
+        result = backfill_token_ids(blockchain_service, dry_run=dry_run)
+        for line in format_diff(result):
+            print(line)
+        if report:
+            with open(report, 'w') as f:
+                json.dump(result, f, indent=2, default=str)
+            print(f"📝 Report written to {report}")
+        print(f"{'🔎 Dry run' if dry_run else '✅ Backfill done'}: {result['summary']}")
@@ -0,0 +1,207 @@
+"""
+Pluggable gas pricing for contract writes.
+
+GAS_STRATEGY selects how transactions are priced:
+- eip1559 (default): maxFeePerGas / maxPriorityFeePerGas derived from
+  eth_feeHistory, cached until the next block. Gas limits come from
+  estimate_gas, memoized per contract function and argument shape and
+  padded with GAS_LIMIT_MARGIN.
+- legacy: the original fixed gas limit and gasPrice.
+"""
+
+import math
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from web3 import Web3
+from web3.exceptions import MethodUnavailable
+
+METHOD_NOT_FOUND = -32601
+
+
+def method_not_found(error: Exception) -> bool:
+    """True if the node does not implement the RPC method at all (not a transient failure)"""
+    if isinstance(error, MethodUnavailable):
+        return True
+    payload = error.args[0] if error.args else None
+    if isinstance(payload, dict) and payload.get('code') == METHOD_NOT_FOUND:
+        return True
+    message = str(error).lower()
+    return str(METHOD_NOT_FOUND) in message or 'not supported' in message or 'method not found' in message
+
+
+class LegacyGasStrategy:
+    """Fixed gas limit and gasPrice (previous behaviour)"""
+
+    name = 'legacy'
+
+    def __init__(self, service):
+        self.service = service
+        self.gas_limit = int(os.getenv('GAS_LIMIT', 2000000))
+        self.gas_price_gwei = os.getenv('GAS_PRICE_GWEI', '30')
+
+    def fee_params(self) -> Dict[str, Any]:
+        return {'gasPrice': self.service.w3.to_wei(self.gas_price_gwei, 'gwei')}
+
+    def transaction_params(self, contract_call) -> Dict[str, Any]:
+        params = {
+            'chainId': self.service.chain_id,
+            'gas': self.gas_limit,
+        }
+        params.update(self.fee_params())
+        return params
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'strategy': self.name,
+            'gas_limit': self.gas_limit,
+            'gas_price_gwei': self.gas_price_gwei
+        }
+
+
+class Eip1559GasStrategy:
+    """EIP-1559 fees from eth_feeHistory and memoized gas estimates"""
+
+    name = 'eip1559'
+
+    def __init__(self, service):
+        self.service = service
+        self.history_blocks = int(os.getenv('GAS_FEE_HISTORY_BLOCKS', 5))
+        self.priority_percentile = float(os.getenv('GAS_PRIORITY_PERCENTILE', 50))
+        # Polygon rejects tips below ~25 gwei, keep a floor
+        self.min_priority_fee = Web3.to_wei(os.getenv('GAS_MIN_PRIORITY_GWEI', '30'), 'gwei')
+        self.base_fee_multiplier = float(os.getenv('GAS_BASE_FEE_MULTIPLIER', 2))
+        self.limit_margin = float(os.getenv('GAS_LIMIT_MARGIN', 1.2))
+        self.fallback_gas_limit = int(os.getenv('GAS_LIMIT', 2000000))
+        self._fees: Optional[Dict[str, int]] = None
+        self._fees_block = None
+        self._gas_memo: Dict[Tuple[str, tuple], int] = {}
+        self._lock = threading.Lock()
+        self.fee_history_supported = True
+        self.fee_history_calls = 0
+        self.estimate_calls = 0
+        self.memo_hits = 0
+        self.service.block_watcher.add_listener(self.on_new_block)
+
+    def on_new_block(self, block_number: int):
+        """BlockWatcher listener: fee estimates are only valid for one block"""
+        with self._lock:
+            if block_number != self._fees_block:
+                self._fees = None
+                self._fees_block = block_number
+
+    def current_fees(self) -> Dict[str, int]:
+        """maxFeePerGas / maxPriorityFeePerGas, fetched once per block"""
+        with self._lock:
+            if self._fees is not None:
+                return dict(self._fees)
+            block_at_load = self._fees_block
+
+        history = None
+        if self.fee_history_supported:
+            try:
+                history = self.service.w3.eth.fee_history(self.history_blocks, 'latest', [self.priority_percentile])
+                self.fee_history_calls += 1
+            except Exception as e:
+                # Either way this block is priced from the latest base fee
+                if method_not_found(e):
+                    # Nodes without eth_feeHistory (e.g. the eth-tester backend): stop asking
+                    print(f"⚠️ eth_feeHistory unavailable, pricing from the latest block base fee: {e}")
+                    self.fee_history_supported = False
+                else:
+                    # Timeout, 5xx, open circuit...: try eth_feeHistory again next block
+                    print(f"⚠️ eth_feeHistory failed, pricing this block from the latest base fee: {e}")
+
+        if history:
+            # The last base fee entry is the projected base fee of the next block
+            next_base_fee = history['baseFeePerGas'][-1]
+            tips = [reward[0] for reward in history.get('reward', []) if reward]
+        else:
+            next_base_fee = self.service.w3.eth.get_block('latest').get('baseFeePerGas', 0)
+            tips = []
+        priority_fee = max(sorted(tips)[len(tips) // 2] if tips else 0, self.min_priority_fee)
+        fees = {
+            'maxPriorityFeePerGas': priority_fee,
+            'maxFeePerGas': int(next_base_fee * self.base_fee_multiplier) + priority_fee
+        }
+
+        with self._lock:
+            if block_at_load is not None and block_at_load == self._fees_block:
+                self._fees = fees
+        return dict(fees)
+
+    @staticmethod
+    def argument_shape(args) -> tuple:
+        """Gas-relevant shape of call arguments: types plus 32-byte word counts"""
+        shape = []
+        for arg in args:
+            if isinstance(arg, (str, bytes)) and not (isinstance(arg, str) and Web3.is_address(arg)):
+                shape.append((type(arg).__name__, math.ceil(len(arg) / 32)))
+            elif isinstance(arg, (list, tuple)):
+                shape.append(('seq', len(arg)))
+            else:
+                shape.append(type(arg).__name__)
+        return tuple(shape)
+
+    def gas_limit(self, contract_call) -> int:
+        """Memoized estimate_gas for this function and argument shape, plus margin"""
+        key = (contract_call.fn_name, self.argument_shape(contract_call.args))
+        with self._lock:
+            if key in self._gas_memo:
+                self.memo_hits += 1
+                return self._gas_memo[key]
+
+        try:
+            estimate = contract_call.estimate_gas({'from': self.service.get_backend_address()})
+            self.estimate_calls += 1
+        except Exception as e:
+            print(f"⚠️ Gas estimation for {contract_call.fn_name} failed, using fallback limit: {e}")
+            return self.fallback_gas_limit
+
+        limit = int(estimate * self.limit_margin)
+        with self._lock:
+            # Keep the largest limit seen for this shape
+            limit = max(limit, self._gas_memo.get(key, 0))
+            self._gas_memo[key] = limit
+        return limit
+
+    def fee_params(self) -> Dict[str, Any]:
+        return self.current_fees()
+
+    def transaction_params(self, contract_call) -> Dict[str, Any]:
+        params = {
+            'chainId': self.service.chain_id,
+            'gas': self.gas_limit(contract_call),
+        }
+        params.update(self.fee_params())
+        return params
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            fees = dict(self._fees) if self._fees else None
+            memo_size = len(self._gas_memo)
+        return {
+            'strategy': self.name,
+            'cached_fees': fees,
+            'fees_block': self._fees_block,
+            'fee_history_calls': self.fee_history_calls,
+            'estimate_calls': self.estimate_calls,
+            'gas_memo_hits': self.memo_hits,
+            'gas_memo_size': memo_size,
+            'limit_margin': self.limit_margin
+        }
+
+
+GAS_STRATEGIES = {
+    LegacyGasStrategy.name: LegacyGasStrategy,
+    Eip1559GasStrategy.name: Eip1559GasStrategy,
+}
+
+
+def make_gas_strategy(service, name: str = None):
+    """Build the strategy named by GAS_STRATEGY"""
+    name = (name or os.getenv('GAS_STRATEGY', 'eip1559')).lower()
+    if name not in GAS_STRATEGIES:
+        raise ValueError(f"Unknown GAS_STRATEGY '{name}', expected one of {sorted(GAS_STRATEGIES)}")
+    return GAS_STRATEGIES[name](service)
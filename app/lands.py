@@ -1,9 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Land, User, UserRole, LandTransfer
+from app.models import Land, User, UserRole, LandTransfer, ChainOutbox
 from app.blockchain import blockchain_service
 from app.email_service import email_service
+from app.chain_settlement import (
+    apply_land_registration, apply_transfer_completion, APPROVAL_WRITE_MODES, blockchain_write_mode,
+    land_registration_callback, land_transfer_callback, registration_in_flight
+)
+from app.anchoring import queue_land_anchor, verify_land_anchor
+from app.chain_outbox import enqueue_land_registration, enqueue_land_transfer, OutboxConflict
+from app.chain_mirror import mirrored_chain_state
+from app.chain_indexer import index_synced_at, indexed_owner_of, indexed_transfer_history
+from app.circuit_breaker import read_deadline
+from app.tx_simulation import TransactionRevertedError
+from app.loading import loaded, LAND, TRANSFER, TRANSFER_WITH_LAND, TRANSFER_WITH_LAND_OWNER
+from app.pagination import paginate_request, PaginationError
 from datetime import datetime
 from sqlalchemy import or_
 
@@ -20,15 +32,14 @@ def get_lands():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Parse query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        # Parse query parameters (page / per_page / cursor are read by paginate_request)
         status = request.args.get('status')
         property_type = request.args.get('property_type')
         owner_only = request.args.get('owner_only', 'false').lower() == 'true'
+        include_blockchain = request.args.get('include_blockchain', 'false').lower() == 'true'
         
         # Build query
-        query = Land.query
+        query = Land.query.options(*LAND)
         
         # Filter by owner if requested or if user is not admin
         if owner_only or user.role != UserRole.ADMIN:
@@ -41,20 +52,29 @@ def get_lands():
             query = query.filter(Land.property_type == property_type)
         
         # Paginate
-        lands = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        lands = paginate_request(query, [Land.id])
+        
+        lands_data = [land.to_dict() for land in lands.items]
+        
+        # Attach on-chain details for the whole page in batched calls
+        if include_blockchain:
+            token_ids = [land.token_id for land in lands.items if land.token_id]
+            with read_deadline():
+                details = {
+                    detail['token_id']: detail['land']
+                    for detail in blockchain_service.get_land_details_many(token_ids)
+                }
+            for land_dict in lands_data:
+                if details.get(land_dict['token_id']):
+                    land_dict['blockchain_data'] = details[land_dict['token_id']]
         
         return jsonify({
-            'lands': [land.to_dict() for land in lands.items],
-            'total': lands.total,
-            'pages': lands.pages,
-            'current_page': page,
-            'per_page': per_page
+            'lands': lands_data,
+            **lands.meta
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -74,14 +94,31 @@ def get_land(land_id):
         if user.role != UserRole.ADMIN and land.owner_id != user_id:
             return jsonify({'error': 'Access denied'}), 403
         
-        # Get blockchain data if available
-        blockchain_data = None
+        # Get blockchain data from the local mirror; max_staleness (seconds) forces a live read when older
+        max_staleness = request.args.get('max_staleness', type=float)
+        chain_state = None
         if land.token_id:
-            blockchain_data = blockchain_service.get_land_details_from_blockchain(land.token_id)
-        
-        land_dict = land.to_dict()
-        if blockchain_data:
-            land_dict['blockchain_data'] = blockchain_data
+            # Bounded: a hung node degrades the response to mirror / DB data
+            with read_deadline():
+                chain_state = mirrored_chain_state(blockchain_service, land.token_id, max_staleness)
+        
+        land_dict = loaded(land).to_dict()
+        if chain_state:
+            land_dict['blockchain_data'] = chain_state['land']
+            land_dict['chain_synced_at'] = chain_state['chain_synced_at']
+            land_dict['chain_source'] = chain_state['source']
+            land_dict['chain_degraded'] = chain_state['degraded']
+        elif land.token_id:
+            # Not mirrored yet and the chain could not be read in time
+            land_dict['chain_degraded'] = True
+        
+        # On-chain owner from the event index once it has caught up with this land's writes
+        if index_synced_at(land, max_staleness):
+            land_dict['chain_owner'] = indexed_owner_of(land.token_id)
+            land_dict['chain_owner_source'] = 'index'
+        elif chain_state:
+            land_dict['chain_owner'] = chain_state['land'].get('owner')
+            land_dict['chain_owner_source'] = chain_state['source']
         
         return jsonify({'land': land_dict}), 200
         
@@ -132,7 +169,7 @@ def register_land():
         
         return jsonify({
             'message': 'Land registered successfully',
-            'land': land.to_dict()
+            'land': loaded(land).to_dict()
         }), 201
         
     except Exception as e:
@@ -157,6 +194,17 @@ def register_land_on_blockchain(land_id):
         if land.is_registered_on_blockchain:
             return jsonify({'error': 'Land already registered on blockchain'}), 400
         
+        if registration_in_flight(land):
+            return jsonify({
+                'error': 'Blockchain registration already in progress',
+                'tx_hash': land.blockchain_tx_hash
+            }), 409
+        
+        try:
+            blockchain_mode = blockchain_write_mode(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Prepare land data for blockchain
         land_data = {
             'property_id': land.property_id,
@@ -169,14 +217,45 @@ def register_land_on_blockchain(land_id):
             'ipfs_hash': land.ipfs_hash or ''
         }
         
+        if blockchain_mode == 'outbox':
+            # Queued in the same transaction; `flask chain-worker` sends it
+            entry = enqueue_land_registration(land, land_data)
+            land.status = 'verified'
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Land registration queued for blockchain',
+                'outbox': entry.to_dict(),
+                'land': loaded(land).to_dict()
+            }), 202
+        
+        if blockchain_mode == 'async':
+            handle = blockchain_service.register_land_on_blockchain(
+                land_data,
+                wait=False,
+                on_settled=land_registration_callback(current_app._get_current_object(), land.id),
+                job_context={'land_id': land.id}
+            )
+            if not handle:
+                return jsonify({'error': 'Failed to submit land registration to blockchain'}), 500
+            
+            land.blockchain_tx_hash = handle['tx_hash']
+            land.status = 'verified'
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Land registration submitted to blockchain',
+                'job_id': handle['job_id'],
+                'tx_hash': handle['tx_hash'],
+                'land': loaded(land).to_dict()
+            }), 202
+        
         # Register on blockchain
         result = blockchain_service.register_land_on_blockchain(land_data)
         
         if result:
             # Update land record
-            land.token_id = result['token_id']
-            land.blockchain_tx_hash = result['tx_hash']
-            land.is_registered_on_blockchain = True
+            apply_land_registration(land, result)
             land.status = 'verified'
             
             db.session.commit()
@@ -185,11 +264,14 @@ def register_land_on_blockchain(land_id):
                 'message': 'Land registered on blockchain successfully',
                 'tx_hash': result['tx_hash'],
                 'token_id': result['token_id'],
-                'land': land.to_dict()
+                'land': loaded(land).to_dict()
             }), 200
         else:
             return jsonify({'error': 'Failed to register land on blockchain'}), 500
         
+    except TransactionRevertedError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'revert': e.to_dict()}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -262,9 +344,12 @@ def transfer_land(land_id):
         
         return jsonify({
             'message': 'Land transfer initiated successfully',
-            'transfer': transfer.to_dict()
+            'transfer': loaded(transfer).to_dict()
         }), 200
         
+    except TransactionRevertedError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'revert': e.to_dict()}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -288,6 +373,11 @@ def verify_land(land_id):
         verified = data.get('verified', True)
         auto_register_blockchain = data.get('auto_register_blockchain', True)  # Default to True
         
+        try:
+            blockchain_mode = blockchain_write_mode(data, APPROVAL_WRITE_MODES)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         blockchain_result = None
         
         if verified:
@@ -295,7 +385,7 @@ def verify_land(land_id):
             land.status = 'verified'
             
             # Automatically register on blockchain if conditions are met
-            if auto_register_blockchain and not land.is_registered_on_blockchain:
+            if auto_register_blockchain and not land.is_registered_on_blockchain and not registration_in_flight(land):
                 # Get owner for wallet address
                 owner = User.query.get(land.owner_id)
                 if owner and owner.wallet_address:
@@ -316,15 +406,31 @@ def verify_land(land_id):
                         }
                         
                         # Register on blockchain
-                        blockchain_result = blockchain_service.register_land_on_blockchain(land_data)
-                        
-                        if blockchain_result:
-                            # Update land with blockchain information
-                            land.token_id = blockchain_result.get('token_id')
-                            land.blockchain_tx_hash = blockchain_result.get('tx_hash')
-                            land.is_registered_on_blockchain = True
-                            land.blockchain_block_number = blockchain_result.get('block_number')
+                        if blockchain_mode == 'anchor':
+                            # Committed with the next Merkle root by `flask anchor-lands`
+                            blockchain_result = queue_land_anchor(land)
+                        elif blockchain_mode == 'outbox':
+                            entry = enqueue_land_registration(land, land_data)
+                            blockchain_result = {'status': 'pending', 'outbox_id': entry.id}
+                        elif blockchain_mode == 'async':
+                            blockchain_result = blockchain_service.register_land_on_blockchain(
+                                land_data,
+                                wait=False,
+                                on_settled=land_registration_callback(current_app._get_current_object(), land.id),
+                                job_context={'land_id': land.id}
+                            )
+                            if blockchain_result:
+                                land.blockchain_tx_hash = blockchain_result['tx_hash']
+                        else:
+                            blockchain_result = blockchain_service.register_land_on_blockchain(land_data)
+                            
+                            if blockchain_result:
+                                # Update land with blockchain information
+                                apply_land_registration(land, blockchain_result)
                             
+                    except TransactionRevertedError as e:
+                        print(f"Blockchain registration rejected by simulation: {str(e)}")
+                        blockchain_result = {'error': str(e), 'revert': e.to_dict()}
                     except Exception as e:
                         print(f"Blockchain registration failed: {str(e)}")
                         # Continue with verification even if blockchain registration fails
@@ -339,13 +445,17 @@ def verify_land(land_id):
         
         response_data = {
             'message': f'Land {"verified" if verified else "rejected"} successfully',
-            'land': land.to_dict()
+            'land': loaded(land).to_dict()
         }
         
         # Include blockchain registration result if attempted
         if blockchain_result:
             if 'error' in blockchain_result:
                 response_data['blockchain_warning'] = f"Land verified but blockchain registration failed: {blockchain_result['error']}"
+                if 'revert' in blockchain_result:
+                    response_data['blockchain_revert'] = blockchain_result['revert']
+            elif blockchain_result.get('status') == 'pending':
+                response_data['blockchain_pending'] = blockchain_result
             else:
                 response_data['blockchain_success'] = f"Land verified and registered on blockchain with token ID: {blockchain_result.get('token_id')}"
                 response_data['blockchain_data'] = blockchain_result
@@ -367,7 +477,7 @@ def get_map_data():
         # Get query parameters
         bounds = request.args.get('bounds')  # Format: "lat1,lng1,lat2,lng2"
         
-        query = Land.query.filter(Land.status == 'verified')
+        query = Land.query.options(*LAND).filter(Land.status == 'verified')
         
         # Apply bounds filter if provided
         if bounds:
@@ -528,7 +638,7 @@ def initiate_land_transfer(land_id):
         
         return jsonify({
             'message': 'Land transfer initiated successfully',
-            'transfer': transfer.to_dict(),
+            'transfer': loaded(transfer).to_dict(),
             'transfer_type': transfer_type
         }), 201
         
@@ -562,6 +672,11 @@ def execute_land_transfer(land_id, transfer_id):
         if transfer.status != 'pending':
             return jsonify({'error': f'Transfer is not pending (current status: {transfer.status})'}), 400
         
+        try:
+            blockchain_mode = blockchain_write_mode(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Get the land
         land = Land.query.get(land_id)
         if not land:
@@ -590,6 +705,22 @@ def execute_land_transfer(land_id, transfer_id):
                 'solution': f'The land owner needs to approve the backend address {backend_address} for transfers'
             }), 400
         
+        if blockchain_mode == 'outbox':
+            # Status change and outbox row commit together; the worker executes it
+            transfer.status = 'processing'
+            try:
+                entry = enqueue_land_transfer(transfer, land)
+            except OutboxConflict as e:
+                db.session.rollback()
+                return jsonify({'error': str(e)}), 409
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Land transfer queued for blockchain execution',
+                'transfer': loaded(transfer).to_dict(),
+                'outbox': entry.to_dict()
+            }), 202
+        
         # Execute transfer on blockchain
         try:
             transfer.status = 'processing'
@@ -597,23 +728,45 @@ def execute_land_transfer(land_id, transfer_id):
             
             print(f"✅ Transfer approved, proceeding with blockchain transfer. Reason: {approval_status.get('reason')}")
             
+            if blockchain_mode == 'async':
+                handle = blockchain_service.transfer_land_on_blockchain(
+                    token_id=land.token_id,
+                    to_address=transfer.to_wallet,
+                    price=transfer.price,
+                    from_address=land.wallet_address,
+                    wait=False,
+                    approval=approval_status,
+                    on_settled=land_transfer_callback(current_app._get_current_object(), transfer.id),
+                    job_context={'land_id': land.id, 'transfer_id': transfer.id}
+                )
+                if not handle:
+                    transfer.status = 'failed'
+                    db.session.commit()
+                    return jsonify({'error': 'Blockchain transfer failed'}), 500
+                
+                # The resolver completes the transfer once the receipt arrives
+                transfer.blockchain_tx_hash = handle['tx_hash']
+                db.session.commit()
+                
+                return jsonify({
+                    'message': 'Land transfer submitted to blockchain',
+                    'transfer': loaded(transfer).to_dict(),
+                    'job_id': handle['job_id'],
+                    'transaction_hash': handle['tx_hash']
+                }), 202
+            
             # Call blockchain transfer function
             tx_hash = blockchain_service.transfer_land_on_blockchain(
                 token_id=land.token_id,
                 to_address=transfer.to_wallet,
                 price=transfer.price,
-                from_address=land.wallet_address
+                from_address=land.wallet_address,
+                approval=approval_status
             )
             
             if tx_hash:
                 # Update transfer and land records
-                transfer.status = 'completed'
-                transfer.blockchain_tx_hash = tx_hash
-                transfer.completed_at = datetime.utcnow()
-                
-                # Update land ownership
-                land.owner_id = transfer.to_user_id
-                land.wallet_address = transfer.to_wallet
+                apply_transfer_completion(transfer, land, tx_hash)
                 
                 db.session.commit()
                 
@@ -627,7 +780,7 @@ def execute_land_transfer(land_id, transfer_id):
                 
                 return jsonify({
                     'message': 'Land transfer executed successfully on blockchain',
-                    'transfer': transfer.to_dict(),
+                    'transfer': loaded(transfer).to_dict(),
                     'transaction_hash': tx_hash
                 }), 200
             else:
@@ -635,6 +788,11 @@ def execute_land_transfer(land_id, transfer_id):
                 db.session.commit()
                 return jsonify({'error': 'Blockchain transfer failed'}), 500
                 
+        except TransactionRevertedError as e:
+            # Rejected by simulation: nothing was broadcast
+            transfer.status = 'failed'
+            db.session.commit()
+            return jsonify({'error': str(e), 'revert': e.to_dict()}), 400
         except Exception as blockchain_error:
             transfer.status = 'failed'
             db.session.commit()
@@ -682,7 +840,7 @@ def cancel_land_transfer(land_id, transfer_id):
         
         return jsonify({
             'message': 'Transfer cancelled successfully',
-            'transfer': transfer.to_dict()
+            'transfer': loaded(transfer).to_dict()
         }), 200
         
     except Exception as e:
@@ -700,25 +858,24 @@ def get_user_transfers():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Parse query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        # Parse query parameters (page / per_page / cursor are read by paginate_request)
         status = request.args.get('status')
         transfer_type = request.args.get('type')  # 'sent', 'received', 'all'
         
         # Build query
         if user.role == UserRole.ADMIN and transfer_type == 'all':
             # Admin can see all transfers
-            query = LandTransfer.query
+            query = LandTransfer.query.options(*TRANSFER_WITH_LAND)
         else:
             # Regular users see only their transfers
+            query = LandTransfer.query.options(*TRANSFER_WITH_LAND)
             if transfer_type == 'sent':
-                query = LandTransfer.query.filter_by(from_user_id=user_id)
+                query = query.filter_by(from_user_id=user_id)
             elif transfer_type == 'received':
-                query = LandTransfer.query.filter_by(to_user_id=user_id)
+                query = query.filter_by(to_user_id=user_id)
             else:
                 # Default: both sent and received
-                query = LandTransfer.query.filter(
+                query = query.filter(
                     or_(LandTransfer.from_user_id == user_id, LandTransfer.to_user_id == user_id)
                 )
         
@@ -726,15 +883,8 @@ def get_user_transfers():
         if status:
             query = query.filter_by(status=status)
         
-        # Order by most recent first
-        query = query.order_by(LandTransfer.initiated_at.desc())
-        
-        # Paginate
-        transfers = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # Paginate, most recent first
+        transfers = paginate_request(query, [LandTransfer.initiated_at, LandTransfer.id], descending=True)
         
         # Include land details in response
         transfer_data = []
@@ -742,7 +892,7 @@ def get_user_transfers():
             transfer_dict = transfer.to_dict()
             
             # Add land details
-            land = Land.query.get(transfer.land_id)
+            land = transfer.land
             if land:
                 transfer_dict['land'] = {
                     'id': land.id,
@@ -758,12 +908,11 @@ def get_user_transfers():
         
         return jsonify({
             'transfers': transfer_data,
-            'total': transfers.total,
-            'pages': transfers.pages,
-            'current_page': page,
-            'per_page': per_page
+            **transfers.meta
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -778,7 +927,8 @@ def get_transfer_details(transfer_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        transfer = LandTransfer.query.get(transfer_id)
+        # Parties, land and land owner are all serialized below
+        transfer = LandTransfer.query.options(*TRANSFER_WITH_LAND_OWNER).filter_by(id=transfer_id).first()
         if not transfer:
             return jsonify({'error': 'Transfer not found'}), 404
         
@@ -792,9 +942,8 @@ def get_transfer_details(transfer_id):
         transfer_dict = transfer.to_dict()
         
         # Add land details
-        land = Land.query.get(transfer.land_id)
-        if land:
-            transfer_dict['land'] = land.to_dict()
+        if transfer.land:
+            transfer_dict['land'] = transfer.land.to_dict()
         
         # Add blockchain verification if completed
         if transfer.status == 'completed' and transfer.blockchain_tx_hash:
@@ -806,6 +955,95 @@ def get_transfer_details(transfer_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@lands_bp.route('/blockchain/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_blockchain_job(job_id):
+    """Get the status of a blockchain write submitted with blockchain_mode=async"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        job = blockchain_service.receipt_resolver.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        # Only the owner of the land (or the parties of the transfer) can see the job
+        if user.role != UserRole.ADMIN:
+            if job.get('transfer_id'):
+                transfer = LandTransfer.query.get(job['transfer_id'])
+                allowed = transfer and user_id in (transfer.from_user_id, transfer.to_user_id)
+            else:
+                land = Land.query.get(job['land_id']) if job.get('land_id') else None
+                allowed = land and land.owner_id == user_id
+            if not allowed:
+                return jsonify({'error': 'Access denied'}), 403
+        
+        return jsonify({'job': job}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@lands_bp.route('/blockchain/outbox/<int:outbox_id>', methods=['GET'])
+@jwt_required()
+def get_blockchain_outbox_entry(outbox_id):
+    """Get the status of a blockchain write queued with blockchain_mode=outbox"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        entry = ChainOutbox.query.get(outbox_id)
+        if not entry:
+            return jsonify({'error': 'Outbox entry not found'}), 404
+        
+        # Only the owner of the land (or the parties of the transfer) can see the entry
+        if user.role != UserRole.ADMIN:
+            if entry.transfer_id:
+                transfer = LandTransfer.query.get(entry.transfer_id)
+                allowed = transfer and user_id in (transfer.from_user_id, transfer.to_user_id)
+            else:
+                land = Land.query.get(entry.land_id)
+                allowed = land and land.owner_id == user_id
+            if not allowed:
+                return jsonify({'error': 'Access denied'}), 403
+        
+        return jsonify({'outbox': entry.to_dict()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@lands_bp.route('/<int:land_id>/anchor-proof', methods=['GET'])
+@jwt_required()
+def get_land_anchor_proof(land_id):
+    """Verify a land's Merkle inclusion proof against its anchored root"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        land = Land.query.get(land_id)
+        if not land:
+            return jsonify({'error': 'Land not found'}), 404
+        
+        # Users can only see proofs for their own lands (unless admin)
+        if user.role != UserRole.ADMIN and land.owner_id != user_id:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        verification = verify_land_anchor(blockchain_service, land)
+        if 'error' in verification:
+            return jsonify(verification), 404
+        return jsonify(verification), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @lands_bp.route('/<int:land_id>/transfer-history', methods=['GET'])
 @jwt_required()
 def get_land_transfer_history(land_id):
@@ -826,7 +1064,7 @@ def get_land_transfer_history(land_id):
             return jsonify({'error': 'You are not authorized to view this land\'s transfer history'}), 403
         
         # Get all transfers for this land
-        transfers = LandTransfer.query.filter_by(land_id=land_id).order_by(
+        transfers = LandTransfer.query.options(*TRANSFER).filter_by(land_id=land_id).order_by(
             LandTransfer.initiated_at.desc()
         ).all()
         
@@ -835,20 +1073,40 @@ def get_land_transfer_history(land_id):
             transfer_dict = transfer.to_dict()
             transfer_history.append(transfer_dict)
         
-        # Also get blockchain transfer history if available
+        # Also get blockchain transfer history: from the event index when it has caught up with
+        # this land's writes, else from the local mirror (or a live read)
         blockchain_history = []
-        if land.is_registered_on_blockchain and land.token_id:
+        chain_synced_at = None
+        chain_source = None
+        chain_degraded = False
+        max_staleness = request.args.get('max_staleness', type=float)
+        indexed_at = index_synced_at(land, max_staleness)
+        if indexed_at:
+            blockchain_history = indexed_transfer_history(land.token_id)
+            chain_synced_at = indexed_at.isoformat()
+            chain_source = 'index'
+        elif land.is_registered_on_blockchain and land.token_id:
             try:
-                blockchain_transfers = blockchain_service.get_land_transfer_history(land.token_id)
-                if blockchain_transfers:
-                    blockchain_history = blockchain_transfers
+                with read_deadline():
+                    chain_state = mirrored_chain_state(blockchain_service, land.token_id, max_staleness)
+                if chain_state:
+                    blockchain_history = chain_state['transfer_history']
+                    chain_synced_at = chain_state['chain_synced_at']
+                    chain_source = chain_state['source']
+                    chain_degraded = chain_state['degraded']
+                else:
+                    chain_degraded = True
             except Exception as e:
+                chain_degraded = True
                 print(f"Error fetching blockchain history: {e}")
         
         return jsonify({
-            'land': land.to_dict(),
+            'land': loaded(land).to_dict(),
             'database_transfers': transfer_history,
-            'blockchain_transfers': blockchain_history
+            'blockchain_transfers': blockchain_history,
+            'chain_synced_at': chain_synced_at,
+            'chain_source': chain_source,
+            'chain_degraded': chain_degraded
         }), 200
         
     except Exception as e:
@@ -0,0 +1,49 @@
+"""
+Eager-loading policy for serialized models.
+
+Land.to_dict() reads owner_user and LandTransfer.to_dict() reads from_user
+and to_user. Loaded lazily that is one SELECT per row, so every endpoint
+that serializes a list adds the matching options below to its query (one
+extra SELECT per relationship for the whole page), and endpoints that
+serialize a single object pass it through loaded() first.
+
+Relationships use SQLALCHEMY_LAZY_LOAD as their lazy strategy ('select' by
+default). test_eager_loading.py runs with SQLALCHEMY_LAZY_LOAD=raise, so a
+relationship serialized without eager loading fails instead of quietly
+adding a query per row.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers, selectinload
+
+from app import db
+from app.models import Land, LandTransfer
+
+# Backref attributes (Land.owner_user, LandTransfer.land) exist once mappers are configured
+configure_mappers()
+
+# Lands serialized with to_dict()
+LAND = (selectinload(Land.owner_user),)
+
+# Transfers serialized with to_dict()
+TRANSFER = (selectinload(LandTransfer.from_user), selectinload(LandTransfer.to_user))
+
+# ...plus a summary of transfer.land
+TRANSFER_WITH_LAND = TRANSFER + (selectinload(LandTransfer.land),)
+
+# ...plus transfer.land.to_dict()
+TRANSFER_WITH_LAND_OWNER = TRANSFER + (selectinload(LandTransfer.land).selectinload(Land.owner_user),)
+
+SERIALIZED_RELATIONSHIPS = {
+    Land: ('owner_user',),
+    LandTransfer: ('from_user', 'to_user')
+}
+
+
+def loaded(obj):
+    """Load the relationships obj.to_dict() reads that are not loaded yet (e.g. after a commit)"""
+    unloaded = inspect(obj).unloaded
+    names = [name for name in SERIALIZED_RELATIONSHIPS[type(obj)] if name in unloaded]
+    if names:
+        db.session.refresh(obj, attribute_names=names)
+    return obj
@@ -0,0 +1,198 @@
+"""
+In-process EVM backend for offline tests and benchmarks (BLOCKCHAIN_BACKEND=eth_tester).
+
+Runs eth-tester/py-evm inside the process, funds the backend signing account
+and deploys LandRegistry from the compiled artifact (abi + bytecode at
+CONTRACT_ARTIFACT_PATH). Two knobs make runs reproducible:
+
+- LOCAL_CHAIN_BLOCK_TIME: seconds between blocks. 0 (default) mines each
+  transaction immediately; > 0 queues transactions until a background miner
+  seals the next block, like a real chain.
+- LOCAL_CHAIN_LATENCY_MS / LOCAL_CHAIN_LATENCY_JITTER_MS: delay added to
+  every JSON-RPC call to emulate a remote node. Jitter is drawn from a
+  generator seeded with LOCAL_CHAIN_SEED.
+
+eth-tester is an optional dependency: pip install "eth-tester[py-evm]==v0.9.1-b.1"
+"""
+
+import ast
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, Any
+
+from eth_abi import encode
+from web3 import Web3
+
+from app.tx_simulation import ERROR_SELECTOR
+
+BLOCKCHAIN_BACKENDS = ('rpc', 'eth_tester')
+
+
+def blockchain_backend() -> str:
+    """Backend selected by BLOCKCHAIN_BACKEND"""
+    backend = os.getenv('BLOCKCHAIN_BACKEND', 'rpc').lower()
+    if backend not in BLOCKCHAIN_BACKENDS:
+        raise ValueError(f"Unknown BLOCKCHAIN_BACKEND '{backend}', expected one of {', '.join(BLOCKCHAIN_BACKENDS)}")
+    return backend
+
+
+def revert_error(error: Exception) -> Dict[str, Any]:
+    """JSON-RPC error (geth style, code 3) for an eth-tester TransactionFailed"""
+    message = error.args[0] if error.args else ''
+    data = None
+    if isinstance(message, bytes):
+        data = message
+    elif isinstance(message, str) and message.startswith('execution reverted: '):
+        reason = message[len('execution reverted: '):]
+        if reason.startswith(("b'", 'b"')):
+            # Custom error: eth-tester hands over the raw revert data as a bytes repr
+            data = ast.literal_eval(reason)
+        else:
+            data = ERROR_SELECTOR + encode(['string'], [reason])
+    response = {'code': 3, 'message': 'execution reverted'}
+    if data:
+        response['data'] = Web3.to_hex(data)
+    return response
+
+
+def local_chain_provider(tester, lock: threading.Lock, latency_ms: float, jitter_ms: float, seed: int):
+    """EthereumTesterProvider that serializes requests and adds emulated network latency.
+
+    Done in the provider rather than as middleware so raw provider calls
+    (e.g. BlockchainService.batch_request's sequential fallback) see it too.
+    """
+    from web3 import EthereumTesterProvider
+    from eth_tester.exceptions import TransactionFailed
+
+    rng = random.Random(seed)
+
+    class LocalChainProvider(EthereumTesterProvider):
+        def make_request(self, method, params):
+            if latency_ms or jitter_ms:
+                with lock:
+                    delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0)
+                time.sleep(max(0.0, delay) / 1000)
+            # eth-tester is not thread-safe; the miner thread takes the same lock
+            with lock:
+                try:
+                    return super().make_request(method, params)
+                except TransactionFailed as e:
+                    # Answer like a node so web3 raises ContractLogicError with the revert data
+                    return {'jsonrpc': '2.0', 'id': 0, 'error': revert_error(e)}
+
+    return LocalChainProvider(tester)
+
+
+class LocalChain:
+    def __init__(self, block_time: float = None, latency_ms: float = None,
+                 jitter_ms: float = None, seed: int = None):
+        try:
+            from eth_tester import EthereumTester, PyEVMBackend
+        except ImportError as e:
+            raise ImportError(
+                "BLOCKCHAIN_BACKEND=eth_tester needs eth-tester: "
+                "pip install \"eth-tester[py-evm]==v0.9.1-b.1\""
+            ) from e
+
+        self.block_time = block_time if block_time is not None else float(os.getenv('LOCAL_CHAIN_BLOCK_TIME', 0))
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv('LOCAL_CHAIN_LATENCY_MS', 0))
+        self.jitter_ms = jitter_ms if jitter_ms is not None else float(os.getenv('LOCAL_CHAIN_LATENCY_JITTER_MS', 0))
+        self.seed = seed if seed is not None else int(os.getenv('LOCAL_CHAIN_SEED', 0))
+
+        self.backend = PyEVMBackend()
+        self.tester = EthereumTester(self.backend)
+        self._lock = threading.RLock()
+        self.w3 = Web3(local_chain_provider(self.tester, self._lock, self.latency_ms, self.jitter_ms, self.seed))
+        # Nonces restart at 0 with every fresh chain, so never share the on-disk nonce state
+        self.nonce_state_path = os.path.join(
+            tempfile.gettempdir(), f"landregistry-nonce-local-{os.getpid()}-{id(self)}.json"
+        )
+
+        self._miner = None
+        self._stop = threading.Event()
+        if self.block_time > 0:
+            self.tester.disable_auto_mine_transactions()
+            self._miner = threading.Thread(target=self._mine, name='local-chain-miner', daemon=True)
+            self._miner.start()
+
+    def _mine(self):
+        while not self._stop.wait(self.block_time):
+            with self._lock:
+                self.tester.mine_blocks(1)
+
+    def stop(self):
+        self._stop.set()
+        if os.path.exists(self.nonce_state_path):
+            os.remove(self.nonce_state_path)
+
+    @property
+    def funder(self) -> str:
+        return self.tester.get_accounts()[0]
+
+    def default_private_key(self) -> str:
+        """Private key of the first pre-funded test account"""
+        return self.backend.account_keys[0].to_hex()
+
+    def fund(self, address: str, ether: int = 1000):
+        """Send test ether to address and wait until it is mined"""
+        tx_hash = self.w3.eth.send_transaction({
+            'from': self.funder,
+            'to': Web3.to_checksum_address(address),
+            'value': Web3.to_wei(ether, 'ether')
+        })
+        self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=max(30, self.block_time * 5))
+
+    def deploy_from_artifact(self, artifact_path: str, private_key: str) -> str:
+        """Deploy the contract in a Hardhat artifact from the backend account; returns its address"""
+        if not os.path.exists(artifact_path):
+            raise FileNotFoundError(f"Contract artifact not found at {artifact_path}")
+        with open(artifact_path, 'r') as f:
+            artifact = json.load(f)
+        if not artifact.get('bytecode') or artifact['bytecode'] == '0x':
+            raise ValueError(f"Artifact {artifact_path} has no deployable bytecode")
+
+        account = self.w3.eth.account.from_key(private_key)
+        contract = self.w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+        transaction = contract.constructor().build_transaction({
+            'from': account.address,
+            'nonce': self.w3.eth.get_transaction_count(account.address),
+            'chainId': self.w3.eth.chain_id
+        })
+        signed = account.sign_transaction(transaction)
+        tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=max(30, self.block_time * 5))
+        return receipt.contractAddress
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'eth_tester',
+            'block_time': self.block_time,
+            'latency_ms': self.latency_ms,
+            'jitter_ms': self.jitter_ms,
+            'seed': self.seed,
+            'block_number': self.w3.eth.block_number
+        }
+
+
+def attach_local_chain(service, artifact_path: str) -> LocalChain:
+    """Point a BlockchainService at a fresh in-process chain with LandRegistry deployed"""
+    chain = LocalChain()
+    service.local_chain = chain
+    service.w3 = chain.w3
+    service.chain_id = chain.w3.eth.chain_id
+    service.rpc_url = 'eth_tester://local'
+
+    if not service.private_key:
+        service.private_key = chain.default_private_key()
+    backend_address = chain.w3.eth.account.from_key(service.private_key).address
+    if chain.w3.eth.get_balance(backend_address) == 0:
+        chain.fund(backend_address)
+
+    service.contract_address = chain.deploy_from_artifact(artifact_path, service.private_key)
+    print(f"🧪 Local chain ready: LandRegistry at {service.contract_address}, "
+          f"block time {chain.block_time}s, latency {chain.latency_ms}ms")
+    return chain
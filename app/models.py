@@ -2,6 +2,11 @@ from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from enum import Enum
+import os
+
+# Lazy strategy of every relationship; tests set 'raise' so serializing a
+# relationship that was not eager-loaded fails (see app.loading)
+LAZY_LOAD = os.getenv('SQLALCHEMY_LAZY_LOAD', 'select')
 
 class UserRole(Enum):
     USER = "user"
@@ -25,7 +30,8 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    lands = db.relationship('Land', backref='owner_user', lazy=True, foreign_keys='Land.owner_id')
+    lands = db.relationship('Land', backref=db.backref('owner_user', lazy=LAZY_LOAD), lazy=LAZY_LOAD,
+                            foreign_keys='Land.owner_id')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -72,12 +78,31 @@ class Land(db.Model):
     blockchain_block_number = db.Column(db.Integer, nullable=True)  # Block number of registration
     ipfs_hash = db.Column(db.String(100), nullable=True)  # For documents
     status = db.Column(db.String(20), default='pending', nullable=False)  # pending, verified, rejected
+    anchor_state = db.Column(db.String(20), nullable=True, index=True)  # queued, anchoring, anchored (Merkle anchoring mode)
+    anchor_id = db.Column(db.Integer, db.ForeignKey('land_anchors.id'), nullable=True)
+    anchor_record = db.Column(db.Text, nullable=True)  # canonical JSON record committed in the Merkle tree
+    anchor_proof = db.Column(db.Text, nullable=True)  # JSON list of sibling hashes up to the root
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    transfers = db.relationship('LandTransfer', backref='land', lazy=True)
-    documents = db.relationship('LandDocument', backref='land', lazy=True)
+    transfers = db.relationship('LandTransfer', backref=db.backref('land', lazy=LAZY_LOAD), lazy=LAZY_LOAD)
+    documents = db.relationship('LandDocument', backref=db.backref('land', lazy=LAZY_LOAD), lazy=LAZY_LOAD)
+    
+    # Indexes for the list / statistics endpoints (see test_query_plans.py); lists are
+    # paginated on id, so the list indexes end with it
+    __table_args__ = (
+        db.Index('ix_lands_owner_id', 'owner_id', 'id'),
+        db.Index('ix_lands_owner_id_status', 'owner_id', 'status', 'id'),
+        db.Index('ix_lands_status_property_type', 'status', 'property_type', 'id'),
+        db.Index('ix_lands_property_type', 'property_type', 'id'),
+        db.Index('ix_lands_status_latitude', 'status', 'latitude'),  # map-data bounds
+        db.Index('ix_lands_created_at', 'created_at'),
+        db.Index('ix_lands_status_id', 'status', 'id'),
+        db.Index('ix_lands_registered_owner_id', 'owner_id',
+                 postgresql_where=db.text('is_registered_on_blockchain'),
+                 sqlite_where=db.text('is_registered_on_blockchain = 1')),
+    )
     
     def to_dict(self):
         return {
@@ -101,6 +126,8 @@ class Land(db.Model):
             'blockchain_block_number': self.blockchain_block_number,
             'ipfs_hash': self.ipfs_hash,
             'status': self.status,
+            'anchor_state': self.anchor_state,
+            'anchor_id': self.anchor_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'owner': self.owner_user.to_dict() if self.owner_user else None
@@ -122,8 +149,21 @@ class LandTransfer(db.Model):
     completed_at = db.Column(db.DateTime, nullable=True)
     
     # Relationships
-    from_user = db.relationship('User', foreign_keys=[from_user_id], backref='transfers_from')
-    to_user = db.relationship('User', foreign_keys=[to_user_id], backref='transfers_to')
+    from_user = db.relationship('User', foreign_keys=[from_user_id], lazy=LAZY_LOAD,
+                                backref=db.backref('transfers_from', lazy=LAZY_LOAD))
+    to_user = db.relationship('User', foreign_keys=[to_user_id], lazy=LAZY_LOAD,
+                              backref=db.backref('transfers_to', lazy=LAZY_LOAD))
+    
+    # Every transfer list is ordered by (initiated_at, id), newest first
+    __table_args__ = (
+        db.Index('ix_land_transfers_from_user_id_initiated_at', 'from_user_id', 'initiated_at', 'id'),
+        db.Index('ix_land_transfers_to_user_id_initiated_at', 'to_user_id', 'initiated_at', 'id'),
+        db.Index('ix_land_transfers_land_id_initiated_at', 'land_id', 'initiated_at', 'id'),
+        db.Index('ix_land_transfers_status_initiated_at', 'status', 'initiated_at', 'id'),
+        db.Index('ix_land_transfers_initiated_at', 'initiated_at', 'id'),
+        db.Index('ix_land_transfers_pending_land_id', 'land_id',
+                 postgresql_where=db.text("status = 'pending'"), sqlite_where=db.text("status = 'pending'")),
+    )
     
     def to_dict(self):
         return {
@@ -157,7 +197,7 @@ class LandDocument(db.Model):
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    uploader = db.relationship('User', backref='uploaded_documents')
+    uploader = db.relationship('User', lazy=LAZY_LOAD, backref=db.backref('uploaded_documents', lazy=LAZY_LOAD))
     
     def to_dict(self):
         return {
@@ -172,4 +212,206 @@ class LandDocument(db.Model):
             'uploaded_by': self.uploaded_by,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
             'uploader': self.uploader.to_dict() if self.uploader else None
-        }
\ No newline at end of file
+        }
+
+class ChainLandEvent(db.Model):
+    """LandRegistered / LandTransferred log indexed from the contract"""
+    __tablename__ = 'chain_land_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_name = db.Column(db.String(32), nullable=False)  # LandRegistered, LandTransferred
+    token_id = db.Column(db.Integer, nullable=False, index=True)
+    property_id = db.Column(db.String(50), nullable=True, index=True)  # LandRegistered only
+    owner = db.Column(db.String(42), nullable=True)  # LandRegistered only
+    from_address = db.Column(db.String(42), nullable=True)  # LandTransferred only
+    to_address = db.Column(db.String(42), nullable=True)  # LandTransferred only
+    location = db.Column(db.String(255), nullable=True)
+    area = db.Column(db.Numeric(78, 0), nullable=True)
+    price = db.Column(db.Numeric(78, 0), nullable=True)  # in wei
+    transfer_date = db.Column(db.BigInteger, nullable=True)  # unix timestamp from the event
+    block_number = db.Column(db.Integer, nullable=False, index=True)
+    block_hash = db.Column(db.String(66), nullable=False)
+    tx_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False)
+    indexed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('tx_hash', 'log_index', name='uq_chain_land_events_tx_log'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_name': self.event_name,
+            'token_id': self.token_id,
+            'property_id': self.property_id,
+            'owner': self.owner,
+            'from': self.from_address,
+            'to': self.to_address,
+            'location': self.location,
+            'area': int(self.area) if self.area is not None else None,
+            'price': str(self.price) if self.price is not None else None,
+            'transfer_date': self.transfer_date,
+            'block_number': self.block_number,
+            'block_hash': self.block_hash,
+            'tx_hash': self.tx_hash,
+            'log_index': self.log_index,
+            'indexed_at': self.indexed_at.isoformat() if self.indexed_at else None
+        }
+
+class ChainIndexerCheckpoint(db.Model):
+    """Last block an indexer has fully processed"""
+    __tablename__ = 'chain_indexer_checkpoints'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_block = db.Column(db.Integer, nullable=False)
+    last_block_hash = db.Column(db.String(66), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_block': self.last_block,
+            'last_block_hash': self.last_block_hash,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ChainOutbox(db.Model):
+    """Blockchain write queued in the same transaction as the Land / LandTransfer change"""
+    __tablename__ = 'chain_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    operation = db.Column(db.String(32), nullable=False)  # register_land, transfer_land
+    land_id = db.Column(db.Integer, db.ForeignKey('lands.id'), nullable=False, index=True)
+    transfer_id = db.Column(db.Integer, db.ForeignKey('land_transfers.id'), nullable=True)
+    payload = db.Column(db.Text, nullable=False)  # JSON arguments for the contract call
+    state = db.Column(db.String(20), default='pending', nullable=False, index=True)  # pending, signed, submitted, confirmed, failed
+    nonce = db.Column(db.Integer, nullable=True)
+    tx_hash = db.Column(db.String(66), nullable=True)
+    raw_tx = db.Column(db.Text, nullable=True)  # signed transaction, persisted before broadcast
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # At most one unsettled row per land and operation, however many requests enqueue at once
+    __table_args__ = (
+        db.Index('ix_chain_outbox_open_land_operation', 'land_id', 'operation', unique=True,
+                 postgresql_where=db.text("state IN ('pending', 'signed', 'submitted')"),
+                 sqlite_where=db.text("state IN ('pending', 'signed', 'submitted')")),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'operation': self.operation,
+            'land_id': self.land_id,
+            'transfer_id': self.transfer_id,
+            'state': self.state,
+            'nonce': self.nonce,
+            'tx_hash': self.tx_hash,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ChainLandMirror(db.Model):
+    """Local copy of a token's on-chain land details and transfer history"""
+    __tablename__ = 'chain_land_mirror'
+    
+    token_id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.String(50), nullable=True, index=True)
+    owner = db.Column(db.String(42), nullable=True)
+    location = db.Column(db.String(255), nullable=True)
+    area = db.Column(db.Numeric(78, 0), nullable=True)
+    property_type = db.Column(db.String(50), nullable=True)
+    registration_date = db.Column(db.BigInteger, nullable=True)
+    is_verified = db.Column(db.Boolean, nullable=True)
+    ipfs_hash = db.Column(db.String(100), nullable=True)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    transfer_history = db.Column(db.Text, nullable=True)  # JSON list, same shape as getLandTransferHistory
+    chain_synced_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def land_details(self):
+        """Same shape as BlockchainService.get_land_details_from_blockchain"""
+        return {
+            'id': self.token_id,
+            'property_id': self.property_id,
+            'owner': self.owner,
+            'location': self.location,
+            'area': int(self.area) if self.area is not None else None,
+            'property_type': self.property_type,
+            'registration_date': self.registration_date,
+            'is_verified': self.is_verified,
+            'ipfs_hash': self.ipfs_hash,
+            'latitude': self.latitude,
+            'longitude': self.longitude
+        }
+
+class LandAnchor(db.Model):
+    """Merkle root over a batch of land records, committed on chain in one transaction"""
+    __tablename__ = 'land_anchors'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    merkle_root = db.Column(db.String(66), nullable=False, index=True)
+    leaf_count = db.Column(db.Integer, nullable=False)
+    state = db.Column(db.String(20), default='pending', nullable=False)  # pending, submitted, confirmed, failed
+    tx_hash = db.Column(db.String(66), nullable=True)
+    block_number = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    anchored_at = db.Column(db.DateTime, nullable=True)
+    
+    lands = db.relationship('Land', backref=db.backref('anchor', lazy=LAZY_LOAD), lazy=LAZY_LOAD)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'merkle_root': self.merkle_root,
+            'leaf_count': self.leaf_count,
+            'state': self.state,
+            'tx_hash': self.tx_hash,
+            'block_number': self.block_number,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'anchored_at': self.anchored_at.isoformat() if self.anchored_at else None
+        }
+
+class TxReplacement(db.Model):
+    """Fee-bumped re-broadcast of a stuck transaction at the same nonce (see app.tx_accelerator)"""
+    __tablename__ = 'tx_replacements'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    nonce = db.Column(db.Integer, nullable=False)
+    original_tx_hash = db.Column(db.String(66), nullable=False, index=True)  # first transaction of the chain
+    replaced_tx_hash = db.Column(db.String(66), nullable=False)
+    tx_hash = db.Column(db.String(66), nullable=False, unique=True)
+    max_fee_per_gas = db.Column(db.BigInteger, nullable=True)
+    max_priority_fee_per_gas = db.Column(db.BigInteger, nullable=True)
+    gas_price = db.Column(db.BigInteger, nullable=True)  # legacy transactions
+    state = db.Column(db.String(20), default='pending', nullable=False)  # pending, mined, superseded
+    mined_tx_hash = db.Column(db.String(66), nullable=True)  # whichever transaction of the chain was mined
+    block_number = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    settled_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nonce': self.nonce,
+            'original_tx_hash': self.original_tx_hash,
+            'replaced_tx_hash': self.replaced_tx_hash,
+            'tx_hash': self.tx_hash,
+            'max_fee_per_gas': self.max_fee_per_gas,
+            'max_priority_fee_per_gas': self.max_priority_fee_per_gas,
+            'gas_price': self.gas_price,
+            'state': self.state,
+            'mined_tx_hash': self.mined_tx_hash,
+            'block_number': self.block_number,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'settled_at': self.settled_at.isoformat() if self.settled_at else None
+        }
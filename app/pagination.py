@@ -0,0 +1,170 @@
+"""
+Offset and keyset (cursor) pagination for the list endpoints.
+
+?page=&per_page= keeps working as before (LIMIT/OFFSET plus a total). A
+request with ?cursor= (empty for the first page) is paginated on a stable
+sort key instead, e.g. (initiated_at, id): the next page is read with
+WHERE (initiated_at, id) < (last row's values), so deep pages cost the same
+as the first one. Responses then carry next_cursor / prev_cursor, opaque
+strings (base64 JSON of the boundary row's key and the direction) to send
+back as ?cursor=; null means there is no page in that direction.
+
+?count= picks how the total is computed: exact (COUNT(*), the default for
+offset pages), estimate (PostgreSQL planner statistics: pg_class.reltuples
+for an unfiltered table, the EXPLAIN row estimate for a filtered query;
+exact where no statistics exist) or none (no count at all, the default for
+cursor pages; offset pages then report has_next for infinite scroll).
+"""
+
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import request
+from sqlalchemy import DateTime, literal, text, tuple_
+
+from app import db
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+class PaginationError(ValueError):
+    """Bad page / cursor / count parameters (answered with 400)"""
+
+
+class InvalidCursor(PaginationError):
+    """The cursor was not issued by this endpoint"""
+
+
+class Page:
+    def __init__(self, items: List[Any], meta: Dict[str, Any]):
+        self.items = items
+        self.meta = meta  # response fields besides the items
+
+
+def encode_cursor(values: List[Any], direction: str) -> str:
+    payload = {
+        'd': direction,
+        'k': [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, keys) -> Tuple[str, List[Any]]:
+    """(direction, key values) of a cursor for the given sort key columns"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        direction, values = payload['d'], payload['k']
+        if direction not in ('next', 'prev') or len(values) != len(keys):
+            raise ValueError(cursor)
+        return direction, [
+            datetime.fromisoformat(value) if isinstance(key.type, DateTime) else value
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _key_values(item, keys) -> List[Any]:
+    return [getattr(item, key.key) for key in keys]
+
+
+def keyset_page(query, keys, per_page: int, cursor: Optional[str] = None, descending: bool = False) -> Page:
+    """One page of query ordered by keys (the last key must be unique, e.g. id)"""
+    per_page = max(per_page, 1)
+    direction, values = decode_cursor(cursor, keys) if cursor else ('next', None)
+    backwards = direction == 'prev'
+    # Walking back reads in the opposite order and flips the page afterwards
+    reverse = descending != backwards
+
+    if values is not None:
+        row = tuple_(*keys)
+        bound = tuple_(*[literal(value, key.type) for key, value in zip(keys, values)])
+        query = query.filter(row < bound if reverse else row > bound)
+    query = query.order_by(None).order_by(*[key.desc() if reverse else key.asc() for key in keys])
+
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if backwards:
+        items.reverse()
+
+    next_cursor = prev_cursor = None
+    if items:
+        if backwards or has_more:
+            next_cursor = encode_cursor(_key_values(items[-1], keys), 'next')
+        if has_more if backwards else values is not None:
+            prev_cursor = encode_cursor(_key_values(items[0], keys), 'prev')
+    return Page(items, {'next_cursor': next_cursor, 'prev_cursor': prev_cursor, 'per_page': per_page})
+
+
+def estimate_count(query) -> Optional[int]:
+    """Planner estimate of the rows query returns (PostgreSQL only), None without statistics"""
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    if query.whereclause is None:
+        table = query.column_descriptions[0]['entity'].__table__
+        reltuples = db.session.execute(
+            text('SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)'), {'table': table.name}
+        ).scalar()
+        # -1 until the table is first vacuumed / analyzed
+        return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+
+    compiled = query.order_by(None).statement.compile(bind)
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_total(query, count: str, per_page: int) -> Dict[str, Any]:
+    """total / pages response fields for count=exact or count=estimate"""
+    total = estimate_count(query) if count == 'estimate' else None
+    estimated = total is not None
+    if total is None:
+        total = query.order_by(None).count()
+    return {'total': total, 'pages': math.ceil(total / per_page), 'total_is_estimate': estimated}
+
+
+def paginate_request(query, keys, descending: bool = False) -> Page:
+    """Cursor page when the request has ?cursor=, else the page/per_page offset page"""
+    per_page = request.args.get('per_page', 10, type=int)
+    cursor_mode = 'cursor' in request.args
+    count = request.args.get('count', 'none' if cursor_mode else 'exact')
+    if count not in COUNT_MODES:
+        raise PaginationError(f"count must be one of: {', '.join(COUNT_MODES)}")
+
+    if cursor_mode:
+        page = keyset_page(query, keys, per_page, request.args.get('cursor') or None, descending)
+        if count != 'none':
+            page.meta.update(count_total(query, count, page.meta['per_page']))
+        return page
+
+    page = request.args.get('page', 1, type=int)
+    ordered = query.order_by(None).order_by(*[key.desc() if descending else key.asc() for key in keys])
+    if count == 'exact':
+        pagination = ordered.paginate(page=page, per_page=per_page, error_out=False)
+        return Page(pagination.items, {
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': page,
+            'per_page': per_page
+        })
+
+    # No COUNT(*): one extra row tells whether another page follows
+    page, per_page = max(page, 1), max(per_page, 1)
+    items = ordered.limit(per_page + 1).offset((page - 1) * per_page).all()
+    meta = {
+        'total': None,
+        'pages': None,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': len(items) > per_page
+    }
+    if count == 'estimate':
+        meta.update(count_total(query, count, per_page))
+    return Page(items[:per_page], meta)
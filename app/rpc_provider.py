@@ -0,0 +1,321 @@
+"""
+Multi-endpoint JSON-RPC provider with latency-aware routing.
+
+Every endpoint keeps an exponentially weighted moving average of its latency
+and error rate. Reads go to the fastest healthy endpoint and can be hedged:
+if the answer has not arrived after RPC_HEDGE_AFTER_MS, the same request is
+sent to the next best endpoint and whichever answers first wins. Writes (and
+the nonce lookups they depend on) stay sticky to one endpoint so the mempool
+view stays consistent, moving only when that endpoint fails.
+
+Both providers share pooled keep-alive requests.Sessions built by
+build_rpc_session(), with (connect, read) timeouts and per-pool stats.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider
+from web3.datastructures import NamedElementOnion
+from web3.middleware.exception_retry_request import check_if_retry_on_failure
+from web3.providers.base import JSONBaseProvider
+
+from app.circuit_breaker import clamp_timeout, deadline_remaining
+
+# Methods that must hit the same node as the transactions we broadcast
+STICKY_METHODS = {
+    'eth_sendRawTransaction',
+    'eth_sendTransaction',
+    'eth_getTransactionCount',
+}
+
+
+def build_rpc_session(pool_size: int = None, compression: bool = None) -> requests.Session:
+    """requests.Session with a sized keep-alive pool for JSON-RPC traffic"""
+    pool_size = pool_size or int(os.getenv('RPC_POOL_SIZE', 10))
+    if compression is None:
+        compression = os.getenv('RPC_HTTP_COMPRESSION', 'true').lower() == 'true'
+
+    session = requests.Session()
+    # Retries are handled by web3's retry middleware and endpoint failover
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Content-Type': 'application/json',
+        'Connection': 'keep-alive',
+        'Accept-Encoding': 'gzip, deflate' if compression else 'identity'
+    })
+    return session
+
+
+def rpc_timeouts(read_timeout: float = None) -> tuple:
+    """(connect, read) timeout pair from RPC_CONNECT_TIMEOUT / RPC_TIMEOUT"""
+    connect_timeout = float(os.getenv('RPC_CONNECT_TIMEOUT', 3))
+    return connect_timeout, read_timeout or float(os.getenv('RPC_TIMEOUT', 10))
+
+
+def session_pool_stats(session: requests.Session) -> List[Dict[str, Any]]:
+    """Per-host urllib3 pool counters: new connections opened vs. reused"""
+    stats = []
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats.append({
+                'host': f"{pool.scheme}://{pool.host}:{pool.port}",
+                'new_connections': pool.num_connections,
+                'requests': pool.num_requests,
+                'reused_connections': max(0, pool.num_requests - pool.num_connections),
+                'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None),
+                'max_size': pool.pool.maxsize
+            })
+    return stats
+
+
+def deadline_aware_retry_middleware(make_request, w3):
+    """HTTPProvider's retry middleware without the worst case of a hung node.
+
+    Read timeouts are not retried (the stock middleware retries them five
+    times, turning one RPC_TIMEOUT into five), and no retry starts once the
+    rpc_deadline cannot cover the backoff.
+    """
+    retries = int(os.getenv('RPC_RETRIES', 3))
+    backoff = float(os.getenv('RPC_RETRY_BACKOFF', 0.3))
+
+    def middleware(method, params):
+        if not check_if_retry_on_failure(method):
+            return make_request(method, params)
+        for attempt in range(retries):
+            try:
+                return make_request(method, params)
+            except requests.exceptions.ReadTimeout:
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.HTTPError,
+                    requests.exceptions.Timeout, requests.exceptions.TooManyRedirects):
+                remaining = deadline_remaining()
+                if attempt == retries - 1 or (remaining is not None and remaining <= backoff):
+                    raise
+                time.sleep(backoff)
+    return middleware
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider that sends every request through one shared pooled session.
+
+    The stock provider caches a session per thread, so background threads
+    each open their own connections; this one reuses a single pool.
+    """
+
+    _middlewares = NamedElementOnion([(deadline_aware_retry_middleware, 'http_retry_request')])
+
+    def __init__(self, endpoint_uri: str, session: requests.Session = None, timeout: float = None):
+        super().__init__(endpoint_uri)
+        self.session = session or build_rpc_session()
+        self.timeout = rpc_timeouts(timeout)
+
+    def _post(self, body: bytes) -> bytes:
+        response = self.session.post(self.endpoint_uri, data=body, timeout=clamp_timeout(self.timeout))
+        response.raise_for_status()
+        return response.content
+
+    def make_request(self, method, params) -> Dict[str, Any]:
+        return self.decode_rpc_response(self._post(self.encode_rpc_request(method, params)))
+
+    def make_batch_request(self, payload: List[Dict[str, Any]]) -> Any:
+        """POST a JSON-RPC batch over the pooled session"""
+        return json.loads(self._post(json.dumps(payload).encode()))
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        return session_pool_stats(self.session)
+
+
+class EndpointState:
+    """Moving latency / error statistics for one RPC endpoint"""
+
+    def __init__(self, uri: str, alpha: float):
+        self.uri = uri
+        self.alpha = alpha
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedged_wins = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool, cooldown: float):
+        with self._lock:
+            self.requests += 1
+            sample = 0.0 if ok else 1.0
+            self.error_rate = (1 - self.alpha) * self.error_rate + self.alpha * sample
+            if ok:
+                self.latency_ms = latency_ms if self.latency_ms is None else \
+                    (1 - self.alpha) * self.latency_ms + self.alpha * latency_ms
+            else:
+                self.errors += 1
+                self.cooldown_until = time.monotonic() + cooldown
+
+    def healthy(self, max_error_rate: float) -> bool:
+        return time.monotonic() >= self.cooldown_until and self.error_rate < max_error_rate
+
+    def to_dict(self, max_error_rate: float) -> Dict[str, Any]:
+        return {
+            'uri': self.uri,
+            'healthy': self.healthy(max_error_rate),
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'hedged_wins': self.hedged_wins,
+            'cooldown_remaining': max(0.0, round(self.cooldown_until - time.monotonic(), 1))
+        }
+
+
+class MultiEndpointProvider(JSONBaseProvider):
+    def __init__(self, endpoint_uris: List[str], hedge_after_ms: Optional[float] = None,
+                 timeout: float = None, alpha: float = None, cooldown: float = None,
+                 max_error_rate: float = None):
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required")
+        super().__init__()
+        alpha = alpha or float(os.getenv('RPC_EWMA_ALPHA', 0.2))
+        self.endpoints = [EndpointState(uri, alpha) for uri in endpoint_uris]
+        if hedge_after_ms is None and os.getenv('RPC_HEDGE_AFTER_MS'):
+            hedge_after_ms = float(os.getenv('RPC_HEDGE_AFTER_MS'))
+        self.hedge_after_ms = hedge_after_ms
+        self.timeout = timeout or float(os.getenv('RPC_TIMEOUT', 10))
+        self._request_timeout = rpc_timeouts(self.timeout)
+        self.cooldown = cooldown or float(os.getenv('RPC_ENDPOINT_COOLDOWN', 30))
+        self.max_error_rate = max_error_rate or float(os.getenv('RPC_MAX_ERROR_RATE', 0.5))
+        self._sticky = self.endpoints[0]
+        self._sticky_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._session = build_rpc_session(
+            pool_size=max(int(os.getenv('RPC_POOL_SIZE', 10)), len(self.endpoints) * 2)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max(2, len(self.endpoints) * 2),
+                                            thread_name_prefix='rpc-hedge')
+
+    def __str__(self) -> str:
+        return f"Multi-endpoint RPC connection {[endpoint.uri for endpoint in self.endpoints]}"
+
+    # -- routing ---------------------------------------------------------
+
+    def ranked_endpoints(self) -> List[EndpointState]:
+        """Healthy endpoints fastest first (unmeasured ones first), then the rest"""
+        def latency(endpoint):
+            return endpoint.latency_ms if endpoint.latency_ms is not None else 0.0
+
+        healthy = sorted((e for e in self.endpoints if e.healthy(self.max_error_rate)), key=latency)
+        unhealthy = sorted((e for e in self.endpoints if not e.healthy(self.max_error_rate)),
+                           key=lambda endpoint: endpoint.cooldown_until)
+        return healthy + unhealthy
+
+    def sticky_endpoint(self) -> EndpointState:
+        with self._sticky_lock:
+            if not self._sticky.healthy(self.max_error_rate):
+                self._sticky = self.ranked_endpoints()[0]
+                print(f"🔀 Write endpoint moved to {self._sticky.uri}")
+            return self._sticky
+
+    # -- transport -------------------------------------------------------
+
+    def _post(self, endpoint: EndpointState, body: bytes, timeout=None) -> Any:
+        started = time.perf_counter()
+        try:
+            response = self._session.post(endpoint.uri, data=body, timeout=timeout or self._request_timeout)
+            response.raise_for_status()
+            decoded = json.loads(response.content)
+        except Exception:
+            endpoint.record((time.perf_counter() - started) * 1000, False, self.cooldown)
+            raise
+        endpoint.record((time.perf_counter() - started) * 1000, True, self.cooldown)
+        return decoded
+
+    def _post_with_failover(self, candidates: List[EndpointState], body: bytes) -> Any:
+        last_error = None
+        for endpoint in candidates:
+            try:
+                return self._post(endpoint, body, clamp_timeout(self._request_timeout))
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ RPC endpoint {endpoint.uri} failed: {e}")
+        raise last_error
+
+    def _post_hedged(self, candidates: List[EndpointState], body: bytes) -> Any:
+        # Hedge threads do not see the caller's deadline context, so clamp here
+        timeout = clamp_timeout(self._request_timeout)
+        primary = self._executor.submit(self._post, candidates[0], body, timeout)
+        done, _ = wait([primary], timeout=self.hedge_after_ms / 1000)
+        if done and primary.exception() is None:
+            return primary.result()
+
+        # Primary is slow or failed: race it against the next endpoint
+        futures = {primary: candidates[0], self._executor.submit(self._post, candidates[1], body, timeout): candidates[1]}
+        last_error = None
+        while futures:
+            done, _ = wait(list(futures), timeout=self.timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                endpoint = futures.pop(future)
+                if future.exception() is None:
+                    if endpoint is not candidates[0]:
+                        endpoint.hedged_wins += 1
+                    return future.result()
+                last_error = future.exception()
+        if len(candidates) > 2:
+            return self._post_with_failover(candidates[2:], body)
+        raise last_error or TimeoutError("All hedged RPC requests timed out")
+
+    # -- provider API ----------------------------------------------------
+
+    def make_request(self, method, params) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        body = json.dumps({'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': request_id}).encode()
+
+        if method in STICKY_METHODS:
+            sticky = self.sticky_endpoint()
+            others = [endpoint for endpoint in self.ranked_endpoints() if endpoint is not sticky]
+            return self._post_with_failover([sticky] + others, body)
+
+        candidates = self.ranked_endpoints()
+        if self.hedge_after_ms is not None and len(candidates) > 1:
+            return self._post_hedged(candidates, body)
+        return self._post_with_failover(candidates, body)
+
+    def make_batch_request(self, payload: List[Dict[str, Any]]) -> Any:
+        """POST a JSON-RPC batch to the fastest healthy endpoint"""
+        return self._post_with_failover(self.ranked_endpoints(), json.dumps(payload).encode())
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = self.make_request('web3_clientVersion', [])
+        except Exception:
+            return False
+        return 'error' not in response
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint routing statistics"""
+        sticky = self._sticky
+        return [
+            dict(endpoint.to_dict(self.max_error_rate), sticky=endpoint is sticky)
+            for endpoint in self.endpoints
+        ]
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        return session_pool_stats(self._session)
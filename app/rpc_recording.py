@@ -0,0 +1,158 @@
+"""
+Record and replay JSON-RPC traffic for reproducible performance runs.
+
+RPC_RECORD_FILE=<path> adds a middleware (innermost, so it sees the raw node
+responses) that appends one JSON line per request: method, params, response
+and latency. Paths ending in .gz are gzip-compressed.
+
+RPC_REPLAY_FILE=<path> swaps the HTTP provider for ReplayProvider, which
+serves the recorded responses instead of touching the network:
+
+- Requests are matched on (method, params); repeated identical requests get
+  the recorded responses in order, the last one is reused when they run out.
+- A request that was never recorded gets the next recorded response for the
+  same method, or a JSON-RPC error if the method was never seen.
+- Each response is delayed by its recorded latency divided by
+  RPC_REPLAY_SPEED (1 = original timing, 4 = four times faster, 0 = no delay).
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, Tuple
+
+from hexbytes import HexBytes
+from web3.providers.base import BaseProvider
+
+
+def _jsonable(value):
+    """json.dumps default for bytes and AttributeDicts some providers return"""
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).hex()
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def _request_key(method: str, params) -> Tuple[str, str]:
+    return method, json.dumps(params, sort_keys=True, default=_jsonable)
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class RpcRecorder:
+    """Appends request/response/latency lines to a recording file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = _open(path, 'a')
+        self.recorded = 0
+
+    def record(self, method: str, params, response: Dict[str, Any], latency_ms: float, batch: bool = False):
+        entry = {
+            'method': method,
+            'params': params,
+            'response': response,
+            'latency_ms': round(latency_ms, 3)
+        }
+        if batch:
+            entry['batch'] = True
+        line = json.dumps(entry, separators=(',', ':'), default=_jsonable)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'mode': 'record', 'file': self.path, 'recorded': self.recorded}
+
+    def middleware(self, make_request, w3):
+        def inner(method, params):
+            started = time.perf_counter()
+            response = make_request(method, params)
+            self.record(method, params, response, (time.perf_counter() - started) * 1000)
+            return response
+        return inner
+
+
+class ReplayProvider(BaseProvider):
+    """Serves a recording made by RpcRecorder instead of a live node"""
+
+    def __init__(self, path: str, speed: float = None):
+        super().__init__()
+        self.path = path
+        self.speed = speed if speed is not None else float(os.getenv('RPC_REPLAY_SPEED', 1))
+        self._lock = threading.Lock()
+        self._by_request: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        self._by_method: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.served = 0
+        self.approximate = 0
+        self.misses = 0
+
+        loaded = 0
+        with _open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._by_request[_request_key(entry['method'], entry['params'])].append(entry)
+                self._by_method[entry['method']].append(entry)
+                loaded += 1
+        print(f"📼 Replaying {loaded} recorded RPC calls from {path} at {self.speed}x speed")
+
+    def _next_entry(self, method: str, params) -> Optional[Dict[str, Any]]:
+        key = _request_key(method, params)
+        with self._lock:
+            queue = self._by_request.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+                self._by_method[method].remove(entry)
+                self.served += 1
+                return entry
+            if key in self._last:
+                self.served += 1
+                return self._last[key]
+            # Never recorded with these params (e.g. a new timestamp): take the next of the same method
+            if self._by_method.get(method):
+                entry = self._by_method[method].popleft()
+                self._by_request[_request_key(entry['method'], entry['params'])].remove(entry)
+                self.approximate += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def make_request(self, method, params) -> Dict[str, Any]:
+        entry = self._next_entry(method, params)
+        if entry is None:
+            return {'jsonrpc': '2.0', 'id': 0, 'error': {'code': -32601, 'message': f"{method} not in recording {self.path}"}}
+        if self.speed > 0:
+            time.sleep(entry['latency_ms'] / 1000 / self.speed)
+        return entry['response']
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': 'replay',
+            'file': self.path,
+            'speed': self.speed,
+            'served': self.served,
+            'approximate': self.approximate,
+            'misses': self.misses
+        }
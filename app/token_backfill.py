@@ -0,0 +1,170 @@
+"""
+Token id backfill from registration receipts.
+
+Every land with a blockchain_tx_hash gets its receipt fetched (batched and
+parallel, see BlockchainService.get_receipts_many) and the token id is taken
+from the LandRegistered event in that receipt, not guessed from ordering.
+token_id and blockchain_token_id are then reconciled for all lands in one
+bulk UPDATE, and a per-land diff report is returned.
+
+Hashes replaced by the stuck-transaction accelerator are followed through
+tx_replacements to the transaction that was actually mined.
+"""
+
+import re
+from typing import Dict, Any, List
+
+from sqlalchemy import case, or_, update
+from web3.logs import DISCARD
+
+from app import db
+from app.models import Land, TxReplacement
+
+TX_HASH_PATTERN = re.compile(r'^0x[0-9a-fA-F]{64}$')
+
+
+def _mined_replacements(tx_hashes: List[str]) -> Dict[str, str]:
+    """tx hash -> hash of the transaction that was mined in its replacement chain"""
+    rows = TxReplacement.query.filter(
+        TxReplacement.mined_tx_hash.isnot(None),
+        or_(TxReplacement.original_tx_hash.in_(tx_hashes), TxReplacement.replaced_tx_hash.in_(tx_hashes),
+            TxReplacement.tx_hash.in_(tx_hashes))
+    ).all()
+    mined = {}
+    for row in rows:
+        mined[row.original_tx_hash] = row.mined_tx_hash
+        mined[row.replaced_tx_hash] = row.mined_tx_hash
+        mined[row.tx_hash] = row.mined_tx_hash
+    return mined
+
+
+def _decode_registration(service, land: Land, receipt) -> Dict[str, Any]:
+    """Token id from a receipt's LandRegistered event, or the reason there is none"""
+    if receipt.status != 1:
+        return {'status': 'reverted'}
+    events = service.contract.events.LandRegistered().process_receipt(receipt, errors=DISCARD)
+    if not events:
+        return {'status': 'no_event'}
+    args = events[0]['args']
+    if args.get('propertyId') not in (None, land.property_id):
+        return {'status': 'property_mismatch', 'chain_property_id': args['propertyId']}
+    return {'status': 'ok', 'token_id': args['tokenId'], 'block_number': receipt.blockNumber,
+            'tx_hash': receipt.transactionHash.hex()}
+
+
+def backfill_token_ids(service, dry_run: bool = False) -> Dict[str, Any]:
+    """Reconcile token_id / blockchain_token_id of every land with a registration tx hash (commits).
+
+    Returns {'diff': [...], 'summary': {...}}; diff has one entry per land
+    whose columns change or whose receipt could not be used.
+    """
+    if not service.contract:
+        raise Exception("Contract not initialized")
+
+    lands = Land.query.filter(Land.blockchain_tx_hash.isnot(None)).order_by(Land.id).all()
+    diff = []
+    candidates = []
+    for land in lands:
+        if TX_HASH_PATTERN.match(land.blockchain_tx_hash):
+            candidates.append(land)
+        else:
+            diff.append({'land_id': land.id, 'property_id': land.property_id,
+                         'tx_hash': land.blockchain_tx_hash, 'status': 'invalid_hash'})
+
+    mined = _mined_replacements([land.blockchain_tx_hash for land in candidates])
+    receipt_hashes = [mined.get(land.blockchain_tx_hash, land.blockchain_tx_hash) for land in candidates]
+    print(f"🔍 Fetching {len(receipt_hashes)} registration receipts...")
+    fetched = service.get_receipts_many(receipt_hashes)
+
+    decoded = []
+    for land, tx_hash, entry in zip(candidates, receipt_hashes, fetched):
+        base = {
+            'land_id': land.id,
+            'property_id': land.property_id,
+            'tx_hash': tx_hash,
+            'token_id_before': land.token_id,
+            'blockchain_token_id_before': land.blockchain_token_id
+        }
+        if entry['error']:
+            diff.append({**base, 'status': 'error', 'error': entry['error']})
+        elif entry['receipt'] is None:
+            diff.append({**base, 'status': 'not_mined'})
+        else:
+            outcome = _decode_registration(service, land, entry['receipt'])
+            if outcome['status'] != 'ok':
+                diff.append({**base, **outcome})
+            else:
+                decoded.append((land, base, outcome))
+
+    # A token id can belong to one land only (token_id is unique)
+    claims: Dict[int, List[int]] = {}
+    for land, _, outcome in decoded:
+        claims.setdefault(outcome['token_id'], []).append(land.id)
+
+    changes = {}
+    conflicts: Dict[int, List[int]] = {}
+    for land, base, outcome in decoded:
+        token_id = outcome['token_id']
+        if len(claims[token_id]) > 1:
+            conflicts[land.id] = [i for i in claims[token_id] if i != land.id]
+        elif not (land.token_id == token_id and land.blockchain_token_id == token_id
+                  and land.is_registered_on_blockchain and land.blockchain_tx_hash == outcome['tx_hash']):
+            changes[land.id] = outcome
+
+    # Every land that is not updated keeps its token_id, so a target it still
+    # holds is taken. Each blocked land keeps its own id too, hence the loop.
+    while changes:
+        held = dict(db.session.query(Land.token_id, Land.id).filter(
+            Land.token_id.in_([o['token_id'] for o in changes.values()]), Land.id.notin_(list(changes))
+        ))
+        blocked = {land_id: held[o['token_id']] for land_id, o in changes.items() if o['token_id'] in held}
+        if not blocked:
+            break
+        for land_id, holder in blocked.items():
+            del changes[land_id]
+            conflicts.setdefault(land_id, []).append(holder)
+
+    for land, base, outcome in decoded:
+        if land.id in conflicts:
+            diff.append({**base, 'status': 'conflict', 'token_id_after': outcome['token_id'],
+                         'conflicting_land_ids': conflicts[land.id]})
+        elif land.id in changes:
+            diff.append({**base, 'status': 'updated', 'token_id_after': outcome['token_id'],
+                         'block_number': outcome['block_number']})
+
+    if changes and not dry_run:
+        ids = list(changes)
+        # Clear first so swapped ids do not trip the unique index row by row
+        db.session.execute(update(Land).where(Land.id.in_(ids)).values(token_id=None))
+        token_ids = case({land_id: o['token_id'] for land_id, o in changes.items()}, value=Land.id)
+        db.session.execute(update(Land).where(Land.id.in_(ids)).values(
+            token_id=token_ids,
+            blockchain_token_id=token_ids,
+            blockchain_tx_hash=case({land_id: o['tx_hash'] for land_id, o in changes.items()}, value=Land.id),
+            blockchain_block_number=case({land_id: o['block_number'] for land_id, o in changes.items()}, value=Land.id),
+            is_registered_on_blockchain=True
+        ))
+        db.session.commit()
+
+    summary = {'lands_checked': len(lands), 'receipts_fetched': len(receipt_hashes),
+               'dry_run': dry_run}
+    for entry in diff:
+        summary[entry['status']] = summary.get(entry['status'], 0) + 1
+    return {'diff': diff, 'summary': summary}
+
+
+def format_diff(report: Dict[str, Any]) -> List[str]:
+    """Human-readable lines for a backfill report"""
+    lines = []
+    for entry in report['diff']:
+        prefix = f"  Land {entry['land_id']} ({entry['property_id']})"
+        if entry['status'] == 'updated':
+            lines.append(f"{prefix}: token_id {entry['token_id_before']} -> {entry['token_id_after']}, "
+                         f"blockchain_token_id {entry['blockchain_token_id_before']} -> {entry['token_id_after']}")
+        elif entry['status'] == 'conflict':
+            lines.append(f"{prefix}: token {entry['token_id_after']} also claimed by lands "
+                         f"{entry['conflicting_land_ids']}, not updated")
+        else:
+            detail = entry.get('error') or entry.get('chain_property_id') or entry['tx_hash']
+            lines.append(f"{prefix}: {entry['status']} ({detail})")
+    return lines
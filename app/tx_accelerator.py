@@ -0,0 +1,356 @@
+"""
+Stuck-transaction accelerator.
+
+Every transaction the backend broadcasts is tracked. When one is still
+unmined TX_STUCK_AFTER seconds after it was (re)broadcast, it is signed
+again at the same nonce with fees raised by TX_FEE_BUMP (nodes only accept
+a replacement that raises maxFeePerGas and maxPriorityFeePerGas, or
+gasPrice, by at least 10%) and never below the current gas strategy fees.
+Fees stop at TX_MAX_FEE_GWEI and a chain stops after TX_MAX_REPLACEMENTS.
+
+Replacements are rebuilt from the signed transaction kept in memory, so a
+transaction the node has already dropped can still be replaced.
+
+Each replacement is stored in tx_replacements and the Land, LandTransfer,
+ChainOutbox and LandAnchor rows pointing at the replaced hash are moved to
+the new one. Whichever transaction of the chain is mined in the end, those
+rows are pointed at it. Receipt lookups in this process go through
+chain_of() so waiters follow replacements (BlockchainService.get_transaction_receipt).
+Chains are forgotten TX_TRACK_RETENTION seconds after they were mined, or
+after they were first broadcast if they never are (including given-up ones).
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from eth_account._utils.legacy_transactions import Transaction
+from eth_account._utils.typed_transactions import TypedTransaction
+from hexbytes import HexBytes
+from web3 import Web3
+
+FILLER_GAS = 21000
+
+
+def decode_raw_transaction(raw_tx) -> Dict[str, Any]:
+    """Fields of a signed raw transaction (legacy or EIP-2718 typed) as a signable dict"""
+    raw = HexBytes(raw_tx)
+    # Typed transactions start with their type byte (< 0x80), legacy ones with an RLP list prefix
+    if raw[0] < 0x80:
+        decoded = TypedTransaction.from_bytes(raw).as_dict()
+    else:
+        decoded = Transaction.from_bytes(raw).as_dict()
+    transaction = {
+        'to': Web3.to_checksum_address(decoded['to']) if decoded.get('to') else None,
+        'value': decoded['value'],
+        'data': Web3.to_hex(decoded.get('data', b'')),
+        'gas': decoded['gas'],
+        'nonce': decoded['nonce']
+    }
+    for field in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice'):
+        if decoded.get(field) is not None:
+            transaction[field] = decoded[field]
+    return transaction
+
+
+class TxAccelerator:
+    def __init__(self, service, stuck_after: float = None, fee_bump: float = None,
+                 max_fee_gwei: float = None, max_replacements: int = None):
+        self.service = service
+        self.enabled = os.getenv('TX_ACCELERATOR', 'true').lower() == 'true'
+        self.stuck_after = stuck_after or float(os.getenv('TX_STUCK_AFTER', 120))
+        self.fee_bump = fee_bump or float(os.getenv('TX_FEE_BUMP', 1.125))
+        self.max_fee = Web3.to_wei(max_fee_gwei or os.getenv('TX_MAX_FEE_GWEI', '1000'), 'gwei')
+        self.max_replacements = max_replacements or int(os.getenv('TX_MAX_REPLACEMENTS', 5))
+        self.retention = float(os.getenv('TX_TRACK_RETENTION', 3600))
+        # current hash -> entry; every hash of a chain -> the shared list of its hashes
+        self._tracked: Dict[str, Dict[str, Any]] = {}
+        self._chains: Dict[str, List[str]] = {}
+        self._mined: Dict[str, str] = {}
+        # (settled at, chain) of mined replacement chains, still resolvable until pruned
+        self._retired = deque()
+        self._lock = threading.Lock()
+        self.replacements = 0
+        self.replaced_mined = 0
+        self.gave_up = 0
+        self.evicted = 0
+
+    def track(self, tx_hash: str, raw_tx, app=None):
+        """Watch a broadcast transaction; app (if any) is used to update database rows"""
+        if not self.enabled:
+            return
+        tx_hash = Web3.to_hex(tx_hash) if isinstance(tx_hash, (bytes, bytearray)) else tx_hash
+        with self._lock:
+            entry = self._tracked.get(tx_hash)
+            if entry:
+                entry['sent_at'] = time.monotonic()
+                return
+            chain = self._chains.setdefault(tx_hash, [tx_hash])
+            self._tracked[tx_hash] = {
+                'chain': chain,
+                'raw': {tx_hash: Web3.to_hex(raw_tx) if isinstance(raw_tx, (bytes, bytearray)) else raw_tx},
+                'sent_at': time.monotonic(),
+                'tracked_at': time.monotonic(),
+                'app': app,
+                'gave_up': False
+            }
+        self.service.block_watcher.add_listener(self.on_new_block)
+
+    def chain_of(self, tx_hash: str) -> List[str]:
+        """All hashes sharing tx_hash's nonce, oldest first ([tx_hash] if never replaced)"""
+        with self._lock:
+            return list(self._chains.get(tx_hash, [tx_hash]))
+
+    def current_hash(self, tx_hash: str) -> str:
+        """The mined hash of tx_hash's chain once known, else its latest replacement"""
+        with self._lock:
+            return self._mined.get(tx_hash) or self._chains.get(tx_hash, [tx_hash])[-1]
+
+    def raw_tx(self, tx_hash: str) -> Optional[str]:
+        with self._lock:
+            entry = self._tracked.get(self._chains.get(tx_hash, [tx_hash])[-1])
+            return entry['raw'].get(tx_hash) if entry else None
+
+    def fill_nonce(self, nonce: int, replaced_tx: Optional[str] = None,
+                   replaced_raw: Optional[str] = None) -> Optional[str]:
+        """Use up nonce with a zero-value transfer to the backend account so later nonces can be mined.
+
+        replaced_tx is the hash of a transaction still pending at that nonce:
+        the filler is priced above it to replace it, and it is no longer
+        accelerated. replaced_raw is its signed form when this process does not
+        track it (e.g. an outbox row). Returns the filler's hash, None if the
+        nonce was already mined.
+        """
+        backend_address = self.service.get_backend_address()
+        filler = {
+            'to': backend_address,
+            'value': 0,
+            'gas': FILLER_GAS,
+            'nonce': nonce,
+            'chainId': self.service.chain_id
+        }
+        raw_replaced = (self.raw_tx(self.current_hash(replaced_tx)) or replaced_raw) if replaced_tx else None
+        fees = self._bumped_fees(decode_raw_transaction(raw_replaced)) if raw_replaced else None
+        filler.update(fees or self.service.gas_strategy.fee_params())
+        signed = self.service.w3.eth.account.sign_transaction(filler, self.service.private_key)
+        try:
+            self.service.w3.eth.send_raw_transaction(signed.rawTransaction)
+        except Exception:
+            if self.service.w3.eth.get_transaction_count(backend_address, 'latest') > nonce:
+                return None  # mined meanwhile, nothing to fill
+            raise
+
+        if replaced_tx:
+            with self._lock:
+                self._forget(self._chains.get(replaced_tx, [replaced_tx]))
+        tx_hash = Web3.to_hex(signed.hash)
+        self.track(tx_hash, signed.rawTransaction)
+        return tx_hash
+
+    def _forget(self, chain: List[str]):
+        """Stop tracking a nonce chain (caller holds the lock)"""
+        for tx_hash in chain:
+            self._tracked.pop(tx_hash, None)
+            self._chains.pop(tx_hash, None)
+            self._mined.pop(tx_hash, None)
+
+    def on_new_block(self, block_number: int):
+        """BlockWatcher listener: settle mined chains and bump the stuck ones"""
+        now = time.monotonic()
+        self._prune(now)
+        with self._lock:
+            # Fresh transactions are left alone; they usually mine without help
+            due = [entry for entry in self._tracked.values()
+                   if len(entry['chain']) > 1 or now - entry['sent_at'] >= self.stuck_after]
+        if not due:
+            return
+
+        hashes = [tx_hash for entry in due for tx_hash in entry['chain']]
+        responses = self.service.batch_request([('eth_getTransactionReceipt', [h]) for h in hashes])
+        receipts = {h: response['result'] for h, response in zip(hashes, responses) if response.get('result')}
+
+        for entry in due:
+            mined = next((h for h in entry['chain'] if h in receipts), None)
+            if mined:
+                self._settle(entry, mined)
+            elif now - entry['sent_at'] >= self.stuck_after and not entry['gave_up']:
+                try:
+                    self._accelerate(entry)
+                except Exception as e:
+                    print(f"⚠️ Could not accelerate {entry['chain'][-1]}: {e}")
+
+    def _prune(self, now: float):
+        """Forget chains mined, or first broadcast, more than TX_TRACK_RETENTION seconds ago"""
+        with self._lock:
+            while self._retired and now - self._retired[0][0] > self.retention:
+                self._forget(self._retired.popleft()[1])
+            expired = [entry for entry in self._tracked.values() if now - entry['tracked_at'] > self.retention]
+            for entry in expired:
+                self._forget(entry['chain'])
+        for entry in expired:
+            self.evicted += 1
+            print(f"🗑️ Stopped tracking {entry['chain'][-1]}: not mined after {self.retention:.0f}s"
+                  + (" (gave up)" if entry['gave_up'] else ""))
+
+    def _bumped_fees(self, transaction) -> Optional[Dict[str, int]]:
+        """Replacement fees: old fees * TX_FEE_BUMP, at least the current strategy fees"""
+        current = self.service.gas_strategy.fee_params()
+        if transaction.get('maxFeePerGas') is not None:
+            priority = max(math.ceil(transaction['maxPriorityFeePerGas'] * self.fee_bump),
+                           current.get('maxPriorityFeePerGas', 0))
+            max_fee = max(math.ceil(transaction['maxFeePerGas'] * self.fee_bump),
+                          current.get('maxFeePerGas', current.get('gasPrice', 0)), priority)
+            fees = {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': priority}
+        else:
+            fees = {'gasPrice': max(math.ceil(transaction['gasPrice'] * self.fee_bump),
+                                    current.get('gasPrice', current.get('maxFeePerGas', 0)))}
+        if max(fees.values()) > self.max_fee:
+            return None
+        return fees
+
+    def _accelerate(self, entry: Dict[str, Any]):
+        """Re-sign the chain's latest transaction at the same nonce with bumped fees and broadcast it"""
+        w3 = self.service.w3
+        current = entry['chain'][-1]
+        if len(entry['chain']) - 1 >= self.max_replacements:
+            entry['gave_up'] = True
+            self.gave_up += 1
+            print(f"⚠️ {current} still pending after {self.max_replacements} replacements, giving up")
+            return
+
+        # The node may have dropped it already, so rebuild from our own signed copy
+        transaction = decode_raw_transaction(entry['raw'][current])
+        fees = self._bumped_fees(transaction)
+        if not fees:
+            entry['gave_up'] = True
+            self.gave_up += 1
+            print(f"⚠️ {current} is stuck but bumping would exceed TX_MAX_FEE_GWEI, giving up")
+            return
+
+        replacement = {
+            'to': transaction['to'],
+            'value': transaction['value'],
+            'data': transaction['data'],
+            'gas': transaction['gas'],
+            'nonce': transaction['nonce'],
+            'chainId': self.service.chain_id,
+            **fees
+        }
+        signed = w3.eth.account.sign_transaction(replacement, self.service.private_key)
+        raw_tx = Web3.to_hex(signed.rawTransaction)
+        new_hash = Web3.to_hex(signed.hash)
+        try:
+            w3.eth.send_raw_transaction(raw_tx)
+        except Exception as e:
+            message = str(e).lower()
+            if 'already known' not in message:
+                # 'nonce too low': one of the chain was mined meanwhile and is settled on the next block
+                print(f"⚠️ Replacement for {current} rejected: {e}")
+                entry['sent_at'] = time.monotonic()
+                return
+
+        with self._lock:
+            entry['chain'].append(new_hash)
+            entry['raw'][new_hash] = raw_tx
+            entry['sent_at'] = time.monotonic()
+            self._chains[new_hash] = entry['chain']
+            self._tracked[new_hash] = self._tracked.pop(current)
+        self.replacements += 1
+        print(f"🚀 Replaced stuck {current} at nonce {replacement['nonce']} with {new_hash} ({fees})")
+        self._record_replacement(entry, current, new_hash, replacement)
+
+    def _settle(self, entry: Dict[str, Any], mined: str):
+        with self._lock:
+            self._tracked.pop(entry['chain'][-1], None)
+            replaced = len(entry['chain']) > 1
+            if replaced:
+                # Kept a while so waiters on an older hash of the chain still find the receipt
+                for tx_hash in entry['chain']:
+                    self._mined[tx_hash] = mined
+                self._retired.append((time.monotonic(), entry['chain']))
+            else:
+                self._chains.pop(mined, None)
+        if replaced:
+            self.replaced_mined += 1
+            block_number = self.service.w3.eth.get_transaction_receipt(mined).blockNumber
+            print(f"✅ Nonce chain {entry['chain'][0]} settled: {mined} mined in block {block_number}")
+            self._record_mined(entry, mined, block_number)
+
+    # -- persistence -----------------------------------------------------
+
+    def _repoint(self, old_hash: str, new_hash: str, raw_tx: Optional[str]):
+        """Move every row that references old_hash to new_hash (caller commits)"""
+        from app.models import Land, LandTransfer, ChainOutbox, LandAnchor
+
+        Land.query.filter_by(blockchain_tx_hash=old_hash).update(
+            {'blockchain_tx_hash': new_hash}, synchronize_session=False)
+        LandTransfer.query.filter_by(blockchain_tx_hash=old_hash).update(
+            {'blockchain_tx_hash': new_hash}, synchronize_session=False)
+        outbox_values = {'tx_hash': new_hash}
+        if raw_tx:
+            outbox_values['raw_tx'] = raw_tx
+        ChainOutbox.query.filter_by(tx_hash=old_hash).update(outbox_values, synchronize_session=False)
+        LandAnchor.query.filter_by(tx_hash=old_hash).update({'tx_hash': new_hash}, synchronize_session=False)
+
+    def _record_replacement(self, entry: Dict[str, Any], old_hash: str, new_hash: str,
+                            replacement: Dict[str, Any]):
+        if not entry['app']:
+            return
+        from app import db
+        from app.models import TxReplacement
+
+        with entry['app'].app_context():
+            try:
+                db.session.add(TxReplacement(
+                    nonce=replacement['nonce'],
+                    original_tx_hash=entry['chain'][0],
+                    replaced_tx_hash=old_hash,
+                    tx_hash=new_hash,
+                    max_fee_per_gas=replacement.get('maxFeePerGas'),
+                    max_priority_fee_per_gas=replacement.get('maxPriorityFeePerGas'),
+                    gas_price=replacement.get('gasPrice')
+                ))
+                self._repoint(old_hash, new_hash, entry['raw'][new_hash])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Could not record replacement {new_hash}: {e}")
+
+    def _record_mined(self, entry: Dict[str, Any], mined: str, block_number: int):
+        if not entry['app']:
+            return
+        from app import db
+        from app.models import TxReplacement
+
+        with entry['app'].app_context():
+            try:
+                settled_at = datetime.utcnow()
+                for row in TxReplacement.query.filter_by(original_tx_hash=entry['chain'][0]).all():
+                    row.state = 'mined' if row.tx_hash == mined else 'superseded'
+                    row.mined_tx_hash = mined
+                    row.block_number = block_number
+                    row.settled_at = settled_at
+                if mined != entry['chain'][-1]:
+                    self._repoint(entry['chain'][-1], mined, entry['raw'].get(mined))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Could not record mined transaction {mined}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tracked = len(self._tracked)
+        return {
+            'enabled': self.enabled,
+            'tracked': tracked,
+            'stuck_after_seconds': self.stuck_after,
+            'fee_bump': self.fee_bump,
+            'replacements': self.replacements,
+            'replaced_chains_mined': self.replaced_mined,
+            'gave_up': self.gave_up,
+            'evicted': self.evicted
+        }
@@ -0,0 +1,119 @@
+"""
+Pre-send simulation of contract writes.
+
+Before a transaction is signed (and before a nonce is allocated for it),
+BlockchainService.simulate_transaction dry-runs it with eth_call against the
+'pending' block. A revert is decoded into a TransactionRevertedError and
+raised right away, instead of broadcasting a transaction that costs gas and
+a block wait only to come back with status 0.
+
+Revert data is decoded as Error(string), Panic(uint256) or one of the custom
+errors in the contract ABI. TX_SIMULATION=false turns the dry run off.
+"""
+
+import os
+from typing import Dict, Any, List, Optional
+
+from eth_abi import decode
+from eth_utils import function_abi_to_4byte_selector
+from hexbytes import HexBytes
+from web3 import Web3
+
+ERROR_SELECTOR = bytes.fromhex('08c379a0')  # Error(string)
+PANIC_SELECTOR = bytes.fromhex('4e487b71')  # Panic(uint256)
+
+PANIC_REASONS = {
+    0x00: 'generic compiler panic',
+    0x01: 'assertion failed',
+    0x11: 'arithmetic overflow or underflow',
+    0x12: 'division or modulo by zero',
+    0x21: 'invalid enum value',
+    0x22: 'incorrectly encoded storage byte array',
+    0x31: 'pop() on an empty array',
+    0x32: 'array index out of bounds',
+    0x41: 'out of memory',
+    0x51: 'call to a zero-initialized internal function'
+}
+
+
+def simulation_enabled() -> bool:
+    return os.getenv('TX_SIMULATION', 'true').lower() == 'true'
+
+
+class TransactionRevertedError(Exception):
+    """A write would revert; raised before anything is signed or broadcast"""
+
+    def __init__(self, function: Optional[str], reason: str, error: str = 'Error',
+                 args: Optional[List[Any]] = None, data: Optional[str] = None):
+        self.function = function
+        self.reason = reason
+        self.error = error
+        self.args_decoded = args or []
+        self.data = data
+        super().__init__(f"{function or 'Transaction'} would revert: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'function': self.function,
+            'error': self.error,
+            'reason': self.reason,
+            'args': self.args_decoded,
+            'data': self.data
+        }
+
+
+def _jsonable_arg(value):
+    if isinstance(value, (bytes, bytearray)):
+        return Web3.to_hex(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable_arg(item) for item in value]
+    return value
+
+
+def _revert_data(error: Exception) -> Optional[bytes]:
+    data = getattr(error, 'data', None)
+    if isinstance(data, dict):
+        data = data.get('data')
+    if isinstance(data, str) and data.startswith('0x'):
+        return bytes(HexBytes(data))
+    return None
+
+
+def _message(error: Exception) -> str:
+    message = getattr(error, 'message', None) or str(error) or 'execution reverted'
+    prefix = 'execution reverted: '
+    return message[len(prefix):] if message.startswith(prefix) else message
+
+
+def decode_revert(error: Exception, abi: Optional[List[Dict[str, Any]]] = None,
+                  function: Optional[str] = None) -> TransactionRevertedError:
+    """Turn the exception raised by eth_call / estimate_gas into a TransactionRevertedError"""
+    data = _revert_data(error)
+    if not data or len(data) < 4:
+        return TransactionRevertedError(function, _message(error))
+
+    selector, body = data[:4], data[4:]
+    hex_data = Web3.to_hex(data)
+    try:
+        if selector == ERROR_SELECTOR:
+            (reason,) = decode(['string'], body)
+            return TransactionRevertedError(function, reason, data=hex_data)
+        if selector == PANIC_SELECTOR:
+            (code,) = decode(['uint256'], body)
+            reason = PANIC_REASONS.get(code, f"panic 0x{code:02x}")
+            return TransactionRevertedError(function, reason, error='Panic', args=[code], data=hex_data)
+
+        for entry in abi or []:
+            if entry.get('type') != 'error' or function_abi_to_4byte_selector(entry) != selector:
+                continue
+            types = [item['type'] for item in entry.get('inputs', [])]
+            names = [item.get('name') or f"arg{i}" for i, item in enumerate(entry.get('inputs', []))]
+            values = [_jsonable_arg(value) for value in decode(types, body)]
+            details = ', '.join(f"{name}={value}" for name, value in zip(names, values))
+            return TransactionRevertedError(function, f"{entry['name']}({details})", error=entry['name'],
+                                            args=values, data=hex_data)
+    except Exception as decode_error:
+        print(f"⚠️ Could not decode revert data {hex_data}: {decode_error}")
+
+    return TransactionRevertedError(function, f"unknown custom error {Web3.to_hex(selector)}",
+                                    error='Custom', data=hex_data)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Offline Blockchain Throughput Benchmark
+Runs the BlockchainService against the in-process eth-tester chain
+(BLOCKCHAIN_BACKEND=eth_tester) so registration, transfer and read
+throughput can be compared reproducibly without a testnet.
+
+Needs eth-tester (pip install "eth-tester[py-evm]==v0.9.1-b.1") and the
+compiled LandRegistry artifact (CONTRACT_ARTIFACT_PATH).
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add current directory to path
+sys.path.append('.')
+
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {count:>5} ops  {elapsed:8.2f}s  {count / elapsed if elapsed else 0:8.1f} ops/s")
+    return result
+
+
+def land_data_for(index, owner, run_id):
+    return {
+        'property_id': f"BENCH-{run_id}-{index:05d}",
+        'owner_wallet': owner,
+        'location': f"Benchmark plot {index}",
+        'area': 100 + index,
+        'property_type': 'residential',
+        'latitude': 12.9716,
+        'longitude': 77.5946,
+        'ipfs_hash': ''
+    }
+
+
+def run_benchmark(count, window):
+    from web3 import Web3
+    from app.blockchain import BlockchainService, CONTRACT_ARTIFACT_PATH
+
+    if not os.path.exists(CONTRACT_ARTIFACT_PATH):
+        print(f"❌ Contract artifact not found at {CONTRACT_ARTIFACT_PATH}")
+        print("   Compile the LandRegistry contract and set CONTRACT_ARTIFACT_PATH to its Hardhat artifact")
+        return False
+
+    service = BlockchainService()
+    if not service.contract:
+        print("❌ Local chain did not come up with a contract")
+        return False
+
+    owner = service.get_backend_address()
+    run_id = int(time.time())
+    print(f"\n=== Benchmark: {count} lands, window {window}, {service.local_chain.stats()} ===")
+
+    sequential = timed("register (sequential)", count, lambda: [
+        service.register_land_on_blockchain(land_data_for(i, owner, run_id)) for i in range(count)
+    ])
+    pipelined = timed("register (pipelined)", count, lambda: service.register_lands_pipelined(
+        [(i, land_data_for(count + i, owner, run_id)) for i in range(count)], window=window
+    ))
+
+    token_ids = [r['token_id'] for r in sequential if r] + \
+                [o['result']['token_id'] for o in pipelined if o['status'] == 'confirmed']
+    failed = 2 * count - len(token_ids)
+    if failed:
+        print(f"  ⚠️ {failed} registrations failed")
+
+    timed("read (one call per token)", len(token_ids), lambda: [
+        service.get_land_details_from_blockchain(token_id) for token_id in token_ids
+    ])
+    timed("read (batched)", len(token_ids), lambda: service.get_land_details_many(token_ids))
+
+    recipient = Web3.to_checksum_address('0x' + '42' * 20)
+    timed("transfer (sequential)", min(count, len(token_ids)), lambda: [
+        service.transfer_land_on_blockchain(token_id, recipient, 1.0, owner) for token_id in token_ids[:count]
+    ])
+
+    service.local_chain.stop()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline blockchain throughput benchmark (eth-tester backend)")
+    parser.add_argument("--count", type=int, default=20, help="Lands to register per mode")
+    parser.add_argument("--window", type=int, default=8, help="In-flight transactions for the pipelined run")
+    parser.add_argument("--block-time", type=float, default=0, help="Seconds between blocks (0 mines every transaction)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Emulated RPC latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- jitter on the emulated latency")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency jitter")
+
+    args = parser.parse_args()
+
+    os.environ['BLOCKCHAIN_BACKEND'] = 'eth_tester'
+    os.environ['LOCAL_CHAIN_BLOCK_TIME'] = str(args.block_time)
+    os.environ['LOCAL_CHAIN_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['LOCAL_CHAIN_LATENCY_JITTER_MS'] = str(args.jitter_ms)
+    os.environ['LOCAL_CHAIN_SEED'] = str(args.seed)
+    # Poll receipts often enough to see every block
+    os.environ.setdefault('PIPELINE_POLL_INTERVAL', str(max(args.block_time / 4, 0.05)))
+
+    sys.exit(0 if run_benchmark(args.count, args.window) else 1)
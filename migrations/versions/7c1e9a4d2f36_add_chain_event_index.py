@@ -0,0 +1,61 @@
+"""Add chain event index tables
+
+Revision ID: 7c1e9a4d2f36
+Revises: 4b2c503f7951
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9a4d2f36'
+down_revision = '4b2c503f7951'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chain_land_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_name', sa.String(length=32), nullable=False),
+        sa.Column('token_id', sa.Integer(), nullable=False),
+        sa.Column('property_id', sa.String(length=50), nullable=True),
+        sa.Column('owner', sa.String(length=42), nullable=True),
+        sa.Column('from_address', sa.String(length=42), nullable=True),
+        sa.Column('to_address', sa.String(length=42), nullable=True),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column('area', sa.Numeric(precision=78, scale=0), nullable=True),
+        sa.Column('price', sa.Numeric(precision=78, scale=0), nullable=True),
+        sa.Column('transfer_date', sa.BigInteger(), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=False),
+        sa.Column('block_hash', sa.String(length=66), nullable=False),
+        sa.Column('tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('log_index', sa.Integer(), nullable=False),
+        sa.Column('indexed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tx_hash', 'log_index', name='uq_chain_land_events_tx_log')
+    )
+    with op.batch_alter_table('chain_land_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chain_land_events_block_number'), ['block_number'], unique=False)
+        batch_op.create_index(batch_op.f('ix_chain_land_events_property_id'), ['property_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_chain_land_events_token_id'), ['token_id'], unique=False)
+
+    op.create_table('chain_indexer_checkpoints',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_block', sa.Integer(), nullable=False),
+        sa.Column('last_block_hash', sa.String(length=66), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('chain_indexer_checkpoints')
+    with op.batch_alter_table('chain_land_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chain_land_events_token_id'))
+        batch_op.drop_index(batch_op.f('ix_chain_land_events_property_id'))
+        batch_op.drop_index(batch_op.f('ix_chain_land_events_block_number'))
+
+    op.drop_table('chain_land_events')
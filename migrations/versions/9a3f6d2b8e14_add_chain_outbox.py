@@ -0,0 +1,49 @@
+"""Add chain outbox table
+
+Revision ID: 9a3f6d2b8e14
+Revises: 7c1e9a4d2f36
+Create Date: 2026-10-16 14:05:22.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3f6d2b8e14'
+down_revision = '7c1e9a4d2f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chain_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=32), nullable=False),
+        sa.Column('land_id', sa.Integer(), nullable=False),
+        sa.Column('transfer_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('nonce', sa.Integer(), nullable=True),
+        sa.Column('tx_hash', sa.String(length=66), nullable=True),
+        sa.Column('raw_tx', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['land_id'], ['lands.id'], ),
+        sa.ForeignKeyConstraint(['transfer_id'], ['land_transfers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chain_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chain_outbox_land_id'), ['land_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_chain_outbox_state'), ['state'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chain_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chain_outbox_state'))
+        batch_op.drop_index(batch_op.f('ix_chain_outbox_land_id'))
+
+    op.drop_table('chain_outbox')
@@ -0,0 +1,40 @@
+"""Allow one open chain outbox row per land and operation
+
+Revision ID: a7d3e9f14c62
+Revises: f6b1d8e24a90
+Create Date: 2026-10-17 09:41:18.502316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9f14c62'
+down_revision = 'f6b1d8e24a90'
+branch_labels = None
+depends_on = None
+
+OPEN_STATES = "state IN ('pending', 'signed', 'submitted')"
+
+
+def upgrade():
+    # Pending duplicates queued by concurrent requests have not sent anything yet: fail them,
+    # keeping the in-flight row or else the oldest one
+    op.execute(sa.text(
+        "UPDATE chain_outbox SET state = 'failed', last_error = 'Duplicate of another open outbox row' "
+        "WHERE state = 'pending' AND EXISTS ("
+        "SELECT 1 FROM chain_outbox AS other WHERE other.land_id = chain_outbox.land_id "
+        "AND other.operation = chain_outbox.operation AND other.id != chain_outbox.id "
+        f"AND other.{OPEN_STATES} "
+        "AND (other.id < chain_outbox.id OR other.state != 'pending'))"
+    ))
+    with op.batch_alter_table('chain_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_chain_outbox_open_land_operation', ['land_id', 'operation'], unique=True,
+                              postgresql_where=sa.text(OPEN_STATES),
+                              sqlite_where=sa.text(OPEN_STATES))
+
+
+def downgrade():
+    with op.batch_alter_table('chain_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_chain_outbox_open_land_operation')
@@ -0,0 +1,44 @@
+"""Add chain land mirror table
+
+Revision ID: b5e2c7a91d03
+Revises: 9a3f6d2b8e14
+Create Date: 2026-10-16 15:31:08.552730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2c7a91d03'
+down_revision = '9a3f6d2b8e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chain_land_mirror',
+        sa.Column('token_id', sa.Integer(), nullable=False),
+        sa.Column('property_id', sa.String(length=50), nullable=True),
+        sa.Column('owner', sa.String(length=42), nullable=True),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column('area', sa.Numeric(precision=78, scale=0), nullable=True),
+        sa.Column('property_type', sa.String(length=50), nullable=True),
+        sa.Column('registration_date', sa.BigInteger(), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('ipfs_hash', sa.String(length=100), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('transfer_history', sa.Text(), nullable=True),
+        sa.Column('chain_synced_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('token_id')
+    )
+    with op.batch_alter_table('chain_land_mirror', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chain_land_mirror_property_id'), ['property_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chain_land_mirror', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chain_land_mirror_property_id'))
+
+    op.drop_table('chain_land_mirror')
@@ -0,0 +1,31 @@
+"""Index status-filtered land lists on their sort key
+
+Revision ID: c4f8a2b6d913
+Revises: a7d3e9f14c62
+Create Date: 2026-10-17 11:02:37.184529
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f8a2b6d913'
+down_revision = 'a7d3e9f14c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The pending lands list is ordered by id, not created_at: the partial index was never used
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.drop_index('ix_lands_pending_created_at')
+        batch_op.create_index('ix_lands_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.drop_index('ix_lands_status_id')
+        batch_op.create_index('ix_lands_pending_created_at', ['created_at'], unique=False,
+                              postgresql_where=sa.text("status = 'pending'"),
+                              sqlite_where=sa.text("status = 'pending'"))
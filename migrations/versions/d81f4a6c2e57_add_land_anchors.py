@@ -0,0 +1,56 @@
+"""Add land anchors for Merkle-batched registration
+
+Revision ID: d81f4a6c2e57
+Revises: b5e2c7a91d03
+Create Date: 2026-10-16 16:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4a6c2e57'
+down_revision = 'b5e2c7a91d03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('land_anchors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('merkle_root', sa.String(length=66), nullable=False),
+        sa.Column('leaf_count', sa.Integer(), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('tx_hash', sa.String(length=66), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('anchored_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('land_anchors', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_land_anchors_merkle_root'), ['merkle_root'], unique=False)
+
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('anchor_state', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('anchor_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('anchor_record', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('anchor_proof', sa.Text(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_lands_anchor_state'), ['anchor_state'], unique=False)
+        batch_op.create_foreign_key('fk_lands_anchor_id_land_anchors', 'land_anchors', ['anchor_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_lands_anchor_id_land_anchors', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_lands_anchor_state'))
+        batch_op.drop_column('anchor_proof')
+        batch_op.drop_column('anchor_record')
+        batch_op.drop_column('anchor_id')
+        batch_op.drop_column('anchor_state')
+
+    with op.batch_alter_table('land_anchors', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_land_anchors_merkle_root'))
+
+    op.drop_table('land_anchors')
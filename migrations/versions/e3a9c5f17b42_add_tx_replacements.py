@@ -0,0 +1,45 @@
+"""Add tx replacements for the stuck-transaction accelerator
+
+Revision ID: e3a9c5f17b42
+Revises: d81f4a6c2e57
+Create Date: 2026-10-16 23:41:08.527311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9c5f17b42'
+down_revision = 'd81f4a6c2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tx_replacements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nonce', sa.Integer(), nullable=False),
+        sa.Column('original_tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('replaced_tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('max_fee_per_gas', sa.BigInteger(), nullable=True),
+        sa.Column('max_priority_fee_per_gas', sa.BigInteger(), nullable=True),
+        sa.Column('gas_price', sa.BigInteger(), nullable=True),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('mined_tx_hash', sa.String(length=66), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('settled_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tx_hash')
+    )
+    with op.batch_alter_table('tx_replacements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tx_replacements_original_tx_hash'), ['original_tx_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tx_replacements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tx_replacements_original_tx_hash'))
+
+    op.drop_table('tx_replacements')
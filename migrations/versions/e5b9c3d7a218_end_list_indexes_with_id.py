@@ -0,0 +1,54 @@
+"""End the list indexes with id, the pagination tie-breaker
+
+Revision ID: e5b9c3d7a218
+Revises: c4f8a2b6d913
+Create Date: 2026-10-17 12:26:51.730448
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c3d7a218'
+down_revision = 'c4f8a2b6d913'
+branch_labels = None
+depends_on = None
+
+# name: (columns before, columns after)
+LAND_INDEXES = {
+    'ix_lands_owner_id_status': (['owner_id', 'status'], ['owner_id', 'status', 'id']),
+    'ix_lands_status_property_type': (['status', 'property_type'], ['status', 'property_type', 'id']),
+    'ix_lands_property_type': (['property_type'], ['property_type', 'id']),
+}
+TRANSFER_INDEXES = {
+    'ix_land_transfers_from_user_id_initiated_at': (['from_user_id', 'initiated_at'],
+                                                    ['from_user_id', 'initiated_at', 'id']),
+    'ix_land_transfers_to_user_id_initiated_at': (['to_user_id', 'initiated_at'],
+                                                  ['to_user_id', 'initiated_at', 'id']),
+    'ix_land_transfers_land_id_initiated_at': (['land_id', 'initiated_at'], ['land_id', 'initiated_at', 'id']),
+    'ix_land_transfers_status_initiated_at': (['status', 'initiated_at'], ['status', 'initiated_at', 'id']),
+    'ix_land_transfers_initiated_at': (['initiated_at'], ['initiated_at', 'id']),
+}
+
+
+def _recreate(table, indexes, after):
+    with op.batch_alter_table(table, schema=None) as batch_op:
+        for name, columns in indexes.items():
+            batch_op.drop_index(name)
+            batch_op.create_index(name, columns[1 if after else 0], unique=False)
+
+
+def upgrade():
+    # PostgreSQL sorts pages that tie on the leading columns unless the index ends with id
+    _recreate('lands', LAND_INDEXES, after=True)
+    _recreate('land_transfers', TRANSFER_INDEXES, after=True)
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.create_index('ix_lands_owner_id', ['owner_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.drop_index('ix_lands_owner_id')
+    _recreate('land_transfers', TRANSFER_INDEXES, after=False)
+    _recreate('lands', LAND_INDEXES, after=False)
@@ -0,0 +1,60 @@
+"""Add indexes for land and transfer list queries
+
+Revision ID: f6b1d8e24a90
+Revises: e3a9c5f17b42
+Create Date: 2026-10-17 10:12:44.091837
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b1d8e24a90'
+down_revision = 'e3a9c5f17b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.create_index('ix_lands_owner_id_status', ['owner_id', 'status'], unique=False)
+        batch_op.create_index('ix_lands_status_property_type', ['status', 'property_type'], unique=False)
+        batch_op.create_index('ix_lands_property_type', ['property_type'], unique=False)
+        batch_op.create_index('ix_lands_status_latitude', ['status', 'latitude'], unique=False)
+        batch_op.create_index('ix_lands_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_lands_pending_created_at', ['created_at'], unique=False,
+                              postgresql_where=sa.text("status = 'pending'"),
+                              sqlite_where=sa.text("status = 'pending'"))
+        batch_op.create_index('ix_lands_registered_owner_id', ['owner_id'], unique=False,
+                              postgresql_where=sa.text('is_registered_on_blockchain'),
+                              sqlite_where=sa.text('is_registered_on_blockchain = 1'))
+
+    with op.batch_alter_table('land_transfers', schema=None) as batch_op:
+        batch_op.create_index('ix_land_transfers_from_user_id_initiated_at', ['from_user_id', 'initiated_at'], unique=False)
+        batch_op.create_index('ix_land_transfers_to_user_id_initiated_at', ['to_user_id', 'initiated_at'], unique=False)
+        batch_op.create_index('ix_land_transfers_land_id_initiated_at', ['land_id', 'initiated_at'], unique=False)
+        batch_op.create_index('ix_land_transfers_status_initiated_at', ['status', 'initiated_at'], unique=False)
+        batch_op.create_index('ix_land_transfers_initiated_at', ['initiated_at'], unique=False)
+        batch_op.create_index('ix_land_transfers_pending_land_id', ['land_id'], unique=False,
+                              postgresql_where=sa.text("status = 'pending'"),
+                              sqlite_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    with op.batch_alter_table('land_transfers', schema=None) as batch_op:
+        batch_op.drop_index('ix_land_transfers_pending_land_id')
+        batch_op.drop_index('ix_land_transfers_initiated_at')
+        batch_op.drop_index('ix_land_transfers_status_initiated_at')
+        batch_op.drop_index('ix_land_transfers_land_id_initiated_at')
+        batch_op.drop_index('ix_land_transfers_to_user_id_initiated_at')
+        batch_op.drop_index('ix_land_transfers_from_user_id_initiated_at')
+
+    with op.batch_alter_table('lands', schema=None) as batch_op:
+        batch_op.drop_index('ix_lands_registered_owner_id')
+        batch_op.drop_index('ix_lands_pending_created_at')
+        batch_op.drop_index('ix_lands_created_at')
+        batch_op.drop_index('ix_lands_status_latitude')
+        batch_op.drop_index('ix_lands_property_type')
+        batch_op.drop_index('ix_lands_status_property_type')
+        batch_op.drop_index('ix_lands_owner_id_status')
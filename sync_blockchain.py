@@ -17,8 +17,10 @@ sys.path.append('.')
 from app import create_app
 from app.models import Land, User, db
 from app.blockchain import blockchain_service
+from app.chain_indexer import ChainEventIndexer
+from app.models import ChainLandEvent
 
-def register_verified_lands_on_blockchain():
+def register_verified_lands_on_blockchain(pipeline=False, window=None):
     """Register all verified lands that aren't yet on blockchain"""
     
     app = create_app()
@@ -42,6 +44,9 @@ def register_verified_lands_on_blockchain():
             print("✅ All verified lands are already registered on blockchain!")
             return True
         
+        if pipeline:
+            return register_lands_pipelined(unregistered_lands, window)
+        
         registered_count = 0
         failed_count = 0
         
@@ -81,6 +86,7 @@ def register_verified_lands_on_blockchain():
                 if result:
                     # Update land with blockchain information
                     land.token_id = result.get('token_id')
+                    land.blockchain_token_id = result.get('token_id')
                     land.blockchain_tx_hash = result.get('tx_hash')
                     land.is_registered_on_blockchain = True
                     land.blockchain_block_number = result.get('block_number')
@@ -110,6 +116,49 @@ def register_verified_lands_on_blockchain():
         
         return registered_count > 0
 
+def register_lands_pipelined(lands, window=None):
+    """Register lands with a window of in-flight transactions instead of one at a time"""
+    items = []
+    for land in lands:
+        owner = User.query.get(land.owner_id)
+        if not owner or not owner.wallet_address:
+            print(f"  ⚠️  Skipping land {land.id}: owner has no wallet address")
+            continue
+        items.append((land.id, {
+            'property_id': land.property_id,
+            'owner_wallet': owner.wallet_address,
+            'location': land.location,
+            'area': land.area,
+            'property_type': land.property_type,
+            'latitude': land.latitude or 0.0,
+            'longitude': land.longitude or 0.0,
+            'ipfs_hash': ''
+        }))
+    
+    def on_result(outcome):
+        land = Land.query.get(outcome['key'])
+        if outcome['status'] == 'confirmed':
+            land.token_id = outcome['result'].get('token_id')
+            land.blockchain_token_id = outcome['result'].get('token_id')
+            land.blockchain_tx_hash = outcome['result'].get('tx_hash')
+            land.is_registered_on_blockchain = True
+            land.blockchain_block_number = outcome['result'].get('block_number')
+            db.session.commit()
+            print(f"  ✅ Land {land.id} ({land.property_id}) -> token {land.token_id}")
+        else:
+            print(f"  ❌ Land {land.id} ({land.property_id}) {outcome['status']}: {outcome['error']}")
+    
+    print(f"🚀 Pipelining {len(items)} registrations")
+    outcomes = blockchain_service.register_lands_pipelined(items, on_result=on_result, window=window)
+    registered_count = sum(1 for outcome in outcomes if outcome['status'] == 'confirmed')
+    
+    print(f"\n📊 Registration Summary:")
+    print(f"  - Successfully registered: {registered_count}")
+    print(f"  - Failed registrations: {len(lands) - registered_count}")
+    print(f"  - Total processed: {len(lands)}")
+    
+    return registered_count > 0
+
 def sync_database_with_blockchain():
     """Sync database lands with blockchain registrations"""
     
@@ -131,14 +180,16 @@ def sync_database_with_blockchain():
         print(f"📊 Total lands in database: {len(db_lands)}")
         
         updated_count = 0
+        lands_by_property = {land.property_id: land for land in db_lands}
         
-        # Check each blockchain token
-        for token_id in range(1, total_supply + 1):
+        # Read every token's details in batched eth_calls
+        token_details = blockchain_service.get_land_details_many(range(1, total_supply + 1))
+        
+        for detail in token_details:
+            token_id = detail['token_id']
+            blockchain_land = detail['land']
             print(f"\n🔍 Checking token ID {token_id}...")
             
-            # Get land details from blockchain
-            blockchain_land = blockchain_service.get_land_details_from_blockchain(token_id)
-            
             if blockchain_land:
                 property_id = blockchain_land['property_id']
                 owner_address = blockchain_land['owner']
@@ -147,13 +198,14 @@ def sync_database_with_blockchain():
                 print(f"  👤 Owner: {owner_address}")
                 
                 # Try to find matching land in database by property_id
-                db_land = Land.query.filter_by(property_id=property_id).first()
+                db_land = lands_by_property.get(property_id)
                 
                 if db_land:
                     # Update database land with blockchain info
                     if not db_land.is_registered_on_blockchain:
                         db_land.is_registered_on_blockchain = True
                         db_land.token_id = token_id
+                        db_land.blockchain_token_id = token_id
                         db_land.blockchain_tx_hash = "synced_manually"  # You can update this with actual tx hash if available
                         
                         db.session.commit()
@@ -165,7 +217,7 @@ def sync_database_with_blockchain():
                     print(f"  ⚠️  No matching land found in database for property ID: {property_id}")
                     print(f"      Consider creating a new database entry or checking property ID mapping")
             else:
-                print(f"  ❌ Could not retrieve details for token ID {token_id}")
+                print(f"  ❌ Could not retrieve details for token ID {token_id}: {detail['error']}")
         
         print(f"\n📊 Sync Summary:")
         print(f"  - Blockchain lands: {total_supply}")
@@ -225,6 +277,7 @@ def sync_database_with_blockchain():
                     if not db_land.is_registered_on_blockchain:
                         db_land.is_registered_on_blockchain = True
                         db_land.token_id = token_id
+                        db_land.blockchain_token_id = token_id
                         db_land.blockchain_tx_hash = "synced_manually"  # You can update this with actual tx hash if available
                         
                         db.session.commit()
@@ -254,6 +307,51 @@ def sync_database_with_blockchain():
         
         return True
 
+def sync_database_from_index():
+    """Sync database lands from the indexed LandRegistered events (no per-token RPCs)"""
+    
+    app = create_app()
+    with app.app_context():
+        print("=== Blockchain Database Sync (event index) ===")
+        
+        # Bring the index up to the confirmed head first
+        indexer = ChainEventIndexer(blockchain_service)
+        summary = indexer.run_once()
+        print(f"📥 Index at block {summary['last_block']} ({summary['events_stored']} new events)")
+        
+        registrations = ChainLandEvent.query.filter_by(event_name='LandRegistered').all()
+        print(f"📊 Indexed registrations: {len(registrations)}")
+        
+        lands_by_property = {
+            land.property_id: land for land in Land.query.filter(
+                Land.property_id.in_([event.property_id for event in registrations])
+            ).all()
+        }
+        
+        updated_count = 0
+        for event in registrations:
+            db_land = lands_by_property.get(event.property_id)
+            if not db_land:
+                print(f"  ⚠️  No matching land found in database for property ID: {event.property_id}")
+                continue
+            
+            if not db_land.is_registered_on_blockchain or db_land.token_id != event.token_id:
+                db_land.is_registered_on_blockchain = True
+                db_land.token_id = event.token_id
+                db_land.blockchain_token_id = event.token_id
+                db_land.blockchain_tx_hash = event.tx_hash
+                db_land.blockchain_block_number = event.block_number
+                updated_count += 1
+                print(f"  ✅ Updated land '{db_land.title}' - token ID {event.token_id}")
+        
+        db.session.commit()
+        
+        print(f"\n📊 Sync Summary:")
+        print(f"  - Indexed registrations: {len(registrations)}")
+        print(f"  - Updated records: {updated_count}")
+        
+        return True
+
 def show_blockchain_vs_database():
     """Show comparison between blockchain and database"""
     
@@ -267,10 +365,12 @@ def show_blockchain_vs_database():
             print(f"\n🔗 Blockchain Status:")
             print(f"  - Total lands: {total_supply}")
             
-            for token_id in range(1, total_supply + 1):
-                land = blockchain_service.get_land_details_from_blockchain(token_id)
+            for detail in blockchain_service.get_land_details_many(range(1, total_supply + 1)):
+                land = detail['land']
                 if land:
-                    print(f"  - Token {token_id}: {land['property_id']} - {land['location']}")
+                    print(f"  - Token {detail['token_id']}: {land['property_id']} - {land['location']}")
+                else:
+                    print(f"  - Token {detail['token_id']}: ❌ {detail['error']}")
         
         # Database data
         db_lands = Land.query.all()
@@ -290,19 +390,26 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Blockchain Database Sync Utility")
     parser.add_argument("--sync", action="store_true", help="Sync database with blockchain")
+    parser.add_argument("--from-index", action="store_true", help="With --sync, use the event index instead of per-token reads")
     parser.add_argument("--compare", action="store_true", help="Compare blockchain and database")
     parser.add_argument("--register-verified", action="store_true", help="Register all verified lands on blockchain")
+    parser.add_argument("--pipeline", action="store_true", help="With --register-verified, keep several transactions in flight")
+    parser.add_argument("--window", type=int, default=None, help="In-flight transaction limit for --pipeline (PIPELINE_WINDOW)")
     
     args = parser.parse_args()
     
-    if args.sync:
+    if args.sync and args.from_index:
+        sync_database_from_index()
+    elif args.sync:
         sync_database_with_blockchain()
     elif args.compare:
         show_blockchain_vs_database()
     elif args.register_verified:
-        register_verified_lands_on_blockchain()
+        register_verified_lands_on_blockchain(pipeline=args.pipeline, window=args.window)
     else:
         print("Usage:")
         print("  python sync_blockchain.py --compare          # Show comparison")
         print("  python sync_blockchain.py --sync             # Sync database with blockchain")
-        print("  python sync_blockchain.py --register-verified # Register verified lands on blockchain")
\ No newline at end of file
+        print("  python sync_blockchain.py --sync --from-index # Sync from indexed contract events")
+        print("  python sync_blockchain.py --register-verified # Register verified lands on blockchain")
+        print("  python sync_blockchain.py --register-verified --pipeline # Register with pipelined transactions")
\ No newline at end of file
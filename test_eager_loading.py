@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Eager-loading test - runs the list and detail endpoints against a seeded
+SQLite database with SQLALCHEMY_LAZY_LOAD=raise, so any relationship that is
+serialized without eager loading fails, and checks that the number of SQL
+statements per request does not grow with the page size.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'eager_loading.db')}"
+os.environ['SQLALCHEMY_LAZY_LOAD'] = 'raise'
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import User, Land, LandTransfer, UserRole
+
+
+class StatementCounter:
+    """Counts SQL statements sent by the engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def seed():
+    users = [User(username=f'eager_user_{i}', email=f'eager_user_{i}@example.com', first_name='Eager',
+                  last_name=str(i), role=UserRole.ADMIN if i == 0 else UserRole.USER,
+                  wallet_address=f"0x{i:040x}")
+             for i in range(6)]
+    for user in users:
+        user.set_password('password')
+    db.session.add_all(users)
+    db.session.flush()
+
+    started = datetime(2025, 1, 1)
+    lands = [Land(property_id=f'EAGER-{i}', owner_id=users[1 + i % 5].id, title=f'Plot {i}', location='Somewhere',
+                  area=500.0, property_type='residential', latitude=10.0 + i / 100, longitude=20.0,
+                  status='pending' if i % 3 else 'verified', created_at=started + timedelta(minutes=i))
+             for i in range(30)]
+    db.session.add_all(lands)
+    db.session.flush()
+
+    db.session.add_all([
+        LandTransfer(land_id=lands[i].id, from_user_id=lands[i].owner_id, to_user_id=users[1 + (i + 1) % 5].id,
+                     price=1000.0, status='pending', initiated_at=started + timedelta(minutes=i))
+        for i in range(30)
+    ])
+    db.session.commit()
+    return users, lands
+
+
+def get(client, engine, url, token):
+    """Statements issued by one GET; the response must succeed"""
+    with StatementCounter(engine) as counter:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, f"{url}: {response.status_code} {response.get_json()}"
+    return counter.count
+
+
+def test_list_endpoints_do_not_grow_with_page_size():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users, lands = seed()
+        engine = db.engine
+        admin_id, user_id = users[0].id, users[1].id
+        land_id = lands[0].id
+        transfer_id = LandTransfer.query.first().id
+        admin_token = create_access_token(identity=str(admin_id))
+        user_token = create_access_token(identity=str(user_id))
+
+    # Requests run outside the seeding context so each gets a fresh session
+    client = app.test_client()
+    paged = [
+        ('/api/lands/', admin_token),
+        ('/api/lands/?owner_only=true', user_token),
+        ('/api/lands/transfers', user_token),
+        ('/api/lands/transfers?type=all', admin_token),
+        ('/api/admin/lands/pending', admin_token),
+        ('/api/admin/transfers', admin_token),
+    ]
+    for url, token in paged:
+        separator = '&' if '?' in url else '?'
+        small = get(client, engine, f'{url}{separator}per_page=2', token)
+        large = get(client, engine, f'{url}{separator}per_page=30', token)
+        assert small == large, f"{url}: {small} statements for 2 rows, {large} for 30"
+        print(f"✅ {url}: {large} statements for any page size")
+
+    for url, token in [
+        ('/api/lands/map-data', user_token),
+        ('/api/admin/dashboard', admin_token),
+        (f'/api/admin/users/{user_id}', admin_token),
+        (f'/api/lands/{land_id}', admin_token),
+        (f'/api/lands/{land_id}/transfer-history', admin_token),
+        (f'/api/lands/transfers/{transfer_id}', admin_token),
+    ]:
+        print(f"✅ {url}: {get(client, engine, url, token)} statements")
+
+    response = client.post('/api/lands/', headers={'Authorization': f'Bearer {user_token}'}, json={
+        'property_id': 'EAGER-NEW', 'title': 'New plot', 'location': 'Somewhere', 'area': 100,
+        'property_type': 'residential', 'latitude': 1.0, 'longitude': 2.0
+    })
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['land']['owner']['id'] == user_id
+    print("✅ Created land serialized with its owner after commit")
+
+    with app.app_context():
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing eager loading of serialized relationships")
+    test_list_endpoints_do_not_grow_with_page_size()
+    print("🎉 All eager loading tests passed")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Pagination test - walks the list endpoints page by page with ?cursor= over
+transfers that share initiated_at values, forward to the last page and back
+again, checking that every row shows up exactly once and in the same order as
+the offset pages; also checks that bad cursors / count values get a 400 and
+that count=none offset pages report has_next.
+"""
+
+import base64
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pagination.db')}"
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User, Land, LandTransfer, UserRole
+
+LANDS = 23
+TRANSFERS = 23
+
+
+def seed():
+    users = [User(username=f'page_user_{i}', email=f'page_user_{i}@example.com', first_name='Page',
+                  last_name=str(i), role=UserRole.ADMIN if i == 0 else UserRole.USER)
+             for i in range(4)]
+    for user in users:
+        user.set_password('password')
+    db.session.add_all(users)
+    db.session.flush()
+
+    lands = [Land(property_id=f'PAGE-{i}', owner_id=users[1 + i % 3].id, title=f'Plot {i}', location='Somewhere',
+                  area=500.0, property_type='residential', latitude=10.0, longitude=20.0,
+                  status='pending' if i % 2 else 'verified')
+             for i in range(LANDS)]
+    db.session.add_all(lands)
+    db.session.flush()
+
+    # Three transfers per timestamp, so page boundaries fall inside runs of equal initiated_at
+    started = datetime(2025, 1, 1)
+    db.session.add_all([
+        LandTransfer(land_id=lands[i].id, from_user_id=users[1].id, to_user_id=users[2].id, price=1000.0,
+                     status='pending', initiated_at=started + timedelta(minutes=i // 3))
+        for i in range(TRANSFERS)
+    ])
+    db.session.commit()
+    return users
+
+
+def get(client, url, token, status=200):
+    response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == status, f"{url}: {response.status_code} {response.get_json()}"
+    return response.get_json()
+
+
+def ids(body, key):
+    return [item['id'] for item in body[key]]
+
+
+def walk(client, url, key, token, per_page):
+    """Cursor pages of url from the first to the last and back to the first"""
+    separator = '&' if '?' in url else '?'
+    forward, cursor = [], ''
+    while cursor is not None:
+        body = get(client, f'{url}{separator}cursor={cursor}&per_page={per_page}', token)
+        assert len(body[key]) <= per_page
+        forward.append((ids(body, key), body['prev_cursor']))
+        cursor = body['next_cursor']
+
+    backward, cursor = [forward[-1][0]], forward[-1][1]
+    while cursor is not None:
+        body = get(client, f'{url}{separator}cursor={cursor}&per_page={per_page}', token)
+        backward.insert(0, ids(body, key))
+        cursor = body['prev_cursor']
+    return [page for page, _ in forward], backward
+
+
+def offset_ids(client, url, key, token, per_page):
+    """Ids of every offset page of url, in order"""
+    separator = '&' if '?' in url else '?'
+    body = get(client, f'{url}{separator}page=1&per_page={per_page}', token)
+    result = ids(body, key)
+    for page in range(2, body['pages'] + 1):
+        result += ids(get(client, f'{url}{separator}page={page}&per_page={per_page}', token), key)
+    return result
+
+
+def test_cursor_pages_cover_every_row_once():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users = seed()
+        admin_token = create_access_token(identity=str(users[0].id))
+        user_token = create_access_token(identity=str(users[1].id))
+        # Expected order of the transfer lists: initiated_at DESC, id DESC
+        expected_transfers = [transfer.id for transfer in LandTransfer.query.order_by(
+            LandTransfer.initiated_at.desc(), LandTransfer.id.desc()).all()]
+
+    # Requests run outside the seeding context so each gets a fresh session
+    client = app.test_client()
+    for url, key, token, per_page, expected in [
+        ('/api/admin/transfers', 'transfers', admin_token, 4, expected_transfers),
+        ('/api/lands/transfers', 'transfers', user_token, 5, expected_transfers),
+        ('/api/lands/', 'lands', admin_token, 4, None),
+        ('/api/lands/?status=pending', 'lands', admin_token, 3, None),
+        ('/api/admin/users', 'users', admin_token, 3, None),
+    ]:
+        forward, backward = walk(client, url, key, token, per_page)
+        rows = [row for page in forward for row in page]
+        assert len(rows) == len(set(rows)), f"{url}: duplicate rows {rows}"
+        assert rows == offset_ids(client, url, key, token, per_page), f"{url}: cursor and offset pages differ"
+        if expected is not None:
+            assert rows == expected, f"{url}: {rows} != {expected}"
+        assert backward == forward, f"{url}: walking back gave {backward}, forward {forward}"
+        print(f"✅ {url}: {len(rows)} rows over {len(forward)} pages, forward and back")
+
+    with app.app_context():
+        db.drop_all()
+
+
+def test_bad_parameters_and_count_none():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users = seed()
+        admin_token = create_access_token(identity=str(users[0].id))
+
+    client = app.test_client()
+    tampered = base64.urlsafe_b64encode(b'{"d":"sideways","k":[1]}').decode().rstrip('=')
+    for query in ['cursor=garbage', f'cursor={tampered}', 'cursor=e30', 'count=bogus', 'cursor=&count=bogus']:
+        body = get(client, f'/api/admin/transfers?{query}', admin_token, status=400)
+        assert 'error' in body, body
+        print(f"✅ ?{query}: 400 {body['error']}")
+
+    # 23 transfers, 4 per page: page 6 is the last one and holds 3 rows
+    body = get(client, '/api/admin/transfers?count=none&page=5&per_page=4', admin_token)
+    assert body['total'] is None and body['pages'] is None
+    assert body['has_next'] is True and len(body['transfers']) == 4
+    body = get(client, '/api/admin/transfers?count=none&page=6&per_page=4', admin_token)
+    assert body['has_next'] is False and len(body['transfers']) == 3
+    body = get(client, '/api/admin/transfers?count=none&page=7&per_page=4', admin_token)
+    assert body['has_next'] is False and body['transfers'] == []
+    print("✅ count=none pages report has_next without a total")
+
+    with app.app_context():
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing cursor and offset pagination")
+    test_cursor_pages_cover_every_row_once()
+    test_bad_parameters_and_count_none()
+    print("🎉 All pagination tests passed")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Query plan regression test - seeds users, lands and transfers, calls the list
+/ statistics endpoints through the test client, captures the SQL they send
+and runs EXPLAIN on each statement. It fails when a statement reads a whole
+table or index (a scan not cut short by a LIMIT), or when a paginated
+statement sorts its rows instead of reading them in index order. Statements
+that do so by design are listed in EXPECTED_SCANS.
+
+Runs on a temporary SQLite file by default; set TEST_DATABASE_URL to a
+scratch PostgreSQL database to check the Postgres plans (its tables are
+dropped and recreated).
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL') or \
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plans.db')}"
+os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+
+from app import create_app, db
+from app.models import User, Land, LandTransfer, UserRole
+
+USERS = 500
+LANDS = 2000
+TRANSFERS = 4000
+
+# Statements allowed to scan or sort, with the reason
+EXPECTED_SCANS = [
+    # COUNT(*) over a whole table (admin totals) reads every row by design
+    (re.compile(r'^SELECT count\(\*\) AS count_1\s+FROM \(SELECT .+?\s+FROM \w+\) AS anon_1$', re.S),
+     'whole-table total'),
+    # Registered-land totals read the partial index, which holds exactly those rows
+    (re.compile(r'^SELECT count\(\*\) AS count_1\s+FROM \(SELECT .+?\s+FROM lands\s+'
+                r'WHERE lands.is_registered_on_blockchain = \S+\) AS anon_1$', re.S),
+     'total of registered lands'),
+    # Sent and received transfers of one user come from two indexes and are merged by a sort
+    # bounded by that user's transfer count
+    (re.compile(r'WHERE \(?land_transfers.from_user_id = \S+ OR land_transfers.to_user_id = \S+\)?'),
+     "a user's sent and received transfers"),
+]
+
+
+class StatementRecorder:
+    """Records the SELECT statements (with their parameters) sent by the engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def seed():
+    """Spread lands and transfers over users, statuses and dates"""
+    rng = random.Random(7)
+    users = [User(username=f'plan_user_{i}', email=f'plan_user_{i}@example.com', first_name='Plan',
+                  last_name=str(i), role=UserRole.ADMIN if i == 0 else UserRole.USER)
+             for i in range(USERS)]
+    for user in users:
+        user.password_hash = 'x'
+    db.session.add_all(users)
+    db.session.flush()
+
+    started = datetime(2025, 1, 1)
+    lands = []
+    for i in range(LANDS):
+        status = rng.choices(['verified', 'pending', 'rejected'], [80, 15, 5])[0]
+        lands.append(Land(
+            property_id=f'PLAN-{i}', owner_id=rng.choice(users).id, title=f'Plot {i}', location='Somewhere',
+            area=rng.uniform(100, 10000), property_type=rng.choice(['residential', 'commercial', 'agricultural']),
+            latitude=rng.uniform(-60, 60), longitude=rng.uniform(-180, 180), status=status,
+            is_registered_on_blockchain=status == 'verified' and rng.random() < 0.7,
+            created_at=started + timedelta(minutes=i)
+        ))
+    db.session.add_all(lands)
+    db.session.flush()
+
+    transfers = []
+    for i in range(TRANSFERS):
+        land = rng.choice(lands)
+        transfers.append(LandTransfer(
+            land_id=land.id, from_user_id=land.owner_id, to_user_id=rng.choice(users).id, price=1000.0,
+            status=rng.choices(['completed', 'pending', 'failed'], [85, 10, 5])[0],
+            initiated_at=started + timedelta(minutes=i)
+        ))
+    db.session.add_all(transfers)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def endpoint_requests(user_id, land_id, transfer_id):
+    """(url, as admin) pairs covering the list / statistics endpoints of lands.py and admin.py"""
+    return [
+        ('/api/lands/', False),
+        ('/api/lands/?status=pending', False),
+        ('/api/lands/?property_type=commercial', True),
+        ('/api/lands/?status=verified&property_type=commercial', True),
+        ('/api/lands/?cursor=', False),
+        ('/api/lands/map-data?bounds=10,20,12,40', False),
+        ('/api/lands/statistics', False),
+        ('/api/lands/statistics', True),
+        ('/api/lands/transfers?type=sent', False),
+        ('/api/lands/transfers?type=received', False),
+        ('/api/lands/transfers', False),
+        ('/api/lands/transfers?cursor=', False),
+        ('/api/lands/transfers?type=all&status=pending', True),
+        (f'/api/lands/transfers/{transfer_id}', True),
+        (f'/api/lands/{land_id}', True),
+        (f'/api/lands/{land_id}/transfer-history', True),
+        ('/api/admin/dashboard', True),
+        ('/api/admin/users?cursor=', True),
+        (f'/api/admin/users/{user_id}', True),
+        ('/api/admin/lands/pending', True),
+        ('/api/admin/transfers', True),
+        ('/api/admin/transfers?cursor=', True),
+        ('/api/admin/transfers?status=pending', True),
+    ]
+
+
+def capture(client, engine, url, token):
+    """SELECT statements sent by one GET, plus those of its next cursor page if it has one"""
+    with StatementRecorder(engine) as recorder:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200, f"{url}: {response.status_code} {response.get_json()}"
+        next_cursor = response.get_json().get('next_cursor')
+        if next_cursor:
+            # Deep pages add the (sort key) < (cursor) bound
+            response = client.get(f"{url}{next_cursor}", headers={'Authorization': f'Bearer {token}'})
+            assert response.status_code == 200, f"{url}{next_cursor}: {response.status_code}"
+    return recorder.statements
+
+
+def expected_scan(statement):
+    return next((reason for pattern, reason in EXPECTED_SCANS if pattern.search(statement.strip())), None)
+
+
+def _postgres_problems(node, tables, limited=False):
+    """Walk an EXPLAIN (FORMAT JSON) plan; limited is True below a Limit that stops reading early"""
+    problems = []
+    node_type = node['Node Type']
+    relation = node.get('Relation Name')
+    if node_type == 'Sort' and limited:
+        problems.append('sorts a paginated query')
+    if relation in tables and not limited:
+        # With seq scans priced out, one in the plan means no usable index exists
+        if node_type == 'Seq Scan':
+            problems.append(f'sequential scan on {relation}')
+        elif node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node:
+            problems.append(f"full scan of {node['Index Name']}")
+
+    if node_type == 'Limit':
+        limited = True
+    elif node_type in ('Sort', 'Aggregate', 'HashAggregate', 'Hash', 'Materialize', 'Unique'):
+        limited = False  # these read all of their input
+    for child in node.get('Plans', []):
+        problems.extend(_postgres_problems(child, tables, limited))
+    return problems
+
+
+def plan_problems(statement, parameters):
+    """Whole-table reads and sorted pages in the plan of a captured statement"""
+    tables = set(db.metadata.tables)
+    connection = db.session.connection()
+    if db.engine.dialect.name == 'postgresql':
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        db.session.rollback()
+        return _postgres_problems(plan[0]['Plan'], tables)
+
+    details = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()]
+    db.session.rollback()
+    paginated = re.search(r'\bLIMIT\b', statement) is not None
+    sorted_page = paginated and any(detail.startswith('USE TEMP B-TREE FOR ORDER BY') for detail in details)
+    problems = ['sorts a paginated query'] if sorted_page else []
+    for detail in details:
+        # 'SCAN lands [USING [COVERING] INDEX ...]' walks the whole table or index: fine only when
+        # rows come out in page order and the LIMIT stops it early
+        words = detail.split()
+        if words[0] == 'SCAN' and words[1] in tables and (sorted_page or not paginated):
+            problems.append(f"full scan: {detail}")
+    return problems
+
+
+def test_endpoint_queries_use_indexes():
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed()
+        engine = db.engine
+        admin_id = User.query.filter_by(username='plan_user_0').first().id
+        user_id = User.query.filter_by(username='plan_user_1').first().id
+        transfer = LandTransfer.query.first()
+        land_id, transfer_id = transfer.land_id, transfer.id
+        admin_token = create_access_token(identity=str(admin_id))
+        user_token = create_access_token(identity=str(user_id))
+
+    # Requests run outside the seeding context so each gets a fresh session
+    client = app.test_client()
+    captured = {}
+    for url, as_admin in endpoint_requests(user_id, land_id, transfer_id):
+        for statement, parameters in capture(client, engine, url, admin_token if as_admin else user_token):
+            captured.setdefault(statement, (url, parameters))
+
+    failures = []
+    with app.app_context():
+        for statement, (url, parameters) in captured.items():
+            problems = plan_problems(statement, parameters)
+            reason = expected_scan(statement)
+            if problems and not reason:
+                failures.append(f"{url}: {'; '.join(problems)}\n    {' '.join(statement.split())}")
+            elif problems:
+                print(f"➖ {url}: {'; '.join(problems)} ({reason})")
+            else:
+                print(f"✅ {url}: {' '.join(statement.split())[:100]}")
+        dialect = db.engine.dialect.name
+        db.session.remove()
+        db.drop_all()
+    assert not failures, '\n'.join(failures)
+    print(f"✅ No unexpected scans or sorted pages in {len(captured)} statements on {dialect}")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing query plans of the list endpoints")
+    test_endpoint_queries_use_indexes()
+    print("🎉 All query plan tests passed")
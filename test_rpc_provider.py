@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Multi-endpoint RPC provider test - runs against local stand-in JSON-RPC
+servers that inject delays and failures, no network access needed.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.rpc_provider import MultiEndpointProvider, PooledHTTPProvider
+
+
+class StandInNode:
+    """Tiny JSON-RPC server answering eth_blockNumber with a fixed block"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, so pooled connections are reused
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                node.requests.append(body)
+                time.sleep(node.delay)
+                if node.fail:
+                    self.send_response(502)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                items = body if isinstance(body, list) else [body]
+                results = [{'jsonrpc': '2.0', 'id': item['id'], 'result': node.name} for item in items]
+                data = json.dumps(results if isinstance(body, list) else results[0]).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.uri = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def test_reads_prefer_fastest_endpoint():
+    """After warm-up, reads are routed to the lowest-latency node"""
+    slow, fast = StandInNode('slow', delay=0.15), StandInNode('fast', delay=0.0)
+    try:
+        provider = MultiEndpointProvider([slow.uri, fast.uri])
+        for _ in range(10):
+            provider.make_request('eth_blockNumber', [])
+        slow.requests.clear()
+        fast.requests.clear()
+
+        for _ in range(10):
+            assert provider.make_request('eth_blockNumber', [])['result'] == 'fast'
+        assert len(fast.requests) == 10 and not slow.requests
+        print("✅ Reads routed to the fastest endpoint")
+    finally:
+        slow.close()
+        fast.close()
+
+
+def test_failing_endpoint_is_skipped():
+    """A node returning HTTP errors is put in cooldown and reads fail over"""
+    broken, healthy = StandInNode('broken', fail=True), StandInNode('healthy')
+    try:
+        provider = MultiEndpointProvider([broken.uri, healthy.uri], cooldown=60)
+        assert provider.make_request('eth_blockNumber', [])['result'] == 'healthy'
+        broken.requests.clear()
+        for _ in range(5):
+            assert provider.make_request('eth_blockNumber', [])['result'] == 'healthy'
+        assert not broken.requests
+        print("✅ Failing endpoint skipped during cooldown")
+    finally:
+        broken.close()
+        healthy.close()
+
+
+def test_hedged_read_beats_stalled_primary():
+    """With hedging, a stalled primary is raced against the next node"""
+    stalled, backup = StandInNode('stalled', delay=1.0), StandInNode('backup', delay=0.0)
+    try:
+        provider = MultiEndpointProvider([stalled.uri, backup.uri], hedge_after_ms=50)
+        # Make the stalled node look fastest so it is tried first
+        provider.endpoints[0].latency_ms = 1.0
+        provider.endpoints[1].latency_ms = 5.0
+
+        started = time.perf_counter()
+        result = provider.make_request('eth_blockNumber', [])
+        elapsed = time.perf_counter() - started
+        assert result['result'] == 'backup'
+        assert elapsed < 0.5, f"hedged read took {elapsed:.2f}s"
+        assert provider.endpoints[1].hedged_wins == 1
+        print(f"✅ Hedged read answered in {elapsed * 1000:.0f}ms despite a 1s primary")
+    finally:
+        stalled.close()
+        backup.close()
+
+
+def test_writes_stay_sticky():
+    """Write-path methods keep using one node even when another is faster"""
+    first, second = StandInNode('first', delay=0.05), StandInNode('second', delay=0.0)
+    try:
+        provider = MultiEndpointProvider([first.uri, second.uri])
+        for _ in range(5):
+            provider.make_request('eth_blockNumber', [])
+        for _ in range(5):
+            assert provider.make_request('eth_getTransactionCount', ['0x0', 'pending'])['result'] == 'first'
+            assert provider.make_request('eth_sendRawTransaction', ['0x00'])['result'] == 'first'
+        print("✅ Writes stayed on the sticky endpoint")
+    finally:
+        first.close()
+        second.close()
+
+
+def test_pooled_provider_reuses_connections():
+    """Single-endpoint provider keeps one keep-alive connection across threads"""
+    node = StandInNode('pooled')
+    try:
+        provider = PooledHTTPProvider(node.uri)
+        provider.make_request('eth_blockNumber', [])
+        worker = threading.Thread(target=lambda: [provider.make_request('eth_blockNumber', []) for _ in range(4)])
+        worker.start()
+        worker.join()
+        assert provider.make_batch_request([
+            {'jsonrpc': '2.0', 'id': i, 'method': 'eth_blockNumber', 'params': []} for i in range(3)
+        ])[2]['id'] == 2
+
+        pool = provider.pool_stats()[0]
+        assert pool['requests'] == 6
+        assert pool['new_connections'] == 1, pool
+        assert pool['reused_connections'] == 5
+        print(f"✅ Pooled provider reused its connection: {pool}")
+    finally:
+        node.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing multi-endpoint RPC provider")
+    test_reads_prefer_fastest_endpoint()
+    test_failing_endpoint_is_skipped()
+    test_hedged_read_beats_stalled_primary()
+    test_writes_stay_sticky()
+    test_pooled_provider_reuses_connections()
+    print("🎉 All RPC provider tests passed")